@@ -49,7 +49,7 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
-import fitz  # PyMuPDF
+from common.src.file_io.pdf_document_session import PdfDocumentSession
 
 
 @dataclass
@@ -80,12 +80,14 @@ class DocumentReferenceInventoryAgent:
         Missing tables: {4, 9}
     """
 
-    def __init__(self, pdf_path: Path):
+    def __init__(self, pdf_path: Path, document_session: Optional[PdfDocumentSession] = None):
         """
         Initialize inventory agent.
 
         Args:
             pdf_path: Path to PDF document
+            document_session: Optional shared PDF session (page text is parsed once
+                              and reused by later pipeline stages)
 
         Raises:
             FileNotFoundError: If PDF doesn't exist
@@ -114,8 +116,10 @@ class DocumentReferenceInventoryAgent:
             ]
         }
 
-        # Open PDF
-        self.doc = fitz.open(str(self.pdf_path))
+        # Open PDF (shared session if given)
+        self._owns_session = document_session is None
+        self.session = document_session or PdfDocumentSession(self.pdf_path)
+        self.doc = self.session.doc
 
     def scan_document(self) -> Dict[str, ObjectInventory]:
         """
@@ -174,8 +178,7 @@ class DocumentReferenceInventoryAgent:
 
         # Scan all pages
         for page_num in range(len(self.doc)):
-            page = self.doc[page_num]
-            text = page.get_text()
+            text = self.session.page_text(page_num)
 
             page_found = False
 
@@ -273,10 +276,14 @@ class DocumentReferenceInventoryAgent:
 
         print(f"✅ Saved inventory to: {output_path}")
 
+    def close(self):
+        """Close the PDF handle (a shared session is left to its owner)."""
+        if getattr(self, '_owns_session', False):
+            self.session.close()
+
     def __del__(self):
         """Clean up PDF handle."""
-        if hasattr(self, 'doc'):
-            self.doc.close()
+        self.close()
 
 
 if __name__ == "__main__":
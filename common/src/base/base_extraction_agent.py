@@ -28,7 +28,7 @@ Date: 2025-10-03
 import sys
 import os
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
@@ -49,6 +49,13 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
+# PyMuPDF/NumPy/Pillow-backed helpers are imported where they are used, so
+# importing an agent module stays as light as the common.src.file_io package
+if TYPE_CHECKING:
+    from common.src.file_io.page_raster_cache import PageRasterCache
+    from common.src.file_io.pdf_document_session import PdfDocumentSession
+    from common.src.file_io.crop_image_writer import CropImageWriter
+
 
 @dataclass
 class Zone:
@@ -72,6 +79,31 @@ class Zone:
     metadata: Optional[Dict[str, Any]] = None
 
 
+def ensure_unique_zone_ids(zones: List[Zone]) -> List[Zone]:
+    """
+    Make zone IDs unique (in place), in zone order.
+
+    Zone IDs name output files and key extracted objects, but page-based IDs
+    can repeat (two equations whose number reads "unknown", or an unnumbered
+    equation at index 1 next to one numbered (1)). The first zone keeps its ID;
+    repeats become {zone_id}_dup{n}. Deterministic for the same zone order.
+
+    Returns:
+        The same list, for chaining
+    """
+    taken = {zone.zone_id for zone in zones}
+    seen = set()
+    for zone in zones:
+        if zone.zone_id in seen:
+            n = 2
+            while f"{zone.zone_id}_dup{n}" in taken:
+                n += 1
+            zone.zone_id = f"{zone.zone_id}_dup{n}"
+            taken.add(zone.zone_id)
+        seen.add(zone.zone_id)
+    return zones
+
+
 @dataclass
 class ExtractedObject:
     """
@@ -133,6 +165,9 @@ class BaseExtractionAgent(ABC):
     2. Set agent_type and agent_version in __init__
     3. Override validate_zone() if type-specific validation needed
     4. Override post_process() if cross-object processing needed
+    5. Set RASTER_DPI and crop through render_region() if zone images are rendered
+    6. Read the PDF through self.session and release it with close()
+    7. Write crop images through save_image() (paths are final at once)
 
     Usage Example:
     --------------
@@ -146,7 +181,14 @@ class BaseExtractionAgent(ABC):
     >>> results = agent.process_zones(zones)
     """
 
-    def __init__(self, pdf_path: Path, output_dir: Path, document_metadata: Optional[Dict[str, Any]] = None):
+    # Resolution of rendered zone crops (None = agent renders no page images).
+    # Callers sharing a PageRasterCache size it to the max over their agents.
+    RASTER_DPI: Optional[float] = None
+
+    def __init__(self, pdf_path: Path, output_dir: Path, document_metadata: Optional[Dict[str, Any]] = None,
+                 raster_cache: Optional['PageRasterCache'] = None,
+                 document_session: Optional['PdfDocumentSession'] = None,
+                 image_writer: Optional['CropImageWriter'] = None):
         """
         Initialize base extraction agent.
 
@@ -155,6 +197,14 @@ class BaseExtractionAgent(ABC):
             output_dir: Base directory for extraction outputs
             document_metadata: Optional bibliographic metadata from DocumentMetadataAgent
                              (includes document_id, zotero_key, title, authors, etc.)
+            raster_cache: Optional page raster cache shared with other agents
+                          (each page is rendered once instead of once per zone)
+            document_session: Optional PDF session shared with other agents (the PDF
+                              is parsed once; the caller closes it). Without one,
+                              the agent opens its own on first use of self.session
+            image_writer: Optional crop image output stage shared with other agents
+                          (thread-pool encoding, format, thumbnails). Default:
+                          synchronous PNG
 
         Raises:
             FileNotFoundError: If PDF path does not exist
@@ -163,6 +213,14 @@ class BaseExtractionAgent(ABC):
         self.pdf_path = Path(pdf_path)
         self.output_dir = Path(output_dir)
         self.document_metadata = document_metadata or {}
+        self.raster_cache = raster_cache
+        self._session = document_session
+        self._owns_session = False
+        self._owns_image_writer = image_writer is None
+        if image_writer is None:
+            from common.src.file_io.crop_image_writer import CropImageWriter
+            image_writer = CropImageWriter()
+        self.image_writer = image_writer
 
         if not self.pdf_path.exists():
             raise FileNotFoundError(f"PDF not found: {self.pdf_path}")
@@ -337,6 +395,10 @@ class BaseExtractionAgent(ABC):
                 self.stats["failed_extractions"] += 1
                 print(f"    ❌ Failed")
 
+        # Crop images still being encoded must be on disk before post-processing
+        if self.image_writer.wait():
+            print("  ⚠️  Some crop images failed to write (see warnings above)")
+
         # Post-processing
         results = self.post_process(results)
 
@@ -345,6 +407,59 @@ class BaseExtractionAgent(ABC):
 
         return results
 
+    @property
+    def session(self) -> 'PdfDocumentSession':
+        """The PDF session: the shared one, or a private one opened on first use."""
+        if self._session is None:
+            from common.src.file_io.pdf_document_session import PdfDocumentSession
+            self._session = PdfDocumentSession(self.pdf_path)
+            self._owns_session = True
+        return self._session
+
+    def close(self):
+        """Close the agent's private PDF session and image writer (shared ones are left to their owner)."""
+        if self._owns_session and self._session is not None:
+            self._session.close()
+            self._session = None
+            self._owns_session = False
+        if self._owns_image_writer:
+            self.image_writer.close()
+
+    def save_image(self, image, path: Path) -> Path:
+        """
+        Hand a crop image to the output stage.
+
+        Args:
+            image: HxWx3 RGB uint8 array or PIL image
+            path: Target path (the suffix follows the writer's format)
+
+        Returns:
+            Final image path - record this one; the file exists after
+            process_zones() (or image_writer.wait()) returns
+        """
+        return self.image_writer.submit(image, path)
+
+    def render_region(self, page, rect, dpi: Optional[float] = None):
+        """
+        Render a page region as an RGB array.
+
+        Uses the shared raster cache when the agent was given one (a slice of
+        the page rendered once), otherwise renders the clip directly.
+
+        Args:
+            page: PyMuPDF page
+            rect: Region in PDF points, top-left origin (x0, y0, x1, y1)
+            dpi: Output resolution (default: RASTER_DPI)
+
+        Returns:
+            HxWx3 RGB uint8 numpy array
+        """
+        dpi = dpi or self.RASTER_DPI
+        if self.raster_cache is not None:
+            return self.raster_cache.crop(page, rect, dpi)
+        from common.src.file_io.page_raster_cache import render_clip
+        return render_clip(page, rect, dpi)
+
     def post_process(self, objects: List[ExtractedObject]) -> List[ExtractedObject]:
         """
         Post-process extracted objects (optional override).
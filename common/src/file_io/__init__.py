@@ -1,7 +1,34 @@
 """
 File I/O utilities for v14 architecture.
+
+The standard-library-only modules are imported eagerly; the ones that need
+PyMuPDF, NumPy or Pillow load on first attribute access, so importing
+pdf_hash (and with it this package) stays lightweight.
 """
 
+import importlib
+
 from .pdf_hash import *
+from .disk_cache import *
+from .page_text_index import *
+
+# Lazy imports: name → submodule
+_LAZY_NAMES = {
+    'PageRasterCache': 'page_raster_cache',
+    'pixmap_to_array': 'page_raster_cache',
+    'render_clip': 'page_raster_cache',
+    'PdfDocumentSession': 'pdf_document_session',
+    'CropImageWriter': 'crop_image_writer',
+    'IMAGE_FORMATS': 'crop_image_writer',
+    'THUMBNAIL_DIRNAME': 'crop_image_writer',
+}
+
+__all__ = ['pdf_hash', 'disk_cache', 'page_raster_cache', 'page_text_index',
+           'pdf_document_session', 'crop_image_writer']
+
 
-__all__ = ['pdf_hash']
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        module = importlib.import_module(f".{_LAZY_NAMES[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Crop Image Writer
+
+Output stage for the equation/table/figure crop images. Agents hand over a
+rendered crop and get its final path back at once; encoding runs on a
+thread pool (PIL releases the GIL while compressing), so it overlaps with
+the extraction of the next zone instead of blocking it.
+
+Key Features:
+    - Configurable format: png (PIL default level), png_fast, webp (lossy)
+      and webp_lossless, with compression level / quality overrides
+    - Optional thumbnails written alongside the full crops
+      (<dir>/thumbnails/<name>), longest side = thumbnail_size
+    - Paths are decided at submit time, so the paths agents record in
+      ExtractedObject.content never depend on encoding order
+    - Bounded backlog (submit blocks when too many crops are pending)
+    - max_workers=0 encodes synchronously (the standalone default)
+
+Call wait() before reading the files back (BaseExtractionAgent.process_zones
+does this before post-processing).
+
+Author: Claude Code
+Created: 2025-11-17
+"""
+
+import sys
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import numpy as np
+from PIL import Image
+
+__all__ = ['CropImageWriter', 'IMAGE_FORMATS', 'THUMBNAIL_DIRNAME']
+
+# format name → (PIL format, file suffix, PIL save options)
+IMAGE_FORMATS: Dict[str, Tuple[str, str, Dict[str, Any]]] = {
+    'png': ('PNG', '.png', {}),
+    'png_fast': ('PNG', '.png', {'compress_level': 1}),
+    'webp': ('WEBP', '.webp', {'quality': 90, 'method': 4}),
+    'webp_lossless': ('WEBP', '.webp', {'lossless': True, 'quality': 50, 'method': 2}),
+}
+
+THUMBNAIL_DIRNAME = 'thumbnails'
+
+
+class CropImageWriter:
+    """
+    Thread-pool encoder for crop images.
+
+    Example:
+        >>> writer = CropImageWriter(image_format='png_fast', thumbnail_size=256, max_workers=4)
+        >>> path = writer.submit(crop_array, output_dir / "figures" / "fig_3.png")
+        >>> # ... extract the next zone while fig_3 is being encoded ...
+        >>> writer.wait()
+        >>> writer.get_statistics()['images_written']
+        1
+    """
+
+    def __init__(self, image_format: str = 'png', compress_level: Optional[int] = None,
+                 quality: Optional[int] = None, thumbnail_size: Optional[int] = None,
+                 max_workers: int = 0, max_pending: Optional[int] = None):
+        """
+        Configure the output stage.
+
+        Args:
+            image_format: One of IMAGE_FORMATS ('png', 'png_fast', 'webp', 'webp_lossless')
+            compress_level: PNG zlib level 0-9 (overrides the format preset)
+            quality: WebP quality 0-100 (for lossless: encoding effort)
+            thumbnail_size: Also write thumbnails with this longest side (None = off)
+            max_workers: Encoder threads (0 = encode synchronously in submit)
+            max_pending: Crops queued before submit blocks (default: 4 per worker)
+
+        Raises:
+            ValueError: If image_format is unknown
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format '{image_format}' "
+                             f"(expected one of {sorted(IMAGE_FORMATS)})")
+
+        self.image_format = image_format
+        self.pil_format, self.suffix, preset = IMAGE_FORMATS[image_format]
+        self.save_options = dict(preset)
+        if compress_level is not None and self.pil_format == 'PNG':
+            self.save_options['compress_level'] = compress_level
+        if quality is not None and self.pil_format == 'WEBP':
+            self.save_options['quality'] = quality
+        self.thumbnail_size = thumbnail_size
+
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='crop-encode') \
+            if max_workers > 0 else None
+        self._slots = threading.BoundedSemaphore(max_pending or max(1, max_workers) * 4)
+        self._pending: List[Future] = []
+
+        self._lock = threading.Lock()
+        self.images_written = 0
+        self.thumbnails_written = 0
+        self.bytes_written = 0
+        self.encode_seconds = 0.0
+        self.failures = 0
+
+    def output_path(self, path: Union[str, Path]) -> Path:
+        """Final path of a crop (suffix set by the output format)."""
+        return Path(path).with_suffix(self.suffix)
+
+    def thumbnail_path(self, path: Union[str, Path]) -> Optional[Path]:
+        """Thumbnail path of a crop, or None when thumbnails are off."""
+        if not self.thumbnail_size:
+            return None
+        path = self.output_path(path)
+        return path.parent / THUMBNAIL_DIRNAME / path.name
+
+    def submit(self, image: Union[np.ndarray, Image.Image], path: Union[str, Path]) -> Path:
+        """
+        Queue a crop for encoding.
+
+        Args:
+            image: HxWx3 RGB uint8 array or PIL image (not modified afterwards by the caller)
+            path: Target path; the suffix is replaced by the format's
+
+        Returns:
+            Final image path (written once the encoder gets to it)
+        """
+        path = self.output_path(path)
+        if self._executor is None:
+            self._write(image, path)
+            return path
+
+        self._slots.acquire()
+        future = self._executor.submit(self._write, image, path)
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._pending.append(future)
+        return path
+
+    def wait(self) -> int:
+        """
+        Block until every queued crop is written.
+
+        Returns:
+            Number of crops that failed to encode since the last wait()
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        failed = 0
+        for future in pending:
+            if not future.result():
+                failed += 1
+        return failed
+
+    def close(self):
+        """Finish queued crops and stop the encoder threads."""
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Written images/thumbnails, bytes and encode time."""
+        with self._lock:
+            return {
+                'image_format': self.image_format,
+                'images_written': self.images_written,
+                'thumbnails_written': self.thumbnails_written,
+                'bytes_written': self.bytes_written,
+                'encode_seconds': self.encode_seconds,
+                'failures': self.failures
+            }
+
+    def _write(self, image: Union[np.ndarray, Image.Image], path: Path) -> bool:
+        """Encode one crop (and its thumbnail). Errors are reported, not raised."""
+        start = time.perf_counter()
+        try:
+            pil_image = image if isinstance(image, Image.Image) else Image.fromarray(image)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            pil_image.save(str(path), format=self.pil_format, **self.save_options)
+            written = path.stat().st_size
+
+            thumbnail_path = self.thumbnail_path(path)
+            if thumbnail_path is not None:
+                thumbnail = pil_image.copy()
+                thumbnail.thumbnail((self.thumbnail_size, self.thumbnail_size), Image.LANCZOS)
+                thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
+                thumbnail.save(str(thumbnail_path), format=self.pil_format, **self.save_options)
+                written += thumbnail_path.stat().st_size
+        except Exception as e:
+            print(f"    ⚠️  Image write failed ({path.name}): {e}")
+            with self._lock:
+                self.failures += 1
+            return False
+
+        with self._lock:
+            self.images_written += 1
+            self.thumbnails_written += thumbnail_path is not None
+            self.bytes_written += written
+            self.encode_seconds += time.perf_counter() - start
+        return True
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Disk LRU Cache
+
+Small persistent key/value store with a size cap and least-recently-used
+eviction. Backed by a single SQLite file so it is safe to share between runs
+and cheap to inspect.
+
+Key Features:
+    - JSON-serialized values (no pickle - cache files are safe to load)
+    - Size cap in bytes with LRU eviction on insert
+    - Hit/miss counters for reporting
+    - Prefix invalidation for namespaced keys
+    - Thread-safe (one lock around the shared connection)
+
+Typical keys are built from content hashes (see pdf_hash.py), so stale entries
+never match and are simply aged out by eviction.
+
+Author: Claude Code
+Created: 2025-11-17
+"""
+
+import sys
+import os
+import sqlite3
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+__all__ = ['DiskLRUCache']
+
+
+class DiskLRUCache:
+    """
+    Persistent JSON key/value cache with LRU eviction.
+
+    Example:
+        >>> cache = DiskLRUCache(Path("cache/detection.db"), max_bytes=256 * 1024**2)
+        >>> cache.put("yolo:sha256:abc:page", [{"bbox": [0, 0, 1, 1]}])
+        >>> cache.get("yolo:sha256:abc:page")
+        [{'bbox': [0, 0, 1, 1]}]
+    """
+
+    def __init__(self, db_path: Path, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Open (or create) a cache database.
+
+        Args:
+            db_path: SQLite file to store entries in
+            max_bytes: Total size cap for stored values (default 512 MB)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Detection engines may share one cache from different threads
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)"
+        )
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a value and mark it as recently used.
+
+        Returns:
+            The stored value, or None on a miss
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self.conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def contains(self, key: str) -> bool:
+        """Whether key is stored (not counted as a hit or miss, not marked as used)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def put(self, key: str, value: Any):
+        """
+        Store a JSON-serializable value, evicting old entries if over the cap.
+
+        Values that cannot be JSON-encoded natively are stored via str().
+        """
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        size = len(payload.encode('utf-8'))
+
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time())
+            )
+            self.conn.commit()
+            self._evict()
+
+    def invalidate(self, prefix: str = "") -> int:
+        """
+        Remove entries whose key starts with prefix (all entries if empty).
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                "DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+            self.conn.commit()
+            return cursor.rowcount
+
+    def total_bytes(self) -> int:
+        """Total size of stored values in bytes."""
+        with self._lock:
+            row = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return int(row[0])
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'total_bytes': self.total_bytes(),
+            'max_bytes': self.max_bytes
+        }
+
+    def close(self):
+        """Close database connection."""
+        with self._lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+
+    def _evict(self):
+        """Drop least-recently-used entries until under max_bytes."""
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+
+        freed = 0
+        victims = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+
+        self.conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.conn.commit()
+        self.evictions += len(victims)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Page Raster Cache
+
+In-memory cache of rendered PDF pages shared by the extraction agents.
+Each page is rasterized once at the highest DPI any agent needs; zone crops
+are numpy slices of that raster, resampled to the caller's DPI.
+
+Without it, every equation/table/figure zone calls page.get_pixmap(clip=...)
+on its own, so a page with six equations is rendered six times.
+
+Key Features:
+    - One render per page at the cache DPI (max of the agents' DPIs)
+    - Crops resampled with Lanczos to the requested DPI
+    - Memory cap in bytes with LRU eviction of whole pages
+    - Hit/miss/eviction counters for reporting
+    - Thread-safe (one lock around the page table)
+
+Requests above the cache DPI are rendered directly (never upsampled).
+
+Author: Claude Code
+Created: 2025-11-17
+"""
+
+import sys
+import os
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Sequence, Tuple
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+__all__ = ['PageRasterCache', 'pixmap_to_array', 'render_clip']
+
+# Identity tokens for documents without a file of their own (see _document_key)
+_DOCUMENT_TOKENS = itertools.count(1)
+
+
+def pixmap_to_array(pix: fitz.Pixmap) -> np.ndarray:
+    """HxWx3 RGB uint8 copy of a pixmap (alpha dropped, gray expanded)."""
+    image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    if pix.n == 1:
+        image = np.repeat(image, 3, axis=2)
+    return np.ascontiguousarray(image[:, :, :3])
+
+
+def render_clip(page: fitz.Page, rect: Sequence[float], dpi: float) -> np.ndarray:
+    """Render one region of a page directly (the uncached path)."""
+    zoom = dpi / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=fitz.Rect(rect))
+    return pixmap_to_array(pix)
+
+
+class PageRasterCache:
+    """
+    Whole-page RGB rasters with LRU eviction, cropped and resampled on demand.
+
+    Pages are keyed by (document, page number). An unmodified file-backed
+    document is identified by its file (path, size, mtime), so agents holding
+    their own fitz documents of the same PDF share entries; in-memory and
+    edited documents are only ever matched with themselves.
+
+    Example:
+        >>> cache = PageRasterCache(dpi=300, max_bytes=512 * 1024**2)
+        >>> equation = cache.crop(doc[3], fitz.Rect(72, 100, 300, 140), dpi=216)
+        >>> table = cache.crop(doc[3], fitz.Rect(72, 300, 540, 600), dpi=150)
+        >>> cache.get_statistics()['hits']
+        1
+    """
+
+    def __init__(self, dpi: float = 300, max_bytes: int = 768 * 1024 * 1024):
+        """
+        Create an empty cache.
+
+        Args:
+            dpi: Render resolution of cached pages (highest DPI any caller needs)
+            max_bytes: Total size cap for cached rasters (default 768 MB,
+                       ~30 letter pages at 300 DPI)
+        """
+        self.dpi = dpi
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.direct_renders = 0
+
+        self._pages: "OrderedDict[Tuple[tuple, int], np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def page_raster(self, page: fitz.Page) -> np.ndarray:
+        """
+        Full page at the cache DPI, rendered on first use.
+
+        Returns:
+            HxWx3 RGB uint8 array (shared - do not modify in place)
+        """
+        with self._lock:
+            key = (self._document_key(page.parent), page.number)
+            raster = self._pages.get(key)
+            if raster is not None:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return raster
+            self.misses += 1
+
+            zoom = self.dpi / 72
+            raster = pixmap_to_array(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)))
+            raster.setflags(write=False)
+
+            self._pages[key] = raster
+            self._bytes += raster.nbytes
+            self._evict(keep=key)
+        return raster
+
+    @staticmethod
+    def _document_key(doc: fitz.Document) -> tuple:
+        """
+        Identity of a document's content.
+
+        Unmodified file-backed documents: ('file', real path, size, mtime), shared
+        by every handle on that file. Others (in-memory, edited, or file gone): a
+        token stored on the document object, so two such documents never collide.
+        """
+        name = doc.name
+        if name and not doc.is_dirty and os.path.isfile(name):
+            stat = os.stat(name)
+            return ('file', os.path.realpath(name), stat.st_size, stat.st_mtime_ns)
+
+        token = getattr(doc, '_raster_cache_token', None)
+        if token is None:
+            token = doc._raster_cache_token = next(_DOCUMENT_TOKENS)
+        return ('document', token)
+
+    def crop(self, page: fitz.Page, rect: Sequence[float], dpi: float) -> np.ndarray:
+        """
+        Region of a page at the requested DPI.
+
+        Args:
+            page: PyMuPDF page
+            rect: Region in PDF points, top-left origin (x0, y0, x1, y1)
+            dpi: Output resolution
+
+        Returns:
+            HxWx3 RGB uint8 array (a fresh copy, safe to modify)
+        """
+        if dpi > self.dpi:
+            with self._lock:
+                self.direct_renders += 1
+            return render_clip(page, rect, dpi)
+
+        # Region in page coordinates (clipped to the page like get_pixmap's clip)
+        region = fitz.Rect(rect) & page.rect
+        if region.is_empty:
+            return np.zeros((0, 0, 3), dtype=np.uint8)
+
+        # Same pixel rounding as get_pixmap(clip=...) at the cache DPI
+        raster = self.page_raster(page)
+        offset = page.rect.top_left
+        box = (region - (offset.x, offset.y, offset.x, offset.y)) * fitz.Matrix(self.dpi / 72, self.dpi / 72)
+        x0, y0, x1, y1 = box.round()
+        crop = raster[y0:y1, x0:x1]
+
+        if dpi == self.dpi:
+            return crop.copy()
+
+        # Target size as a direct render at dpi would produce
+        out = (region - (offset.x, offset.y, offset.x, offset.y)) * fitz.Matrix(dpi / 72, dpi / 72)
+        width, height = max(1, out.round().width), max(1, out.round().height)
+        resized = Image.fromarray(crop).resize((width, height), Image.LANCZOS)
+        return np.array(resized)
+
+    def clear(self):
+        """Drop all cached pages (counters are kept)."""
+        with self._lock:
+            self._pages.clear()
+            self._bytes = 0
+
+    def total_bytes(self) -> int:
+        """Total size of cached rasters in bytes."""
+        return self._bytes
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        with self._lock:
+            return {
+                'dpi': self.dpi,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'direct_renders': self.direct_renders,
+                'pages': len(self._pages),
+                'total_bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def _evict(self, keep: Tuple[tuple, int]):
+        """Drop least-recently-used pages until under max_bytes (never the page just added)."""
+        while self._bytes > self.max_bytes and len(self._pages) > 1:
+            key, raster = next(iter(self._pages.items()))
+            if key == keep:
+                break
+            del self._pages[key]
+            self._bytes -= raster.nbytes
+            self.evictions += 1
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Page Text Index
+
+Per-page index of text blocks for caption, note and context search. The
+table agent and the caption extractors look for text near an object
+("Table N" above it, "Note:" blocks below it, variable definitions around
+an equation) and used to rebuild block text from the page dict and scan
+every block again for each object. The index does that work once per
+page; lookups are bisections over the sorted block tops and bottoms.
+
+Key Features:
+    - Text blocks (bbox, text) sorted by top y
+    - Interval lookups: blocks starting in [top, bottom], blocks overlapping
+      a band, blocks within N points below/above a bbox
+    - Regex search over the pre-extracted page text and block texts
+    - Span-level lookups (equation numbers) and text inside a rectangle
+    - Built from PdfDocumentSession's cached page dict/text and cached by
+      the session like any other text result (session.text_index(page))
+
+    >>> index = session.text_index(page_idx)
+    >>> notes = [b for b in index.blocks_below(table_bottom, 250) if b.text.startswith("Note")]
+    >>> index.search(r'Table\\s+\\d+[^\\n]+', re.IGNORECASE)
+
+Indexes are shared between consumers - treat them as read-only.
+
+Author: Claude Code
+Created: 2025-11-17
+"""
+
+import sys
+import os
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+__all__ = ['PageTextIndex', 'TextBlock']
+
+
+@dataclass(frozen=True)
+class TextBlock:
+    """One text block of a page (PyMuPDF dict block)."""
+    bbox: Tuple[float, float, float, float]
+    text: str           # Spans concatenated, lines separated by a space
+    span_text: str      # Every span followed by a space (caption extractors' form)
+    spans: Tuple[Tuple[str, Tuple[float, float, float, float]], ...]  # (text, bbox) in reading order
+    lines: Tuple[Tuple[float, float, float, float], ...]              # Line bboxes (same order as line_texts)
+    line_texts: Tuple[str, ...]
+
+    @property
+    def top(self) -> float:
+        return self.bbox[1]
+
+    @property
+    def bottom(self) -> float:
+        return self.bbox[3]
+
+
+class PageTextIndex:
+    """
+    Text blocks of one page, sorted by y, with interval and regex lookups.
+
+    Example:
+        >>> index = PageTextIndex(page.get_text("dict"), page.get_text())
+        >>> for block in index.blocks_below(300.0, 250):
+        ...     print(block.top, block.text)
+    """
+
+    def __init__(self, page_dict: Dict[str, Any], page_text: str = ""):
+        """
+        Build the index.
+
+        Args:
+            page_dict: page.get_text("dict") (only text blocks are indexed)
+            page_text: page.get_text("text") for full-page regex search
+        """
+        self.text = page_text
+        self.width = page_dict.get("width", 0.0)
+        self.height = page_dict.get("height", 0.0)
+
+        blocks = []
+        for block in page_dict.get("blocks", []):
+            if "lines" not in block:
+                continue
+
+            text, span_text = "", ""
+            spans, lines, line_texts = [], [], []
+            for line in block["lines"]:
+                line_text = ""
+                for span in line["spans"]:
+                    line_text += span["text"]
+                    span_text += span["text"] + " "
+                    spans.append((span["text"], tuple(span["bbox"])))
+                text += line_text + " "
+                lines.append(tuple(line["bbox"]))
+                line_texts.append(line_text)
+
+            blocks.append(TextBlock(
+                bbox=tuple(block["bbox"]),
+                text=text.strip(),
+                span_text=span_text.strip(),
+                spans=tuple(spans),
+                lines=tuple(lines),
+                line_texts=tuple(line_texts)
+            ))
+
+        # Sorted by top (stable: blocks on one baseline keep reading order)
+        self.blocks: List[TextBlock] = sorted(blocks, key=lambda b: b.top)
+        self._tops = [block.top for block in self.blocks]
+        self._max_height = max((block.bottom - block.top for block in self.blocks), default=0.0)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def blocks_between(self, top: float, bottom: float) -> List[TextBlock]:
+        """Blocks whose top edge lies in [top, bottom], in y order."""
+        return self.blocks[bisect_left(self._tops, top):bisect_right(self._tops, bottom)]
+
+    def blocks_overlapping(self, top: float, bottom: float) -> List[TextBlock]:
+        """Blocks whose vertical extent overlaps [top, bottom], in y order."""
+        candidates = self.blocks[bisect_left(self._tops, top - self._max_height):bisect_right(self._tops, bottom)]
+        return [block for block in candidates if block.bottom >= top]
+
+    def blocks_below(self, y: float, within: float) -> List[TextBlock]:
+        """Blocks starting at most `within` points below y (e.g. a table's bottom edge)."""
+        return self.blocks_between(y, y + within)
+
+    def blocks_above(self, y: float, within: float) -> List[TextBlock]:
+        """Blocks ending at most `within` points above y (e.g. a table's top edge), nearest last."""
+        candidates = self.blocks_overlapping(y - within, y)
+        return [block for block in candidates if block.bottom <= y]
+
+    def search(self, pattern, flags: int = 0) -> List[Any]:
+        """re.findall over the page text."""
+        return re.findall(pattern, self.text, flags)
+
+    def find_blocks(self, pattern, flags: int = 0,
+                    blocks: Optional[Sequence[TextBlock]] = None) -> List[TextBlock]:
+        """Blocks (default: all, in y order) whose text matches pattern."""
+        regex = re.compile(pattern, flags) if isinstance(pattern, str) else pattern
+        return [block for block in (self.blocks if blocks is None else blocks) if regex.search(block.text)]
+
+    def find_span(self, pattern, flags: int = 0) -> Optional[Tuple[str, Tuple[float, float, float, float]]]:
+        """First span (in y order) whose text matches pattern: (text, bbox), or None."""
+        regex = re.compile(pattern, flags) if isinstance(pattern, str) else pattern
+        for block in self.blocks:
+            for text, bbox in block.spans:
+                if regex.search(text):
+                    return text, bbox
+        return None
+
+    def text_in(self, rect: Sequence[float]) -> str:
+        """
+        Text of the lines inside rect (x0, y0, x1, y1), one line per row.
+
+        A line belongs to the rectangle when its center does - a line-level
+        version of page.get_textbox(rect) without re-parsing the page.
+        """
+        x0, y0, x1, y1 = rect
+        rows = []
+        for block in self.blocks_overlapping(y0, y1):
+            for (lx0, ly0, lx1, ly1), line_text in zip(block.lines, block.line_texts):
+                if x0 <= (lx0 + lx1) / 2 <= x1 and y0 <= (ly0 + ly1) / 2 <= y1:
+                    rows.append(line_text)
+        return "\n".join(rows)
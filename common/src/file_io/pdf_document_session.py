@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PDF Document Session
+
+One parsed PDF shared by every stage of a pipeline run. Opening the same
+file in each agent re-parses the xref table and page tree every time, and
+agents scanning full-page text (reference inventory, caption search,
+bibliography fallback, equation context) repeat the same get_text() calls.
+
+Key Features:
+    - One fitz.Document for the whole run
+    - Per-page get_text() cache (text / dict / blocks / words) with an
+      entry cap and LRU eviction - "dict" output can be large on big books
+    - Per-page PageTextIndex (text blocks sorted by y, interval and regex
+      lookups) for caption, note and context search, cached the same way
+    - Hit/miss counters for reporting
+    - Deterministic close (context manager), not __del__
+    - Thread-safe cache access (one lock around the document)
+
+Consumers take an optional session and fall back to a private one, so they
+still work standalone:
+
+    >>> with PdfDocumentSession(pdf_path) as session:
+    ...     inventory = DocumentReferenceInventoryAgent(pdf_path, document_session=session)
+    ...     agent = TableExtractionAgent(pdf_path, output_dir, document_session=session)
+
+Cached results are shared between consumers - treat them as read-only.
+
+Author: Claude Code
+Created: 2025-11-17
+"""
+
+import sys
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import fitz  # PyMuPDF
+
+from .page_text_index import PageTextIndex
+
+__all__ = ['PdfDocumentSession']
+
+
+class PdfDocumentSession:
+    """
+    Shared fitz document plus cached per-page text extraction.
+
+    Example:
+        >>> session = PdfDocumentSession(Path("chapter4.pdf"))
+        >>> text = session.page_text(3)            # parsed once
+        >>> blocks = session.page_dict(3)["blocks"]
+        >>> session.close()
+    """
+
+    def __init__(self, pdf_path: Path, max_cached_entries: int = 512):
+        """
+        Open the document.
+
+        Args:
+            pdf_path: PDF to open
+            max_cached_entries: Cached (page, option) results before LRU eviction
+
+        Raises:
+            FileNotFoundError: If the PDF does not exist
+        """
+        self.pdf_path = Path(pdf_path)
+        if not self.pdf_path.exists():
+            raise FileNotFoundError(f"PDF not found: {self.pdf_path}")
+
+        self.max_cached_entries = max_cached_entries
+        self.doc = fitz.open(str(self.pdf_path))
+
+        self.hits = 0
+        self.misses = 0
+
+        self._text: "OrderedDict[Tuple[int, str], Any]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc)
+
+    def __getitem__(self, page_index: int) -> fitz.Page:
+        return self.doc[page_index]
+
+    def __enter__(self) -> 'PdfDocumentSession':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self.doc is None or self.doc.is_closed
+
+    def get_text(self, page_index: int, option: str = "text") -> Any:
+        """
+        Full-page page.get_text(option), computed once per page.
+
+        Args:
+            page_index: 0-indexed page
+            option: PyMuPDF text option ("text", "dict", "blocks", "words", ...)
+
+        Returns:
+            Cached extraction result (shared - do not modify)
+        """
+        key = (page_index, option)
+        with self._lock:
+            if key in self._text:
+                self._text.move_to_end(key)
+                self.hits += 1
+                return self._text[key]
+            self.misses += 1
+
+            result = self.doc[page_index].get_text(option)
+            self._text[key] = result
+            while len(self._text) > self.max_cached_entries:
+                self._text.popitem(last=False)
+        return result
+
+    def page_text(self, page_index: int) -> str:
+        """Plain text of a page."""
+        return self.get_text(page_index, "text")
+
+    def page_dict(self, page_index: int) -> Dict[str, Any]:
+        """get_text("dict") of a page (blocks → lines → spans)."""
+        return self.get_text(page_index, "dict")
+
+    def page_blocks(self, page_index: int) -> list:
+        """get_text("blocks") of a page: (x0, y0, x1, y1, text, block_no, block_type)."""
+        return self.get_text(page_index, "blocks")
+
+    def text_index(self, page_index: int) -> PageTextIndex:
+        """
+        PageTextIndex of a page, built once from the cached dict and text.
+
+        Args:
+            page_index: 0-indexed page
+
+        Returns:
+            Cached index (shared - do not modify)
+        """
+        key = (page_index, "index")
+        with self._lock:
+            if key in self._text:
+                self._text.move_to_end(key)
+                self.hits += 1
+                return self._text[key]
+
+            index = PageTextIndex(self.page_dict(page_index), self.page_text(page_index))
+            self._text[key] = index
+            while len(self._text) > self.max_cached_entries:
+                self._text.popitem(last=False)
+        return index
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Text cache hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            'pages': len(self.doc) if not self.closed else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'cached_entries': len(self._text)
+        }
+
+    def close(self):
+        """Close the document and drop cached text (idempotent)."""
+        with self._lock:
+            self._text.clear()
+            if self.doc is not None and not self.doc.is_closed:
+                self.doc.close()
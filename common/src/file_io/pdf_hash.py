@@ -11,6 +11,8 @@ Key Features:
     - SHA256 hashing for reliable content identification
     - Handles large files efficiently with chunked reading
     - Returns hash with 'sha256:' prefix for registry compatibility
+    - Per-page content hashes for page-level caches (detection cache)
+    - Per-page fingerprints (text layer + images) for incremental re-extraction
 
 Author: V11 Development Team
 Created: 2025-10-03
@@ -18,7 +20,9 @@ Created: 2025-10-03
 
 import sys
 import os
+import re
 from pathlib import Path
+from typing import Dict, Optional
 import hashlib
 
 # Set UTF-8 encoding for Windows console
@@ -37,6 +41,150 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
+__all__ = ['compute_file_hash', 'compute_page_hash', 'compute_page_fingerprint',
+           'compute_pdf_hash', 'verify_pdf_unchanged']
+
+
+def compute_file_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute SHA256 hash of any file (e.g. model weights).
+
+    Args:
+        file_path: Path to file
+        chunk_size: Size of chunks to read (default 1MB)
+
+    Returns:
+        str: Hash in format 'sha256:hexdigest'
+
+    Raises:
+        FileNotFoundError: If file does not exist
+    """
+    file_path = Path(file_path)
+
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    sha256_hash = hashlib.sha256()
+    with file_path.open('rb') as f:
+        while chunk := f.read(chunk_size):
+            sha256_hash.update(chunk)
+
+    return f"sha256:{sha256_hash.hexdigest()}"
+
+
+# Indirect reference "12 0 R" inside a PDF object's source
+_REFERENCE = re.compile(r'\b(\d+)\s+\d+\s+R\b')
+
+
+def _page_resources(page) -> str:
+    """Source of the page's /Resources (own or inherited from the page tree)."""
+    doc = page.parent
+    xref = page.xref
+    for _ in range(64):  # Page tree depth guard
+        kind, value = doc.xref_get_key(xref, "Resources")
+        if kind != "null":
+            return value
+        kind, value = doc.xref_get_key(xref, "Parent")
+        match = _REFERENCE.search(value) if kind == "xref" else None
+        if not match:
+            break
+        xref = int(match.group(1))
+    return ""
+
+
+def _object_digest(doc, xref: int) -> bytes:
+    """Digest of one object: its source with references blanked, plus its raw stream."""
+    source = doc.xref_object(xref, compressed=True)
+    object_hash = hashlib.sha256(_REFERENCE.sub('R', source).encode('utf-8'))
+    if doc.xref_is_stream(xref):
+        object_hash.update(doc.xref_stream_raw(xref) or b"")
+    return object_hash.digest()
+
+
+def compute_page_hash(page, object_digests: Optional[Dict[int, bytes]] = None) -> str:
+    """
+    Compute SHA256 hash of what a single PDF page renders from.
+
+    Covers the page geometry, its content stream(s) and everything its
+    resources resolve to, recursively: images, fonts, and Form XObjects with
+    their own streams and nested resources. Pages built with show_pdf_page
+    (content stream just "q /fzFrm0 Do Q") are told apart by their forms. Object
+    numbers are left out, so untouched pages of a renumbered revision keep
+    their hash while edited, rotated or re-imaged pages get a new one.
+
+    Args:
+        page: PyMuPDF page object
+        object_digests: Optional per-document memo (xref -> digest), so
+            resources shared by many pages (fonts, logos) are hashed once
+
+    Returns:
+        str: Hash in format 'sha256:hexdigest'
+    """
+    doc = page.parent
+    sha256_hash = hashlib.sha256()
+    if object_digests is None:
+        object_digests = {}
+
+    sha256_hash.update(repr((tuple(page.rect), page.rotation)).encode('utf-8'))
+    sha256_hash.update(page.read_contents())
+
+    # Walk the resource graph in source order (breadth-first, each object once)
+    resources = _page_resources(page)
+    sha256_hash.update(_REFERENCE.sub('R', resources).encode('utf-8'))
+
+    pending = [int(m.group(1)) for m in _REFERENCE.finditer(resources)]
+    seen = set()
+    xref_count = doc.xref_length()
+    while pending:
+        xref = pending.pop(0)
+        if xref in seen or not 0 < xref < xref_count:
+            continue
+        seen.add(xref)
+        try:
+            if xref not in object_digests:
+                object_digests[xref] = _object_digest(doc, xref)
+            sha256_hash.update(object_digests[xref])
+            pending.extend(int(m.group(1)) for m in _REFERENCE.finditer(doc.xref_object(xref, compressed=True)))
+        except Exception:
+            sha256_hash.update(f"unreadable:{xref}".encode('utf-8'))
+
+    return f"sha256:{sha256_hash.hexdigest()}"
+
+
+def compute_page_fingerprint(page) -> str:
+    """
+    Compute a fingerprint of what a reader sees on a page.
+
+    Built from the text layer (words with positions, rounded to 0.1 pt) and the
+    images drawn on the page (content digest + placement), so a publisher's
+    re-export with a rewritten content stream but identical text and images keeps
+    its fingerprint, while an erratum that changes a word or an image does not.
+
+    Args:
+        page: PyMuPDF page object
+
+    Returns:
+        str: Fingerprint in format 'sha256:hexdigest'
+    """
+    sha256_hash = hashlib.sha256()
+
+    sha256_hash.update(repr((round(page.rect.width, 1), round(page.rect.height, 1),
+                             page.rotation)).encode('utf-8'))
+
+    text_hash = hashlib.sha256()
+    for x0, y0, x1, y1, word, *_ in page.get_text("words"):
+        text_hash.update(f"{x0:.1f},{y0:.1f},{x1:.1f},{y1:.1f}:{word}\n".encode('utf-8'))
+    sha256_hash.update(text_hash.digest())
+
+    image_hash = hashlib.sha256()
+    for info in page.get_image_info(hashes=True, xrefs=True):
+        digest = info.get('digest') or b""
+        bbox = ",".join(f"{v:.1f}" for v in info.get('bbox', ()))
+        image_hash.update(bytes(digest) + bbox.encode('utf-8'))
+    sha256_hash.update(image_hash.digest())
+
+    return f"sha256:{sha256_hash.hexdigest()}"
+
 
 def compute_pdf_hash(pdf_path: Path, chunk_size: int = 8192) -> str:
     """
@@ -100,6 +100,11 @@ class CentralizedCoreManager:
                 'priority': 5,
                 'core_percentage': 0.3  # 30% of available cores
             },
+            'docling_conversion': {
+                'max_workers': 8,
+                'priority': 7,
+                'core_percentage': 0.5  # 50% of available cores (page-range shards)
+            },
             'default': {
                 'max_workers': 4,
                 'priority': 5,
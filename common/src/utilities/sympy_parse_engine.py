@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SymPy Parse Engine - Parallel LaTeX Parsing with Timeouts and Memoization
+
+Runs the SymPy work on equation LaTeX (parse_latex, srepr, target variable,
+simplify, solve) on a pool of worker processes. SymPy has no time limit of
+its own, and a single pathological expression can keep simplify() or
+solve() busy for minutes; here every equation gets a hard timeout, after
+which its worker is terminated and replaced and the batch carries on.
+
+Results are memoized by normalized LaTeX (whitespace collapsed), so the
+same string is never parsed twice in one run - neither duplicate equations
+in equations_file nor the repeated validations of the re-extraction loop.
+
+Workers are spawned, so each one imports this module by its package path.
+It lives in common/src/utilities (whose packages import nothing) rather than
+next to its callers, whose package chain pulls in doclayout_yolo and torch.
+
+Used by:
+    - SymPyEquationParser.process_all_equations (analyze)
+    - LaTeXQualityValidator.validate (parse only)
+
+Modes:
+    analyze: parse + srepr + target variable, then simplify and solve. If
+             the timeout hits after parsing, the parse result is kept and
+             only simplification/solve are lost.
+    parse:   parse_latex only (is the LaTeX parseable?)
+
+Author: Claude Code
+Date: 2025-11-17
+"""
+
+import sys
+import os
+import re
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# MANDATORY UTF-8 SETUP - NO EXCEPTIONS
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+# SymPy imports
+try:
+    from sympy.parsing.latex import parse_latex
+    from sympy import srepr, simplify, solve, symbols
+    SYMPY_AVAILABLE = True
+except ImportError:
+    SYMPY_AVAILABLE = False
+
+# Default pool size: every spawned worker pays a full SymPy import
+DEFAULT_WORKERS = 2
+
+
+def normalize_latex(latex: str) -> str:
+    """Memoization key of a LaTeX string: runs of whitespace collapsed, ends stripped."""
+    return re.sub(r'\s+', ' ', latex or '').strip()
+
+
+def identify_target_variable(expr: Any) -> Optional[str]:
+    """
+    Variable to solve for in a parsed equation.
+
+    Heuristics (Phase A):
+    --------------------
+    1. If equation form "var = expression", target is "var"
+    2. If equation has single variable on one side, that's target
+    3. Otherwise, identify leftmost variable as likely target
+
+    Returns:
+        Target variable symbol name (e.g., "q", "h", "Nu"), or None
+    """
+    try:
+        # Check if equation (Eq) or inequality
+        if hasattr(expr, 'lhs') and hasattr(expr, 'rhs'):
+            # Get free symbols from both sides
+            lhs_symbols = expr.lhs.free_symbols
+            rhs_symbols = expr.rhs.free_symbols
+
+            # If LHS has single symbol not on RHS, that's likely target
+            if len(lhs_symbols) == 1 and lhs_symbols.isdisjoint(rhs_symbols):
+                return str(list(lhs_symbols)[0])
+
+            # If RHS has single symbol not on LHS, that's likely target
+            if len(rhs_symbols) == 1 and rhs_symbols.isdisjoint(lhs_symbols):
+                return str(list(rhs_symbols)[0])
+
+        # Fallback: Return first symbol alphabetically (deterministic)
+        all_symbols = expr.free_symbols
+        if all_symbols:
+            return str(sorted([str(s) for s in all_symbols])[0])
+
+        return None
+
+    except Exception:
+        return None
+
+
+def parse_only(latex: str) -> Dict[str, Any]:
+    """parse_latex() check: {'success', 'error', 'timed_out'}."""
+    try:
+        parse_latex(latex)
+        return {'success': True, 'error': None, 'timed_out': False}
+    except Exception as e:
+        return {'success': False, 'error': str(e), 'timed_out': False}
+
+
+def analyze_latex(latex: str, on_parsed: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Full SymPy analysis of one (cleaned) LaTeX string.
+
+    Args:
+        latex: LaTeX to parse
+        on_parsed: Called with a copy of the result once parse, srepr and
+                   target are known (before simplify/solve, which may hang)
+
+    Returns:
+        Dict with success, error, srepr, target_variable, simplification,
+        solved_form, timed_out
+    """
+    result = {
+        'success': False,
+        'error': None,
+        'srepr': None,
+        'target_variable': None,
+        'simplification': None,
+        'solved_form': None,
+        'timed_out': False
+    }
+
+    try:
+        expr = parse_latex(latex)
+        result['success'] = True
+        result['srepr'] = srepr(expr)
+        target = identify_target_variable(expr)
+        result['target_variable'] = target
+    except Exception as e:
+        result['success'] = False
+        result['error'] = f"SymPy parse failed: {str(e)}"
+        return result
+
+    if on_parsed is not None:
+        on_parsed(dict(result))
+
+    # Attempt simplification
+    try:
+        result['simplification'] = str(simplify(expr))
+    except Exception:
+        pass  # Simplification optional
+
+    # Attempt solve for target (if target identified)
+    if target and hasattr(expr, 'lhs') and hasattr(expr, 'rhs'):
+        try:
+            solved = solve(expr, symbols(target))
+            if solved:
+                result['solved_form'] = str(solved[0]) if isinstance(solved, list) else str(solved)
+        except Exception:
+            pass  # Solve failure doesn't block code-gen with srepr
+
+    return result
+
+
+class SymPyParseEngine:
+    """
+    SymPy parsing on persistent worker processes, memoized by normalized LaTeX.
+
+    Example:
+        >>> engine = SymPyParseEngine(num_workers=4, timeout=30)
+        >>> results = engine.analyze([r"q = -k A \\frac{dT}{dx}", r"h = \\frac{q}{A \\Delta T}"])
+        >>> results[0]['srepr'], results[0]['target_variable']
+        >>> engine.parse([r"x^{2"])[0]['success']
+        False
+        >>> engine.get_statistics()['timeouts']
+        >>> engine.close()
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, timeout: float = 30.0):
+        """
+        Configure the engine (workers start on first use).
+
+        Args:
+            num_workers: Worker processes (None = DEFAULT_WORKERS, capped at the
+                         CPU count; 0 = parse in this process, without timeout)
+            timeout: Seconds one equation may take before its worker is replaced
+
+        Raises:
+            ImportError: If SymPy is not installed
+        """
+        if not SYMPY_AVAILABLE:
+            raise ImportError("SymPy not available. Install with: pip install sympy")
+
+        if num_workers is None:
+            num_workers = min(DEFAULT_WORKERS, os.cpu_count() or 1)
+        self.num_workers = max(0, num_workers)
+        self.timeout = timeout
+
+        # (mode, normalized LaTeX) → result
+        self._cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        self.equations = 0
+        self.cache_hits = 0
+        self.parsed = 0
+        self.timeouts = 0
+        self.worker_restarts = 0
+        self.seconds = 0.0
+
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: Dict[int, Dict[str, Any]] = {}
+        self._next_worker_id = 0
+        self._started = False
+
+    def analyze(self, latex_list: Sequence[str], labels: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Full analysis (see analyze_latex) of each LaTeX string.
+
+        Args:
+            latex_list: LaTeX strings (already cleaned)
+            labels: Optional names (e.g. equation IDs) for messages
+
+        Returns:
+            Result dicts in input order
+        """
+        return self._run('analyze', latex_list, labels)
+
+    def parse(self, latex_list: Sequence[str], labels: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        parse_latex() check of each LaTeX string.
+
+        Returns:
+            {'success', 'error', 'timed_out'} dicts in input order
+        """
+        return self._run('parse', latex_list, labels)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Equations, cache hits, timeouts and throughput."""
+        return {
+            'workers': self.num_workers,
+            'timeout': self.timeout,
+            'equations': self.equations,
+            'cache_hits': self.cache_hits,
+            'parsed': self.parsed,
+            'timeouts': self.timeouts,
+            'worker_restarts': self.worker_restarts,
+            'parse_seconds': self.seconds,
+            'equations_per_second': self.equations / self.seconds if self.seconds > 0 else 0.0
+        }
+
+    def clear_cache(self):
+        """Forget memoized results."""
+        self._cache.clear()
+
+    def close(self):
+        """Stop the workers (idempotent)."""
+        for worker_id in list(self._workers):
+            worker = self._workers.pop(worker_id)
+            try:
+                worker['conn'].send(None)
+            except (OSError, EOFError):
+                pass
+            worker['process'].join(timeout=5)
+            if worker['process'].is_alive():
+                worker['process'].terminate()
+                worker['process'].join()
+            worker['conn'].close()
+        self._started = False
+
+    def _run(self, mode: str, latex_list: Sequence[str], labels: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+        """Answer from the cache where possible, compute each distinct missing string once."""
+        start = time.perf_counter()
+        labels = labels or [f"equation {index + 1}" for index in range(len(latex_list))]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(latex_list)
+
+        missing: Dict[Tuple[str, str], List[int]] = {}
+        for index, latex in enumerate(latex_list):
+            key = (mode, normalize_latex(latex))
+            cached = self._lookup(key)
+            if cached is not None:
+                results[index] = cached
+                self.cache_hits += 1
+            else:
+                missing.setdefault(key, []).append(index)
+
+        keys = list(missing)
+        computed = self._compute(mode, [latex for _, latex in keys], [labels[missing[key][0]] for key in keys])
+        for key, result in zip(keys, computed):
+            self._cache[key] = result
+            for index in missing[key]:
+                results[index] = result
+        self.cache_hits += sum(len(indices) - 1 for indices in missing.values())
+
+        self.equations += len(latex_list)
+        self.parsed += len(keys)
+        self.seconds += time.perf_counter() - start
+        # Copies: callers must not change the memoized results
+        return [dict(result) for result in results]
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Memoized result; a full analysis also answers a parse-only query."""
+        mode, latex = key
+        if key in self._cache:
+            return self._cache[key]
+        if mode == 'parse' and ('analyze', latex) in self._cache:
+            analyzed = self._cache[('analyze', latex)]
+            return {'success': analyzed['success'], 'error': analyzed['error'],
+                    'timed_out': analyzed['timed_out']}
+        return None
+
+    def _compute(self, mode: str, latex_list: List[str], labels: List[str]) -> List[Dict[str, Any]]:
+        """Results for strings not in the cache (in this process or on the workers)."""
+        if not latex_list:
+            return []
+        if self.num_workers == 0:
+            return [analyze_latex(latex) if mode == 'analyze' else parse_only(latex) for latex in latex_list]
+
+        if not self._started:
+            print(f"🔧 Starting {self.num_workers} SymPy worker processes (timeout {self.timeout:.0f}s)...")
+            for _ in range(self.num_workers):
+                self._spawn_worker()
+            self._started = True
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(latex_list)
+        partial: Dict[int, Dict[str, Any]] = {}
+        done = [False] * len(latex_list)
+        queued = deque(range(len(latex_list)))
+        remaining = len(latex_list)
+
+        while remaining:
+            if not self._workers:
+                print(f"    ❌ No SymPy workers left - {remaining} equations not parsed")
+                break
+
+            # Dispatch to idle workers; the timeout clock starts now
+            for worker in self._workers.values():
+                if worker['ready'] and worker['task'] is None and queued:
+                    index = queued.popleft()
+                    worker['conn'].send((index, mode, latex_list[index]))
+                    worker['task'] = index
+                    worker['deadline'] = time.monotonic() + self.timeout
+
+            deadlines = [w['deadline'] for w in self._workers.values() if w['task'] is not None]
+            wait_seconds = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+            handles = {}
+            for worker_id, worker in self._workers.items():
+                handles[worker['conn']] = worker_id
+                handles[worker['process'].sentinel] = worker_id
+            ready = wait(list(handles), timeout=wait_seconds)
+
+            for handle in ready:
+                worker_id = handles[handle]
+                worker = self._workers.get(worker_id)
+                if worker is None:
+                    continue  # Already handled through its other handle
+                while worker_id in self._workers and worker['conn'].poll():
+                    remaining -= self._receive(worker_id, results, partial, done, labels, mode)
+                if worker_id in self._workers and not worker['process'].is_alive():
+                    remaining -= self._replace_worker(worker_id, results, partial, done, labels, mode,
+                                                      "worker process died")
+
+            # Equations past their deadline cost their worker
+            now = time.monotonic()
+            for worker_id, worker in list(self._workers.items()):
+                if worker['task'] is not None and now >= worker['deadline']:
+                    self.timeouts += 1
+                    remaining -= self._replace_worker(worker_id, results, partial, done, labels, mode,
+                                                      f"timed out after {self.timeout:.0f}s")
+
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = self._failed(mode, partial.get(index), "SymPy worker unavailable")
+        return results
+
+    def _receive(self, worker_id: int, results: List[Optional[Dict[str, Any]]],
+                 partial: Dict[int, Dict[str, Any]], done: List[bool],
+                 labels: Sequence[str], mode: str) -> int:
+        """Handle one message from a worker. Returns 1 if it finished an equation."""
+        worker = self._workers[worker_id]
+        try:
+            kind, payload = worker['conn'].recv()
+        except (EOFError, OSError):
+            return self._replace_worker(worker_id, results, partial, done, labels, mode,
+                                        "worker connection lost")
+
+        if kind == 'ready':
+            worker['ready'] = True
+            return 0
+
+        if kind == 'load_failed':
+            # Not replaced: a replacement would fail to import SymPy the same way
+            print(f"    ❌ SymPy worker could not start: {payload}")
+            self._stop_worker(worker_id)
+            return 0
+
+        if kind == 'partial':
+            index, result = payload
+            partial[index] = result
+            return 0
+
+        index, result = payload
+        worker['task'] = None
+        results[index] = result
+        done[index] = True
+        return 1
+
+    def _replace_worker(self, worker_id: int, results: List[Optional[Dict[str, Any]]],
+                        partial: Dict[int, Dict[str, Any]], done: List[bool],
+                        labels: Sequence[str], mode: str, reason: str) -> int:
+        """Kill a worker, settle its equation and start a fresh worker. Returns 1 if it held an equation."""
+        index = self._workers[worker_id]['task']
+        self._stop_worker(worker_id, kill=True)
+        if index is None or done[index]:
+            print(f"    ⚠️  SymPy worker lost ({reason})")
+            return 0
+
+        print(f"    ⚠️  SymPy {reason} ({labels[index]}) - restarting worker")
+        results[index] = self._failed(mode, partial.get(index), f"SymPy {reason}")
+        done[index] = True
+        self.worker_restarts += 1
+        self._spawn_worker()
+        return 1
+
+    @staticmethod
+    def _failed(mode: str, parsed: Optional[Dict[str, Any]], reason: str) -> Dict[str, Any]:
+        """Result of an equation that did not finish (keeps its parse result if it got that far)."""
+        if parsed is not None:
+            return dict(parsed, timed_out=True)
+        result = {'success': False, 'error': reason, 'timed_out': True}
+        if mode == 'analyze':
+            result.update({'srepr': None, 'target_variable': None,
+                           'simplification': None, 'solved_form': None})
+        return result
+
+    def _spawn_worker(self):
+        """Start one worker process (it reports 'ready' once SymPy is imported)."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_sympy_worker, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+
+        self._workers[self._next_worker_id] = {
+            'process': process,
+            'conn': parent_conn,
+            'ready': False,
+            'task': None,
+            'deadline': None
+        }
+        self._next_worker_id += 1
+
+    def _stop_worker(self, worker_id: int, kill: bool = False):
+        """Remove a worker from the pool (terminating it if asked)."""
+        worker = self._workers.pop(worker_id)
+        if kill and worker['process'].is_alive():
+            worker['process'].terminate()
+        worker['process'].join(timeout=5)
+        worker['conn'].close()
+
+
+# ============================================================================
+# WORKER PROCESS
+# ============================================================================
+
+def _sympy_worker(conn):
+    """
+    Worker process main loop: one equation per message.
+
+    Messages in: (index, mode, latex), or None to stop.
+    Messages out: ('ready', None), ('load_failed', error),
+    ('partial', (index, result)) once an analyzed equation is parsed, and
+    ('result', (index, result)).
+    """
+    if not SYMPY_AVAILABLE:
+        conn.send(('load_failed', "SymPy not available"))
+        conn.close()
+        return
+
+    conn.send(('ready', None))
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        index, mode, latex = task
+        if mode == 'analyze':
+            result = analyze_latex(latex, on_parsed=lambda parsed: conn.send(('partial', (index, parsed))))
+        else:
+            result = parse_only(latex)
+        conn.send(('result', (index, result)))
+
+    conn.close()
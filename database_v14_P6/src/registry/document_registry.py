@@ -111,6 +111,9 @@ class ExtractionMetadata:
     status: str = 'complete'
     error_message: Optional[str] = None
     processing_time_seconds: Optional[float] = None
+    page_manifest: Optional[List[str]] = None  # Per-page fingerprints (pdf_hash.compute_page_fingerprint)
+    parent_extraction_id: Optional[str] = None
+    pages_reprocessed: Optional[int] = None
 
 
 class DocumentRegistry:
@@ -146,14 +149,30 @@ class DocumentRegistry:
 
         # Load and execute schema
         schema_path = Path(__file__).parent / 'schema.sql'
+        if not schema_path.exists():
+            schema_path = Path(__file__).parent.parent / 'schema' / 'schema.sql'
         if schema_path.exists():
             with open(schema_path, 'r', encoding='utf-8') as f:
                 schema_sql = f.read()
                 self.conn.executescript(schema_sql)
                 self.conn.commit()
+            self._migrate_extractions_table()
         else:
             print(f"⚠️  Schema file not found: {schema_path}")
 
+    def _migrate_extractions_table(self):
+        """Add incremental re-extraction columns to databases created before they existed."""
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA table_info(extractions)")
+        existing = {row['name'] for row in cursor.fetchall()}
+
+        for column, column_type in (('page_manifest', 'TEXT'),
+                                    ('parent_extraction_id', 'TEXT'),
+                                    ('pages_reprocessed', 'INTEGER')):
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE extractions ADD COLUMN {column} {column_type}")
+        self.conn.commit()
+
     def close(self):
         """Close database connection."""
         if self.conn:
@@ -347,8 +366,9 @@ class DocumentRegistry:
             INSERT OR REPLACE INTO extractions
             (extraction_id, doc_id, chapter_number, chapter_title, section_id,
              pdf_file, pdf_hash, extraction_date, pipeline_version,
-             output_directory, status, error_message, processing_time_seconds)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             output_directory, status, error_message, processing_time_seconds,
+             page_manifest, parent_extraction_id, pages_reprocessed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             metadata.extraction_id,
             metadata.doc_id,
@@ -362,12 +382,48 @@ class DocumentRegistry:
             metadata.output_directory,
             metadata.status,
             metadata.error_message,
-            metadata.processing_time_seconds
+            metadata.processing_time_seconds,
+            json.dumps(metadata.page_manifest) if metadata.page_manifest else None,
+            metadata.parent_extraction_id,
+            metadata.pages_reprocessed
         ))
 
         self.conn.commit()
         return metadata.extraction_id
 
+    def get_latest_extraction(self, doc_id: str,
+                              chapter_number: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Most recent extraction of a document (parent for incremental re-extraction).
+
+        Args:
+            doc_id: Document identifier
+            chapter_number: Restrict to one chapter
+
+        Returns:
+            Extraction row with page_manifest decoded to a list, or None
+        """
+        cursor = self.conn.cursor()
+
+        query = "SELECT * FROM extractions WHERE doc_id = ?"
+        params: List[Any] = [doc_id]
+
+        if chapter_number is not None:
+            query += " AND chapter_number = ?"
+            params.append(chapter_number)
+
+        query += " ORDER BY extraction_date DESC LIMIT 1"
+
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+
+        if not row:
+            return None
+        extraction = dict(row)
+        if extraction.get('page_manifest'):
+            extraction['page_manifest'] = json.loads(extraction['page_manifest'])
+        return extraction
+
     def get_extraction(self, extraction_id: str) -> Optional[Dict[str, Any]]:
         """Get extraction metadata."""
         cursor = self.conn.cursor()
@@ -104,6 +104,9 @@ CREATE TABLE IF NOT EXISTS extractions (
     status TEXT DEFAULT 'complete' CHECK(status IN ('pending', 'processing', 'complete', 'partial', 'failed')),
     error_message TEXT,
     processing_time_seconds REAL,
+    page_manifest TEXT,  -- JSON array of per-page fingerprints (incremental re-extraction)
+    parent_extraction_id TEXT,  -- Previous extraction this one was derived from
+    pages_reprocessed INTEGER,  -- Pages whose fingerprint changed vs the parent
     FOREIGN KEY (doc_id) REFERENCES documents(doc_id) ON DELETE CASCADE
 );
 
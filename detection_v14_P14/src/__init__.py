@@ -5,6 +5,7 @@ Docling-based detection and unified multi-method detection.
 """
 
 __all__ = [
+    'cache',
     'docling',
     'unified',
 ]
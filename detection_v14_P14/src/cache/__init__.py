@@ -0,0 +1,5 @@
+"""Detection result caching."""
+
+from .detection_cache import DetectionCache
+
+__all__ = ['DetectionCache']
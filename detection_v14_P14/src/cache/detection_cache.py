@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Detection Cache - Content-Addressed Cache for YOLO and Docling Detection
+
+Re-running the pipeline on the same PDF (e.g. after tweaking an extraction
+agent) used to pay full YOLO and Docling detection every time. This cache
+stores detection output on disk, keyed only by things that change the result:
+
+YOLO (per page):
+    (page content hash, model file hash, confidence threshold, render DPI)
+
+Docling (per document):
+    (hash of all page content hashes, Docling version)
+    Docling converts the whole document in one pass and its zone numbering is
+    document-global, so its zones are cached as one unit.
+
+Design Rationale:
+-----------------
+- **Content-Addressed**: Keys are hashes (common/src/file_io/pdf_hash.py), so
+  any change to page content, model weights, threshold, DPI or Docling version
+  produces a new key - invalidation is automatic
+- **Per-Page YOLO**: Revised PDFs only re-detect pages whose content changed
+- **Size Cap**: LRU eviction via DiskLRUCache keeps the cache bounded
+- **JSON Storage**: Detections/Zones stored as plain dicts (no pickle)
+
+Author: Claude Code
+Date: 2025-11-17
+Version: 1.0
+"""
+
+import sys
+import os
+
+# MANDATORY UTF-8 SETUP
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import hashlib
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import fitz
+
+from common.src.base.base_extraction_agent import Zone
+from common.src.file_io.disk_cache import DiskLRUCache
+from common.src.file_io.pdf_hash import compute_file_hash, compute_page_hash
+
+
+def get_docling_version() -> str:
+    """Installed Docling version (part of every Docling cache key)."""
+    try:
+        from importlib.metadata import version
+        return version('docling')
+    except Exception:
+        return 'unknown'
+
+
+class DetectionCache:
+    """
+    On-disk, content-addressed cache for per-page YOLO detections and
+    per-document Docling zones.
+
+    Usage Example:
+    --------------
+    >>> cache = DetectionCache(Path("results/cache"), max_size_mb=512)
+    >>> detector = UnifiedDetectionModule(model_path, cache=cache)
+    >>> zones = detector.detect_all_objects(pdf_path)   # 2nd run: no inference
+    """
+
+    def __init__(self, cache_dir: Path, max_size_mb: int = 512):
+        """
+        Open (or create) the detection cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            max_size_mb: Size cap; least-recently-used entries are evicted beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.store = DiskLRUCache(
+            self.cache_dir / 'detection_cache.db',
+            max_bytes=max_size_mb * 1024 * 1024
+        )
+
+        # In-memory memo so a 40MB+ model file is hashed once per process
+        self._model_hashes: Dict[tuple, str] = {}
+        self._page_hashes: Dict[tuple, Dict[int, str]] = {}
+        self._page_counts: Dict[tuple, int] = {}
+
+    # =========================================================================
+    # KEY PARTS
+    # =========================================================================
+
+    def model_hash(self, model_path: str) -> str:
+        """Content hash of the model weights (memoized by path, size and mtime)."""
+        path = Path(model_path)
+        stat = path.stat()
+        memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime)
+        if memo_key not in self._model_hashes:
+            self._model_hashes[memo_key] = compute_file_hash(path)
+        return self._model_hashes[memo_key]
+
+    def page_hashes(self, pdf_path: Path, pages: Optional[Iterable[int]] = None,
+                    doc: Optional[fitz.Document] = None) -> Dict[int, str]:
+        """
+        Content hashes for pages of a PDF (memoized by path, size and mtime).
+
+        The PDF is only opened when a page hash (or the page count) is not
+        memoized yet, so after a first call with the document open, later
+        calls never touch PyMuPDF.
+
+        Args:
+            pdf_path: Path to PDF file
+            pages: 0-indexed pages to hash (None = all pages)
+            doc: Already-open document of pdf_path to hash from (left open)
+
+        Returns:
+            Dict mapping 0-indexed page number to 'sha256:...' hash
+        """
+        path = Path(pdf_path)
+        stat = path.stat()
+        memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime)
+        known = self._page_hashes.setdefault(memo_key, {})
+
+        if pages is None and memo_key in self._page_counts:
+            pages = range(self._page_counts[memo_key])
+        if pages is not None:
+            pages = list(pages)
+            if all(page_num in known for page_num in pages):
+                return {page_num: known[page_num] for page_num in pages}
+
+        owns_doc = doc is None
+        if owns_doc:
+            doc = fitz.open(str(path))
+        try:
+            self._page_counts[memo_key] = len(doc)
+            wanted = list(range(len(doc)) if pages is None else pages)
+            object_digests: Dict[int, bytes] = {}  # Shared fonts/images hashed once per document
+            for page_num in wanted:
+                if page_num not in known:
+                    known[page_num] = compute_page_hash(doc[page_num], object_digests)
+            return {page_num: known[page_num] for page_num in wanted}
+        finally:
+            if owns_doc:
+                doc.close()
+
+    # =========================================================================
+    # YOLO (PER PAGE)
+    # =========================================================================
+
+    @staticmethod
+    def _yolo_key(page_hash: str, model_hash: str, confidence_threshold: float,
+                  render_dpi: Any) -> str:
+        return f"yolo|{page_hash}|{model_hash}|conf={confidence_threshold!r}|dpi={render_dpi}"
+
+    def get_page_detections(self, page_hash: str, model_hash: str,
+                            confidence_threshold: float, render_dpi: Any) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached raw detections for one page.
+
+        Returns:
+            List of Detection dicts (possibly empty), or None on a miss
+        """
+        return self.store.get(self._yolo_key(page_hash, model_hash, confidence_threshold, render_dpi))
+
+    def has_page_detections(self, page_hash: str, model_hash: str,
+                            confidence_threshold: float, render_dpi: Any) -> bool:
+        """Whether detections for one page are cached (not counted as a hit or miss)."""
+        return self.store.contains(self._yolo_key(page_hash, model_hash, confidence_threshold, render_dpi))
+
+    def put_page_detections(self, page_hash: str, model_hash: str, confidence_threshold: float,
+                            render_dpi: Any, detections: List[Dict[str, Any]]):
+        """Store raw detections (as dicts) for one page."""
+        self.store.put(
+            self._yolo_key(page_hash, model_hash, confidence_threshold, render_dpi),
+            detections
+        )
+
+    # =========================================================================
+    # DOCLING (PER DOCUMENT)
+    # =========================================================================
+
+    def docling_key(self, pdf_path: Path, doc: Optional[fitz.Document] = None) -> str:
+        """
+        Cache key for a document's Docling zones.
+
+        Compute it where the document may be read (the detection threads
+        share one PyMuPDF document, which is not thread-safe) and hand it to
+        get_docling_zones/put_docling_zones.
+
+        Args:
+            pdf_path: Path to PDF file
+            doc: Already-open document of pdf_path to hash from (left open)
+        """
+        page_hashes = self.page_hashes(pdf_path, doc=doc)
+        digest = hashlib.sha256(
+            "\n".join(page_hashes[p] for p in sorted(page_hashes)).encode('utf-8')
+        ).hexdigest()
+        return f"docling|sha256:{digest}|docling={get_docling_version()}"
+
+    def get_docling_zones(self, docling_key: str) -> Optional[Dict[str, List[Zone]]]:
+        """
+        Cached Docling zones for a document.
+
+        Args:
+            docling_key: Key from docling_key()
+
+        Returns:
+            Dict of zone lists keyed by kind ('tables', 'figures', 'text'), or None on a miss
+        """
+        cached = self.store.get(docling_key)
+        if cached is None:
+            return None
+        return {
+            kind: [Zone(**zone_dict) for zone_dict in zone_dicts]
+            for kind, zone_dicts in cached.items()
+        }
+
+    def put_docling_zones(self, docling_key: str, zones_by_kind: Dict[str, List[Zone]]):
+        """Store Docling zones for a document (key from docling_key()), keyed by kind."""
+        self.store.put(
+            docling_key,
+            {kind: [asdict(zone) for zone in zones] for kind, zones in zones_by_kind.items()}
+        )
+
+    # =========================================================================
+    # HOUSEKEEPING
+    # =========================================================================
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Hit/miss counters and cache size."""
+        return self.store.get_statistics()
+
+    def clear(self) -> int:
+        """Drop every cached entry. Returns number of entries removed."""
+        return self.store.invalidate()
+
+    def close(self):
+        """Close the cache database."""
+        self.store.close()
@@ -2,14 +2,27 @@
 Docling-based detection agents.
 
 Equation, figure, table, and text detection using Docling library.
+All detectors read converted documents through DoclingConversionService.
 """
 
+from .docling_conversion_service import (
+    DoclingConversionService,
+    CachedConversion,
+    get_conversion_service
+)
+from .sharded_docling_conversion import ShardedDoclingConverter, merge_shard_zones
+
 from .docling_equation_detector import DoclingEquationDetector
 from .docling_table_detector import DoclingTableDetector
 from .docling_figure_detector import DoclingFigureDetector
 from .docling_text_detector import DoclingTextDetector
 
 __all__ = [
+    'DoclingConversionService',
+    'CachedConversion',
+    'get_conversion_service',
+    'ShardedDoclingConverter',
+    'merge_shard_zones',
     'DoclingEquationDetector',
     'DoclingTableDetector',
     'DoclingFigureDetector',
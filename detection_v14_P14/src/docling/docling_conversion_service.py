@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Docling Conversion Service - Convert Each PDF Once, Persist the Document
+
+Every Docling detector (tables, figures, text, both equation variants) and
+DoclingFirstAgent used to build its own DocumentConverter() and, whenever no
+docling_result was handed over, convert the whole PDF again. Docling conversion
+is the most expensive step in the pipeline.
+
+This service owns the converters and a disk cache of converted documents:
+
+    key = (PDF content hash, Docling version, pipeline name)
+
+The converted document (a pydantic model - DoclingDocument in Docling 2.x,
+ExportedCCSDocument in 1.x) is serialized to JSON on disk together with its
+class name, and re-validated into the same class on a later run. Nothing is
+written to disk unless a cache directory is given (or DOCLING_CACHE_DIR is set).
+
+Design Rationale:
+-----------------
+- **Convert Once**: Within a process, all detectors share one in-memory result
+  per (PDF, pipeline) - the last few documents only (LRU); across
+  processes/runs, the on-disk copy is loaded instead
+- **Per-Document Locks**: Concurrent requests for one document wait for a
+  single conversion; different documents convert in parallel
+- **Content-Addressed**: Keyed by the PDF's SHA-256 (common/src/file_io/pdf_hash.py)
+  and Docling version, so edited PDFs and Docling upgrades never hit stale entries
+- **Pipeline-Aware**: Converters with different options (e.g. formula enrichment)
+  produce different documents, so the pipeline name is part of the key
+- **Lazy Converters**: A DocumentConverter is only built on a cache miss - a
+  fully cached run never loads Docling's models
+- **Result Shape Preserved**: CachedConversion exposes the document as both
+  .document and .output, matching the attribute access of existing detectors
+- **Size Cap**: LRU eviction via DiskLRUCache keeps the disk cache bounded
+- **JSON Storage**: JSON in the DiskLRUCache database, no pickle
+
+Usage Example:
+--------------
+>>> service = get_conversion_service(Path("results/cache/docling"))
+>>> result = service.convert(pdf_path)              # 1st run: converts + stores
+>>> zones = DoclingTableDetector(service).detect_tables(pdf_path, result)
+>>> result = service.convert(pdf_path)              # 2nd run: loads from disk
+
+Author: Claude Code
+Date: 2025-11-17
+Version: 1.0
+"""
+
+import sys
+import os
+
+# MANDATORY UTF-8 SETUP
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import importlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from common.src.file_io.disk_cache import DiskLRUCache
+from common.src.file_io.pdf_hash import compute_file_hash
+from detection_v14_P14.src.cache.detection_cache import get_docling_version
+
+
+DEFAULT_PIPELINE = 'default'
+
+# Cache directory when none is passed explicitly (None = in-memory only)
+DEFAULT_CACHE_DIR = Path(os.environ['DOCLING_CACHE_DIR']) if os.environ.get('DOCLING_CACHE_DIR') else None
+
+# Converted documents kept in memory (each can be tens of MB)
+DEFAULT_MEMORY_RESULTS = 4
+
+
+def _default_converter():
+    """Plain DocumentConverter() - what the table/figure/text detectors used."""
+    from docling.document_converter import DocumentConverter
+    return DocumentConverter()
+
+
+def _run_converter(converter, pdf_path: Path):
+    """
+    Convert with whichever API the installed Docling exposes.
+
+    Docling 1.x: convert_single(path). Docling 2.x: convert(path), which some
+    versions return wrapped in an iterator.
+    """
+    if hasattr(converter, 'convert_single'):
+        return converter.convert_single(pdf_path)
+
+    result = converter.convert(str(pdf_path))
+    if not (hasattr(result, 'document') or hasattr(result, 'output')):
+        result = next(iter(result))
+    return result
+
+
+def _extract_document(result):
+    """The pydantic document model inside a conversion result."""
+    if hasattr(result, 'document'):
+        return result.document
+    if hasattr(result, 'output'):
+        return result.output
+    return result
+
+
+def _dump_model(model) -> str:
+    """Serialize a pydantic model (v2 or v1) to JSON."""
+    if hasattr(model, 'model_dump_json'):
+        return model.model_dump_json()
+    return model.json()
+
+
+def _load_model(class_path: str, payload: str):
+    """Re-validate JSON into the pydantic class it was dumped from."""
+    module_name, _, class_name = class_path.rpartition('.')
+    model_class = getattr(importlib.import_module(module_name), class_name)
+    if hasattr(model_class, 'model_validate_json'):
+        return model_class.model_validate_json(payload)
+    return model_class.parse_raw(payload)
+
+
+class CachedConversion:
+    """
+    Conversion result shared by all Docling consumers.
+
+    The document is exposed as both .document (Docling 2.x / DoclingFirstAgent)
+    and .output (Docling 1.x detectors), so it can be passed anywhere a
+    docling_result was accepted before.
+    """
+
+    def __init__(self, document, pdf_hash: str, pipeline: str,
+                 from_cache: bool, conversion_seconds: float):
+        self.document = document
+        self.output = document
+        self.pdf_hash = pdf_hash
+        self.pipeline = pipeline
+        self.from_cache = from_cache
+        self.conversion_seconds = conversion_seconds
+
+
+class DoclingConversionService:
+    """
+    Converts each PDF once per (Docling version, pipeline) and serves the
+    persisted document to every Docling consumer.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_size_mb: int = 1024,
+                 max_memory_results: int = DEFAULT_MEMORY_RESULTS):
+        """
+        Open (or create) the conversion cache.
+
+        Args:
+            cache_dir: Directory for converted documents (default: DOCLING_CACHE_DIR
+                       env var; None = keep conversions in memory only)
+            max_size_mb: Size cap of the disk cache; least-recently-used
+                         documents are evicted beyond it
+            max_memory_results: Converted documents kept in memory
+        """
+        cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.store = None
+        if self.cache_dir is not None:
+            self.store = DiskLRUCache(
+                self.cache_dir / 'docling_conversions.db',
+                max_bytes=max_size_mb * 1024 * 1024
+            )
+
+        self.max_memory_results = max(1, max_memory_results)
+        self._factories: Dict[str, Callable[[], Any]] = {DEFAULT_PIPELINE: _default_converter}
+        self._converters: Dict[str, Any] = {}
+        self._results: 'OrderedDict[tuple, CachedConversion]' = OrderedDict()
+        self._pdf_hashes: Dict[tuple, str] = {}
+        self._lock = threading.RLock()           # Converters, memo and key locks
+        self._key_locks: Dict[tuple, threading.Lock] = {}  # One per document being converted
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'conversions': 0,
+            'conversion_seconds': 0.0
+        }
+
+    # =========================================================================
+    # CONVERTERS
+    # =========================================================================
+
+    def register_pipeline(self, name: str, factory: Callable[[], Any]):
+        """
+        Register a converter factory for a named pipeline configuration.
+
+        Args:
+            name: Pipeline name (part of the cache key)
+            factory: Zero-argument callable returning a DocumentConverter
+        """
+        with self._lock:
+            self._factories.setdefault(name, factory)
+
+    def get_converter(self, pipeline: str = DEFAULT_PIPELINE):
+        """DocumentConverter for a pipeline, built on first use."""
+        with self._lock:
+            if pipeline not in self._converters:
+                if pipeline not in self._factories:
+                    raise KeyError(f"Unknown Docling pipeline: {pipeline}")
+                print(f"🔧 Loading Docling converter (pipeline: {pipeline})...")
+                self._converters[pipeline] = self._factories[pipeline]()
+            return self._converters[pipeline]
+
+    # =========================================================================
+    # CONVERSION
+    # =========================================================================
+
+    def pdf_hash(self, pdf_path: Path) -> str:
+        """Content hash of a PDF (memoized by path, size and mtime)."""
+        path = Path(pdf_path)
+        stat = path.stat()
+        memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime)
+        if memo_key not in self._pdf_hashes:
+            self._pdf_hashes[memo_key] = compute_file_hash(path)
+        return self._pdf_hashes[memo_key]
+
+    @staticmethod
+    def _cache_key(pdf_hash: str, pipeline: str) -> str:
+        return f"conversion|{pdf_hash}|docling={get_docling_version()}|pipeline={pipeline}"
+
+    def _memo_get(self, memo_key: tuple) -> Optional[CachedConversion]:
+        with self._lock:
+            result = self._results.get(memo_key)
+            if result is not None:
+                self._results.move_to_end(memo_key)
+                self.stats['memory_hits'] += 1
+            return result
+
+    def _memo_put(self, memo_key: tuple, result: CachedConversion):
+        with self._lock:
+            self._results[memo_key] = result
+            self._results.move_to_end(memo_key)
+            while len(self._results) > self.max_memory_results:
+                self._results.popitem(last=False)
+
+    def convert(self, pdf_path: Path, pipeline: str = DEFAULT_PIPELINE,
+                convert_fn: Optional[Callable[[], Any]] = None) -> CachedConversion:
+        """
+        Converted document for a PDF - from memory, disk, or a fresh conversion.
+
+        Args:
+            pdf_path: Path to PDF file
+            pipeline: Named converter configuration (see register_pipeline)
+            convert_fn: Optional callable performing the conversion on a miss
+                        (for callers that own a configured converter); its return
+                        value may be a conversion result or the document itself
+
+        Returns:
+            CachedConversion with .document / .output
+        """
+        pdf_path = Path(pdf_path)
+        pdf_hash = self.pdf_hash(pdf_path)
+        memo_key = (pdf_hash, pipeline)
+
+        result = self._memo_get(memo_key)
+        if result is not None:
+            return result
+
+        # Only requests for the same document wait for each other
+        with self._lock:
+            key_lock = self._key_locks.setdefault(memo_key, threading.Lock())
+
+        try:
+            with key_lock:
+                return self._memo_get(memo_key) or self._load_or_convert(
+                    pdf_path, pdf_hash, pipeline, convert_fn
+                )
+        finally:
+            # Waiters still hold the lock object; later callers hit the memo
+            with self._lock:
+                self._key_locks.pop(memo_key, None)
+
+    def _load_or_convert(self, pdf_path: Path, pdf_hash: str, pipeline: str,
+                         convert_fn: Optional[Callable[[], Any]]) -> CachedConversion:
+        """Disk cache or fresh conversion (caller holds the document's key lock)."""
+        result = self._load(pdf_hash, pipeline)
+        if result is None:
+            print(f"Running Docling conversion (pipeline: {pipeline})...")
+            start = time.time()
+            if convert_fn is not None:
+                raw = convert_fn()
+            else:
+                raw = _run_converter(self.get_converter(pipeline), pdf_path)
+            elapsed = time.time() - start
+
+            result = CachedConversion(_extract_document(raw), pdf_hash, pipeline,
+                                      from_cache=False, conversion_seconds=elapsed)
+            with self._lock:
+                self.stats['conversions'] += 1
+                self.stats['conversion_seconds'] += elapsed
+            print(f"  Docling conversion completed in {elapsed:.1f}s")
+            self._store(result)
+        else:
+            with self._lock:
+                self.stats['disk_hits'] += 1
+            print(f"Using cached Docling conversion ({pdf_path.name}, pipeline: {pipeline})")
+
+        self._memo_put((pdf_hash, pipeline), result)
+        return result
+
+    def _load(self, pdf_hash: str, pipeline: str) -> Optional[CachedConversion]:
+        """Load a persisted document, or None if absent/unreadable (or no disk cache)."""
+        if self.store is None:
+            return None
+
+        entry = self.store.get(self._cache_key(pdf_hash, pipeline))
+        if entry is None:
+            return None
+
+        try:
+            document = _load_model(entry['document_class'], entry['document'])
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable Docling cache entry for {pdf_hash}: {e}")
+            return None
+
+        return CachedConversion(document, pdf_hash, pipeline, from_cache=True,
+                                conversion_seconds=entry.get('conversion_seconds', 0.0))
+
+    def _store(self, result: CachedConversion):
+        """Persist a converted document (no-op without a disk cache, failures are non-fatal)."""
+        if self.store is None:
+            return
+
+        document = result.document
+        try:
+            self.store.put(self._cache_key(result.pdf_hash, result.pipeline), {
+                'document_class': f"{type(document).__module__}.{type(document).__qualname__}",
+                'docling_version': get_docling_version(),
+                'pdf_hash': result.pdf_hash,
+                'pipeline': result.pipeline,
+                'conversion_seconds': result.conversion_seconds,
+                'document': _dump_model(document)
+            })
+        except Exception as e:
+            print(f"⚠️  Could not persist Docling conversion: {e}")
+
+    # =========================================================================
+    # HOUSEKEEPING
+    # =========================================================================
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Conversion/hit counters and on-disk size."""
+        store_stats = self.store.get_statistics() if self.store is not None else {}
+        with self._lock:
+            return {
+                **self.stats,
+                'memory_documents': len(self._results),
+                'cached_documents': store_stats.get('entries', 0),
+                'total_bytes': store_stats.get('total_bytes', 0),
+                'evictions': store_stats.get('evictions', 0)
+            }
+
+    def clear(self) -> int:
+        """Drop persisted and in-memory conversions. Returns persisted entries removed."""
+        with self._lock:
+            self._results.clear()
+        return self.store.invalidate() if self.store is not None else 0
+
+
+_SERVICES: Dict[str, DoclingConversionService] = {}
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_conversion_service(cache_dir: Optional[Path] = None,
+                           max_size_mb: int = 1024) -> DoclingConversionService:
+    """
+    Process-wide conversion service for a cache directory.
+
+    Detectors constructed without an explicit service share the default one,
+    so they also share converters and in-memory results. Without cache_dir
+    (and DOCLING_CACHE_DIR) the service keeps conversions in memory only.
+
+    Args:
+        cache_dir: Directory for converted documents (None = default)
+        max_size_mb: Disk cache size cap (applied when the service is created)
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    resolved = str(Path(cache_dir).resolve()) if cache_dir else ''
+    with _SERVICES_LOCK:
+        if resolved not in _SERVICES:
+            _SERVICES[resolved] = DoclingConversionService(
+                Path(resolved) if resolved else None, max_size_mb=max_size_mb
+            )
+        return _SERVICES[resolved]
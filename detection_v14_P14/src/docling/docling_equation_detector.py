@@ -42,13 +42,15 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
-from docling.document_converter import DocumentConverter, PipelineOptions
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
 
 # Import Zone from base agent
 from common.src.base.base_extraction_agent import Zone
+from detection_v14_P14.src.docling.docling_conversion_service import (
+    DoclingConversionService, get_conversion_service
+)
 
 
 class DoclingEquationDetector:
@@ -62,21 +64,28 @@ class DoclingEquationDetector:
     Hardware: NVIDIA DGX Spark (128GB unified memory, Blackwell GPU)
     """
 
-    def __init__(self):
-        """Initialize Docling converter for formula detection."""
-        print(f"🔧 Loading Docling converter for formula detection...")
+    def __init__(self, conversion_service: Optional[DoclingConversionService] = None):
+        """
+        Initialize detector for formula detection.
+
+        Args:
+            conversion_service: Shared Docling conversion cache (default: process-wide service)
+        """
+        print(f"🔧 Preparing Docling formula detection...")
         print(f"   Hardware: NVIDIA DGX Spark (128GB unified memory, Blackwell GPU)")
         print(f"   Docling version: 1.20.0 (basic formula detection)")
         print(f"   Note: LaTeX enrichment API not available in this version")
 
-        # Basic Docling configuration for Docling 1.20.0
-        pipeline_options = PipelineOptions()
-        pipeline_options.do_table_structure = True
-        pipeline_options.do_ocr = False  # Not needed with good quality PDFs
-
-        self.converter = DocumentConverter()
+        # Same default DocumentConverter() as the table/figure/text detectors,
+        # so all of them share one cached conversion
+        self.conversion_service = conversion_service or get_conversion_service()
         print(f"✅ Docling ready for formula region detection")
 
+    @property
+    def converter(self):
+        """Shared DocumentConverter (built lazily by the conversion service)."""
+        return self.conversion_service.get_converter()
+
     def detect_equations(self, pdf_path: Path, docling_result=None) -> List[Zone]:
         """
         Detect equation regions using Docling basic formula detection.
@@ -101,9 +110,7 @@ class DoclingEquationDetector:
             print("Using existing Docling result (shared conversion)...")
             result = docling_result
         else:
-            print("Running Docling conversion...")
-            # convert() returns a generator, we need the first (and only) result
-            result = next(iter(self.converter.convert(str(pdf_path))))
+            result = self.conversion_service.convert(pdf_path)
 
         # Extract equation zones
         zones = []
@@ -49,15 +49,36 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
-from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.datamodel.base_models import InputFormat
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
 
 # Import Zone from base agent
 from common.src.base.base_extraction_agent import Zone
+from detection_v14_P14.src.docling.docling_conversion_service import (
+    DoclingConversionService, get_conversion_service
+)
+
+
+FORMULA_ENRICHMENT_PIPELINE = 'formula_enrichment'
+
+
+def _build_formula_converter():
+    """DocumentConverter with GPU formula enrichment (Docling 2.x API)."""
+    from docling.document_converter import DocumentConverter, PdfFormatOption
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+    from docling.datamodel.base_models import InputFormat
+
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_table_structure = True
+    pipeline_options.do_ocr = False  # Not needed with good quality PDFs
+    pipeline_options.do_formula_enrichment = True  # ✅ GPU-accelerated on DGX Spark
+
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+        }
+    )
 
 
 class DoclingEquationDetector:
@@ -68,25 +89,28 @@ class DoclingEquationDetector:
     to run Docling's formula enrichment feature for AI-powered equation extraction.
     """
 
-    def __init__(self):
-        """Initialize Docling converter with formula enrichment enabled."""
-        print(f"🔧 Loading Docling 2.x converter with formula enrichment...")
+    def __init__(self, conversion_service: Optional[DoclingConversionService] = None):
+        """
+        Initialize detector with formula enrichment enabled.
+
+        Args:
+            conversion_service: Shared Docling conversion cache (default: process-wide service)
+        """
+        print(f"🔧 Preparing Docling 2.x formula enrichment...")
         print(f"   Hardware: NVIDIA DGX Spark (128GB unified memory, Blackwell GPU)")
         print(f"   Docling version: 2.61.2")
 
-        # Enable formula enrichment for DGX Spark (Docling 2.x API)
-        pipeline_options = PdfPipelineOptions()
-        pipeline_options.do_table_structure = True
-        pipeline_options.do_ocr = False  # Not needed with good quality PDFs
-        pipeline_options.do_formula_enrichment = True  # ✅ GPU-accelerated on DGX Spark
-
-        self.converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
-            }
-        )
+        # Formula enrichment changes the converted document, so it is cached
+        # under its own pipeline name; the converter is built on first miss
+        self.conversion_service = conversion_service or get_conversion_service()
+        self.conversion_service.register_pipeline(FORMULA_ENRICHMENT_PIPELINE, _build_formula_converter)
         print(f"✅ Docling ready with formula enrichment enabled (GPU-accelerated)")
 
+    @property
+    def converter(self):
+        """Formula-enrichment DocumentConverter (built lazily by the conversion service)."""
+        return self.conversion_service.get_converter(FORMULA_ENRICHMENT_PIPELINE)
+
     def detect_equations(self, pdf_path: Path, docling_result=None) -> List[Zone]:
         """
         Detect equation regions using Docling formula enrichment.
@@ -111,9 +135,7 @@ class DoclingEquationDetector:
             print("Using existing Docling result (shared conversion)...")
             result = docling_result
         else:
-            print("Running Docling conversion with formula enrichment...")
-            # Docling 2.x convert() returns generator, get first result
-            result = next(iter(self.converter.convert(str(pdf_path))))
+            result = self.conversion_service.convert(pdf_path, pipeline=FORMULA_ENRICHMENT_PIPELINE)
 
         # Extract equation zones
         zones = []
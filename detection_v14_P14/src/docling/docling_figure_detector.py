@@ -36,13 +36,15 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
-from docling.document_converter import DocumentConverter
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 # Import Zone from base agent (proper relative import)
 from common.src.base.base_extraction_agent import Zone
+from detection_v14_P14.src.docling.docling_conversion_service import (
+    DoclingConversionService, get_conversion_service
+)
 
 
 class DoclingFigureDetector:
@@ -57,16 +59,23 @@ class DoclingFigureDetector:
     - Works with same Docling pass as tables (efficient)
     """
 
-    def __init__(self, docling_result=None):
+    def __init__(self, docling_result=None,
+                 conversion_service: Optional[DoclingConversionService] = None):
         """
-        Initialize Docling converter or reuse existing result.
+        Initialize detector, optionally reusing an existing result.
 
         Args:
             docling_result: Optional pre-existing Docling conversion result
                            (to avoid re-running Docling if already done for tables)
+            conversion_service: Shared Docling conversion cache (default: process-wide service)
         """
         self.docling_result = docling_result
-        self.converter = None if docling_result else DocumentConverter()
+        self.conversion_service = conversion_service or get_conversion_service()
+
+    @property
+    def converter(self):
+        """Shared DocumentConverter (built lazily by the conversion service)."""
+        return self.conversion_service.get_converter()
 
     def detect_figures(self, pdf_path: Path, docling_result=None) -> List[Zone]:
         """
@@ -88,12 +97,12 @@ class DoclingFigureDetector:
         start_time = datetime.now()
 
         # Use provided result or run conversion
+        docling_result = docling_result or self.docling_result
         if docling_result:
             print("Using existing Docling result (from table detection)...")
             result = docling_result
         else:
-            print("Running Docling conversion...")
-            result = self.converter.convert_single(pdf_path)
+            result = self.conversion_service.convert(pdf_path)
 
         # Extract figure zones from Docling's document model
         zones = []
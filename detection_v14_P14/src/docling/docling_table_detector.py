@@ -11,6 +11,8 @@ Design Rationale:
 - **Parallel Execution**: Runs in parallel with DocLayout-YOLO
 - **Wrapper Pattern**: Thin wrapper around existing working code
 - **Zone Output**: Converts Docling results to Zone objects
+- **Cell Grid**: Zones carry Docling's cell grid (spans, header flags, bboxes)
+  so table extraction builds its DataFrame without re-parsing markdown
 
 Author: Claude Code
 Date: 2025-01-16
@@ -36,13 +38,68 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
-from docling.document_converter import DocumentConverter
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 # Import Zone from base agent (proper relative import)
 from common.src.base.base_extraction_agent import Zone
+from detection_v14_P14.src.docling.docling_conversion_service import (
+    DoclingConversionService, get_conversion_service
+)
+
+
+# Per-cell fields of a serialized cell grid (zone.metadata['cell_grid'])
+CELL_GRID_FIELDS = ['row', 'col', 'row_span', 'col_span', 'text',
+                    'column_header', 'row_header', 'row_section', 'bbox']
+
+
+def serialize_cell_grid(table) -> Optional[Dict[str, Any]]:
+    """
+    Compact JSON-safe copy of a Docling table's cell grid.
+
+    Every cell appears once (spanning cells are not repeated), as a list in
+    CELL_GRID_FIELDS order; header flags are 0/1 and bbox is [l, t, r, b]
+    (None if Docling has no cell box).
+
+    Args:
+        table: Docling TableItem
+
+    Returns:
+        {'num_rows', 'num_cols', 'coord_origin', 'fields', 'cells'} or None
+        if the table has no cell data
+    """
+    data = getattr(table, 'data', None)
+    if data is None or not data.num_rows or not data.num_cols or not data.table_cells:
+        return None
+
+    coord_origin = None
+    cells = []
+    for cell in data.table_cells:
+        bbox = None
+        if cell.bbox is not None:
+            bbox = [round(cell.bbox.l, 2), round(cell.bbox.t, 2), round(cell.bbox.r, 2), round(cell.bbox.b, 2)]
+            if coord_origin is None and hasattr(cell.bbox, 'coord_origin'):
+                coord_origin = getattr(cell.bbox.coord_origin, 'value', str(cell.bbox.coord_origin))
+        cells.append([
+            cell.start_row_offset_idx,
+            cell.start_col_offset_idx,
+            max(1, cell.end_row_offset_idx - cell.start_row_offset_idx),
+            max(1, cell.end_col_offset_idx - cell.start_col_offset_idx),
+            cell.text or '',
+            int(bool(cell.column_header)),
+            int(bool(cell.row_header)),
+            int(bool(getattr(cell, 'row_section', False))),
+            bbox
+        ])
+
+    return {
+        'num_rows': data.num_rows,
+        'num_cols': data.num_cols,
+        'coord_origin': coord_origin,
+        'fields': CELL_GRID_FIELDS,
+        'cells': cells
+    }
 
 
 class DoclingTableDetector:
@@ -52,11 +109,20 @@ class DoclingTableDetector:
     This is a thin wrapper that runs Docling and converts results to zones.
     """
 
-    def __init__(self):
-        """Initialize Docling converter."""
-        print(f"🔧 Loading Docling converter...")
-        self.converter = DocumentConverter()
-        print(f"✅ Docling ready")
+    def __init__(self, conversion_service: Optional[DoclingConversionService] = None):
+        """
+        Initialize detector.
+
+        Args:
+            conversion_service: Shared Docling conversion cache (default: process-wide service)
+        """
+        self.conversion_service = conversion_service or get_conversion_service()
+        print(f"✅ Docling table detector ready (shared conversion cache)")
+
+    @property
+    def converter(self):
+        """Shared DocumentConverter (built lazily by the conversion service)."""
+        return self.conversion_service.get_converter()
 
     def detect_tables(self, pdf_path: Path, docling_result=None) -> List[Zone]:
         """
@@ -82,8 +148,7 @@ class DoclingTableDetector:
             print("Using existing Docling result (shared with figures)...")
             result = docling_result
         else:
-            print("Running Docling conversion...")
-            result = self.converter.convert_single(pdf_path)
+            result = self.conversion_service.convert(pdf_path)
 
         # Extract table zones
         zones = []
@@ -125,7 +190,8 @@ class DoclingTableDetector:
                     metadata={
                         'docling_table_index': i,
                         'detection_method': 'docling',
-                        'html': table.export_to_html()  # Add HTML for extraction (new Docling API)
+                        'html': table.export_to_html(),  # Add HTML for extraction (new Docling API)
+                        'cell_grid': serialize_cell_grid(table)  # Structured cells, no re-parsing
                     }
                 )
                 zones.append(zone)
@@ -43,8 +43,9 @@ from typing import List, Optional
 from dataclasses import dataclass
 
 from common.src.base.base_extraction_agent import Zone
-
-from docling.document_converter import DocumentConverter
+from detection_v14_P14.src.docling.docling_conversion_service import (
+    DoclingConversionService, get_conversion_service
+)
 
 
 @dataclass
@@ -64,9 +65,19 @@ class DoclingTextDetector:
     all text content while preserving layout and semantic information.
     """
 
-    def __init__(self):
-        """Initialize Docling text detector."""
-        self.converter = DocumentConverter()
+    def __init__(self, conversion_service: Optional[DoclingConversionService] = None):
+        """
+        Initialize Docling text detector.
+
+        Args:
+            conversion_service: Shared Docling conversion cache (default: process-wide service)
+        """
+        self.conversion_service = conversion_service or get_conversion_service()
+
+    @property
+    def converter(self):
+        """Shared DocumentConverter (built lazily by the conversion service)."""
+        return self.conversion_service.get_converter()
 
     def detect_text(self, pdf_path: Path, docling_result=None) -> List[Zone]:
         """
@@ -87,8 +98,7 @@ class DoclingTextDetector:
 
         # Use existing result or convert
         if docling_result is None:
-            print("Converting document with Docling...")
-            docling_result = self.converter.convert_single(pdf_path)
+            docling_result = self.conversion_service.convert(pdf_path)
         else:
             print("Using existing Docling result (shared conversion)...")
 
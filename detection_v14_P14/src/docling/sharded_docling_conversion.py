@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Sharded Docling Conversion - Page-Range Parallel Docling Detection
+
+Docling converts a whole document in one process, and its results cannot be
+pickled, so long books were converted serially. This module splits the PDF
+into contiguous page ranges, converts each range in its own worker process,
+and has every worker run the existing table/figure/text detectors on its
+shard. Only plain zone dicts cross the process boundary.
+
+The parent merges the shard zones into the same Zone lists that
+DoclingTableDetector.detect_tables / DoclingFigureDetector.detect_figures /
+DoclingTextDetector.detect_text produce for the whole document:
+
+- Pages: shard-local page numbers are shifted by the shard's first page
+- Tables: renumbered table_1..N with a global docling_table_index
+- Figures: fig_docling_{page}_{index} with a global figure index
+- Text: the shards' main text concatenated into the single text_main_0 zone
+
+Design Rationale:
+-----------------
+- **Scales With Cores**: Docling wall-clock on long books is divided across
+  shards; each worker gets cpu_count // num_workers threads
+- **Spawn Context**: Docling loads torch models; forking a parent that already
+  initialised torch's thread pools can deadlock (same as the YOLO pool)
+- **Shard Files**: Page ranges are written to temporary PDFs with PyMuPDF, which
+  works with both Docling 1.x convert_single and 2.x convert
+- **Shared Cache**: Workers convert through DoclingConversionService, so shard
+  conversions are persisted too and a re-run loads them from disk
+
+Trade-off: Docling sees each shard in isolation, so layout context does not
+cross shard boundaries (e.g. a table continued over a boundary page becomes two
+tables). Shards are therefore kept large (at least min_pages_per_shard pages).
+
+Author: Claude Code
+Date: 2025-11-17
+Version: 1.0
+"""
+
+import sys
+import os
+
+# MANDATORY UTF-8 SETUP
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz
+
+from common.src.base.base_extraction_agent import Zone
+from common.src.infrastructure.core_manager import get_optimal_workers
+
+
+def plan_shards(page_count: int, num_shards: int,
+                min_pages_per_shard: int = 10) -> List[Tuple[int, int]]:
+    """
+    Split a document into contiguous, near-equal page ranges.
+
+    Args:
+        page_count: Total pages
+        num_shards: Desired number of shards
+        min_pages_per_shard: Lower bound on shard size (fewer, larger shards)
+
+    Returns:
+        List of (start_page, end_page) 0-indexed, end exclusive
+    """
+    if page_count <= 0:
+        return []
+    num_shards = max(1, min(num_shards, page_count // max(1, min_pages_per_shard)))
+    base, extra = divmod(page_count, num_shards)
+
+    shards = []
+    start = 0
+    for i in range(num_shards):
+        end = start + base + (1 if i < extra else 0)
+        shards.append((start, end))
+        start = end
+    return shards
+
+
+# =============================================================================
+# WORKER PROCESS
+# =============================================================================
+
+def _init_docling_worker(intra_op_threads: int):
+    """Pin thread pools before Docling (and torch) load in this worker."""
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(intra_op_threads)
+    try:
+        import torch
+        torch.set_num_threads(intra_op_threads)
+        torch.set_num_interop_threads(1)
+    except Exception:
+        pass
+
+
+def _convert_shard_worker(pdf_path: str, start_page: int, end_page: int,
+                          cache_dir: Optional[str]) -> Dict[str, Any]:
+    """
+    Convert one page range and run the Docling detectors on it.
+
+    Returns:
+        {'start_page', 'end_page', 'seconds', 'tables', 'figures', 'text'},
+        zone lists as dicts with shard-local page numbers
+    """
+    from detection_v14_P14.src.docling.docling_conversion_service import get_conversion_service
+    from detection_v14_P14.src.docling.docling_table_detector import DoclingTableDetector
+    from detection_v14_P14.src.docling.docling_figure_detector import DoclingFigureDetector
+    from detection_v14_P14.src.docling.docling_text_detector import DoclingTextDetector
+
+    start = time.time()
+    service = get_conversion_service(Path(cache_dir) if cache_dir else None)
+
+    with tempfile.TemporaryDirectory(prefix='docling_shard_') as tmp_dir:
+        shard_path = Path(tmp_dir) / f"{Path(pdf_path).stem}_p{start_page + 1}-{end_page}.pdf"
+
+        src = fitz.open(pdf_path)
+        shard = fitz.open()
+        try:
+            shard.insert_pdf(src, from_page=start_page, to_page=end_page - 1)
+            # no_new_id keeps shard bytes stable, so the conversion cache can hit
+            shard.save(str(shard_path), garbage=3, deflate=True, no_new_id=True)
+        finally:
+            shard.close()
+            src.close()
+
+        result = service.convert(shard_path)
+        zones = {
+            'tables': DoclingTableDetector(service).detect_tables(shard_path, result),
+            'figures': DoclingFigureDetector(conversion_service=service).detect_figures(shard_path, result),
+            'text': DoclingTextDetector(service).detect_text(shard_path, result)
+        }
+
+    return {
+        'start_page': start_page,
+        'end_page': end_page,
+        'seconds': time.time() - start,
+        **{kind: [asdict(z) for z in kind_zones] for kind, kind_zones in zones.items()}
+    }
+
+
+# =============================================================================
+# MERGE
+# =============================================================================
+
+def merge_shard_zones(shard_results: List[Dict[str, Any]]) -> Dict[str, List[Zone]]:
+    """
+    Merge per-shard zone dicts into whole-document zone lists.
+
+    Args:
+        shard_results: Worker outputs (any order)
+
+    Returns:
+        {'tables': [...], 'figures': [...], 'text': [...]} with document page
+        numbers and document-global numbering
+    """
+    tables: List[Zone] = []
+    figures: List[Zone] = []
+    text_parts: List[str] = []
+    text_template: Optional[Dict[str, Any]] = None
+
+    for shard in sorted(shard_results, key=lambda r: r['start_page']):
+        offset = shard['start_page']
+
+        for zone_dict in shard['tables']:
+            zone = Zone(**zone_dict)
+            zone.page += offset
+            index = len(tables)
+            zone.zone_id = f"table_{index + 1}"
+            zone.metadata['docling_table_index'] = index
+            tables.append(zone)
+
+        for zone_dict in shard['figures']:
+            zone = Zone(**zone_dict)
+            zone.page += offset
+            index = len(figures)
+            zone.zone_id = f"fig_docling_{zone.page}_{index}"
+            for key in ('docling_figure_index', 'docling_picture_index'):
+                if key in zone.metadata:
+                    zone.metadata[key] = index
+            figures.append(zone)
+
+        for zone_dict in shard['text']:
+            text_template = text_template or zone_dict
+            text_parts.append(zone_dict['metadata'].get('text_content', ''))
+
+    text: List[Zone] = []
+    if text_template is not None:
+        text_content = "\n\n".join(part for part in text_parts if part)
+        zone = Zone(**text_template)
+        zone.zone_id = "text_main_0"
+        zone.page = 1
+        zone.metadata['text_content'] = text_content
+        zone.metadata['char_count'] = len(text_content)
+        text.append(zone)
+
+    return {'tables': tables, 'figures': figures, 'text': text}
+
+
+# =============================================================================
+# DRIVER
+# =============================================================================
+
+class ShardedDoclingConverter:
+    """
+    Page-range parallel Docling detection.
+
+    Usage Example:
+    --------------
+    >>> converter = ShardedDoclingConverter(num_workers=4)
+    >>> zones = converter.detect(pdf_path)
+    >>> zones['tables'], zones['figures'], zones['text']
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, min_pages_per_shard: int = 10,
+                 cache_dir: Optional[Path] = None, cpu_budget: Optional[int] = None):
+        """
+        Initialize sharded converter.
+
+        Args:
+            num_workers: Worker processes (default: CentralizedCoreManager recommendation)
+            min_pages_per_shard: Smallest shard size; short documents use fewer shards
+            cache_dir: DoclingConversionService cache directory for shard conversions
+            cpu_budget: Total CPUs for all shard workers (None = all CPUs)
+        """
+        self.num_workers = num_workers or get_optimal_workers('docling_conversion', fallback=2)
+        self.min_pages_per_shard = min_pages_per_shard
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cpu_budget = cpu_budget
+        self.last_run_stats: Dict[str, Any] = {}
+
+    def detect(self, pdf_path: Path, page_count: Optional[int] = None) -> Dict[str, List[Zone]]:
+        """
+        Convert the PDF in page-range shards and merge the detected zones.
+
+        Must be called from a __main__-guarded script (spawn context).
+
+        Args:
+            pdf_path: Path to PDF file
+            page_count: Page count if already known (skips opening the PDF here,
+                        e.g. on a thread running next to in-process PyMuPDF work)
+
+        Returns:
+            {'tables': [...], 'figures': [...], 'text': [...]} Zone lists
+        """
+        pdf_path = Path(pdf_path)
+        if page_count is None:
+            with fitz.open(str(pdf_path)) as doc:
+                page_count = len(doc)
+
+        shards = plan_shards(page_count, self.num_workers, self.min_pages_per_shard)
+        workers = len(shards)
+        intra_op_threads = max(1, (self.cpu_budget or os.cpu_count() or 1) // max(1, workers))
+
+        print(f"Sharded Docling conversion: {page_count} pages → {workers} shard(s), "
+              f"{intra_op_threads} thread(s) per worker")
+        start = time.time()
+
+        cache_dir = str(self.cache_dir) if self.cache_dir else None
+        results = []
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_docling_worker,
+                                 initargs=(intra_op_threads,)) as executor:
+            futures = {
+                executor.submit(_convert_shard_worker, str(pdf_path), s, e, cache_dir): (s, e)
+                for s, e in shards
+            }
+            for future in as_completed(futures):
+                s, e = futures[future]
+                result = future.result()
+                results.append(result)
+                print(f"  ✅ Shard pages {s + 1}-{e}: {len(result['tables'])} tables, "
+                      f"{len(result['figures'])} figures ({result['seconds']:.1f}s)")
+
+        merged = merge_shard_zones(results)
+        elapsed = time.time() - start
+
+        self.last_run_stats = {
+            'pages': page_count,
+            'shards': workers,
+            'seconds': elapsed,
+            'shard_seconds': {f"{r['start_page'] + 1}-{r['end_page']}": r['seconds'] for r in results}
+        }
+        print(f"Sharded Docling conversion complete in {elapsed:.1f}s "
+              f"({len(merged['tables'])} tables, {len(merged['figures'])} figures)")
+        return merged
@@ -13,6 +13,7 @@ Design Rationale:
 - **Reuse**: Outputs zones for existing RAG agents (no agent modification)
 - **Parallelization**: Page-level parallel processing for maximum throughput
 - **Pairing**: Intelligent algorithm matches formulas with captions
+- **Vectorized Decoding**: YOLO results decoded per page with DetectionBatch
 
 Author: Claude Code
 Date: 2025-01-16
@@ -49,6 +50,7 @@ from datetime import datetime
 
 # Import Zone from base agent (v14 package import)
 from common.src.base.base_extraction_agent import Zone
+from detection_v14_P14.src.yolo.detection_batch import DetectionBatch
 
 
 @dataclass
@@ -395,39 +397,17 @@ def _detect_page_worker(pdf_path: str, page_num: int,
     # Clean up
     temp_img.unlink()
 
-    # Parse detections
+    # Parse detections: one vectorized pass per result (classes we don't care
+    # about are masked out, boxes scaled to page coordinates together)
     detections = []
     for result in results:
-        for box in result.boxes:
-            cls_id = int(box.cls[0])
-            cls_name = result.names[cls_id]
-
-            # Skip classes we don't care about
-            if cls_name not in UnifiedDetectionModule.CLASS_MAPPING:
-                continue
-
-            conf = float(box.conf[0])
-            xyxy = box.xyxy[0]
-
-            # Convert to page coordinates
-            scale = 72/300
-            x0 = float(xyxy[0]) * scale
-            y0 = float(xyxy[1]) * scale
-            x1 = float(xyxy[2]) * scale
-            y1 = float(xyxy[3]) * scale
-
-            # Extract text
-            bbox = fitz.Rect(x0, y0, x1, y1)
-            text = page.get_text("text", clip=bbox).strip()
-
-            detection = Detection(
-                class_name=cls_name,
-                confidence=conf,
-                page_num=page_num,
-                bbox=(x0, y0, x1, y1),
-                text=text
-            )
-            detections.append(detection)
+        batch = DetectionBatch.from_result(
+            result, page_num, 72/300, UnifiedDetectionModule.CLASS_MAPPING, map_classes=False
+        )
+
+        # Extract text
+        batch = batch.with_texts(lambda bbox: page.get_text("text", clip=fitz.Rect(bbox)).strip())
+        detections.extend(batch.to_detections(Detection))
 
     doc.close()
     return detections
@@ -1,5 +1,6 @@
 """YOLO-based detection modules."""
 
 from .unified_detection_module import UnifiedDetectionModule
+from .detection_batch import DetectionBatch
 
-__all__ = ['UnifiedDetectionModule']
+__all__ = ['UnifiedDetectionModule', 'DetectionBatch']
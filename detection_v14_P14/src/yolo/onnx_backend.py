@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+ONNX Runtime Backend - CPU Inference for DocLayout-YOLO Without PyTorch Eager Mode
+
+UnifiedDetectionModule runs DocLayout-YOLO through doclayout_yolo.YOLOv10 in
+PyTorch eager mode. This backend exports the checkpoint to ONNX once and runs
+the graph with ONNX Runtime's CPU execution provider.
+
+OnnxYoloModel mirrors the slice of the YOLOv10 API the detector uses:
+
+    model.predict(images, conf=..., verbose=False, imgsz=...) → [result, ...]
+
+where every result exposes .boxes.cls / .boxes.conf / .boxes.xyxy and .names,
+so DetectionBatch decodes ONNX and PyTorch results through the same code
+(same CLASS_MAPPING, same confidence filtering).
+
+Pre/Post-Processing (matches the ultralytics predictor):
+-------------------------------------------------------
+1. Letterbox: scale the longest side to imgsz (aspect kept), pad with gray 114 to
+   a stride multiple (uniform batches) or to the full square (mixed batches)
+2. BGR → RGB, HWC → CHW, / 255, float32, stacked into one (B, 3, H, W) tensor
+3. YOLOv10 end-to-end head output (B, max_det, 6) = x0, y0, x1, y1, score, class
+   (NMS-free), filtered by score > conf
+4. Boxes mapped back from letterboxed to original pixels and clipped
+
+Design Rationale:
+-----------------
+- **Export Once**: The ONNX file is written next to the checkpoint (or to
+  export_dir) and reused until the checkpoint is modified
+- **Dynamic Axes**: Exported with dynamic batch/height/width so batched pages and
+  both render modes run on one graph
+- **Thread Pinning Carries Over**: The session's intra-op threads default to
+  torch's current thread count, so pool workers keep their CPU share
+- **Optional Dependency**: onnxruntime is only needed when backend='onnx'
+
+Author: Claude Code
+Date: 2025-11-17
+Version: 1.0
+"""
+
+import sys
+import os
+
+# MANDATORY UTF-8 SETUP
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import ast
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+# ONNX Runtime is optional - only needed for backend='onnx'
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+
+# Letterbox padding value used by ultralytics
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+def _load_torch_model(model_path: Path):
+    """
+    PyTorch checkpoint for export.
+
+    The torch.load patch must already be applied - importing
+    unified_detection_module does that.
+    """
+    from doclayout_yolo import YOLOv10
+    return YOLOv10(str(model_path))
+
+
+def onnx_export_path(model_path: Union[str, Path], imgsz: int,
+                     export_dir: Optional[Path] = None) -> Path:
+    """Where the ONNX export of a checkpoint lives."""
+    model_path = Path(model_path)
+    directory = Path(export_dir) if export_dir else model_path.parent
+    return directory / f"{model_path.stem}_imgsz{imgsz}_dynamic.onnx"
+
+
+def export_onnx(model_path: Union[str, Path], imgsz: Optional[int] = None,
+                export_dir: Optional[Path] = None, opset: int = 17) -> Path:
+    """
+    Export a DocLayout-YOLO checkpoint to ONNX (skipped if an up-to-date export exists).
+
+    Args:
+        model_path: DocLayout-YOLO .pt checkpoint
+        imgsz: Model input size (default: the checkpoint's training imgsz)
+        export_dir: Directory for the .onnx file (default: next to the checkpoint)
+        opset: ONNX opset version
+
+    Returns:
+        Path to the .onnx file
+    """
+    model_path = Path(model_path)
+    model = None
+    if imgsz is None:
+        model = _load_torch_model(model_path)
+        imgsz = model.overrides.get('imgsz', 1024)
+        imgsz = int(max(imgsz) if isinstance(imgsz, (list, tuple)) else imgsz)
+
+    onnx_path = onnx_export_path(model_path, imgsz, export_dir)
+    if onnx_path.exists() and onnx_path.stat().st_mtime >= model_path.stat().st_mtime:
+        return onnx_path
+
+    print(f"Exporting {model_path.name} to ONNX (imgsz {imgsz}, opset {opset})...")
+    model = model or _load_torch_model(model_path)
+    exported = model.export(format='onnx', imgsz=imgsz, dynamic=True, opset=opset, simplify=False)
+
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+    if Path(exported).resolve() != onnx_path.resolve():
+        shutil.move(str(exported), str(onnx_path))
+    print(f"✅ ONNX model written: {onnx_path}")
+    return onnx_path
+
+
+def letterbox(image: np.ndarray, imgsz: int, auto: bool, stride: int = 32) -> np.ndarray:
+    """
+    Resize with unchanged aspect ratio and pad (ultralytics LetterBox).
+
+    Args:
+        image: HxWx3 BGR uint8
+        imgsz: Target longest side
+        auto: Pad only to a stride multiple (True) or to imgsz x imgsz (False)
+        stride: Model stride
+    """
+    h, w = image.shape[:2]
+    ratio = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    dw, dh = imgsz - new_w, imgsz - new_h
+    if auto:
+        dw, dh = dw % stride, dh % stride
+    dw, dh = dw / 2, dh / 2
+
+    if (w, h) != (new_w, new_h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    return cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT,
+                              value=LETTERBOX_COLOR)
+
+
+def preprocess(images: Sequence[np.ndarray], imgsz: int, stride: int = 32) -> np.ndarray:
+    """
+    BGR uint8 images → letterboxed (B, 3, H, W) float32 RGB tensor in [0, 1].
+
+    Stride-multiple padding only when every image has the same shape (as the
+    ultralytics predictor does); mixed shapes are padded to imgsz x imgsz.
+    """
+    same_shapes = len({img.shape for img in images}) == 1
+    inputs = [letterbox(img, imgsz, auto=same_shapes, stride=stride) for img in images]
+    tensor = np.stack(inputs)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(tensor, dtype=np.float32) / 255.0
+
+
+def scale_boxes(boxes: np.ndarray, input_shape: Tuple[int, int],
+                original_shape: Tuple[int, int]) -> np.ndarray:
+    """Map xyxy boxes from the letterboxed input back to original pixels (clipped)."""
+    gain = min(input_shape[0] / original_shape[0], input_shape[1] / original_shape[1])
+    pad_x = round((input_shape[1] - original_shape[1] * gain) / 2 - 0.1)
+    pad_y = round((input_shape[0] - original_shape[0] * gain) / 2 - 0.1)
+
+    boxes = boxes.copy()
+    boxes[:, [0, 2]] -= pad_x
+    boxes[:, [1, 3]] -= pad_y
+    boxes /= gain
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, original_shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, original_shape[0])
+    return boxes
+
+
+class OnnxBoxes:
+    """Detected boxes of one image (cls / conf / xyxy arrays, like ultralytics Boxes)."""
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+        self.xyxy = data[:, :4]
+        self.conf = data[:, 4]
+        self.cls = data[:, 5]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class OnnxResult:
+    """Prediction for one image (.boxes and .names, like ultralytics Results)."""
+
+    def __init__(self, boxes: OnnxBoxes, names: Dict[int, str], orig_shape: Tuple[int, int]):
+        self.boxes = boxes
+        self.names = names
+        self.orig_shape = orig_shape
+
+
+class OnnxYoloModel:
+    """
+    DocLayout-YOLO on ONNX Runtime (CPU), with a YOLOv10-compatible predict().
+
+    Usage Example:
+    --------------
+    >>> model = OnnxYoloModel(export_onnx(model_path, imgsz=1280))
+    >>> results = model.predict([page_bgr_1, page_bgr_2], conf=0.2)
+    >>> batch = DetectionBatch.from_result(results[0], page_num, 1 / zoom, CLASS_MAPPING)
+    """
+
+    def __init__(self, onnx_path: Union[str, Path], intra_op_threads: Optional[int] = None):
+        """
+        Create the inference session.
+
+        Args:
+            onnx_path: Exported model (see export_onnx)
+            intra_op_threads: ONNX Runtime intra-op threads (None = ORT default)
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("backend='onnx' requires onnxruntime (pip install onnxruntime)")
+
+        options = ort.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+            options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.onnx_path = Path(onnx_path)
+        self.session = ort.InferenceSession(str(self.onnx_path), sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+        # Export metadata written by the ultralytics exporter
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names: Dict[int, str] = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+        self.stride = int(ast.literal_eval(metadata.get('stride', '32')))
+        imgsz = ast.literal_eval(metadata.get('imgsz', '1024'))
+        self.imgsz = int(max(imgsz) if isinstance(imgsz, (list, tuple)) else imgsz)
+
+        # Matches YOLOv10.overrides (UnifiedDetectionModule.model_imgsz reads it)
+        self.overrides = {'imgsz': self.imgsz}
+
+    def predict(self, source: Union[np.ndarray, str, Path, Sequence[Union[np.ndarray, str, Path]]],
+                conf: float = 0.25, imgsz: Optional[int] = None, verbose: bool = False,
+                **kwargs) -> List[OnnxResult]:
+        """
+        Detect layout elements in one image or a batch.
+
+        Args:
+            source: BGR uint8 array, image path, or a list of them
+            conf: Minimum confidence (score > conf is kept, as in YOLOv10)
+            imgsz: Input size (default: the export's imgsz)
+            verbose: Unused (API compatibility)
+
+        Returns:
+            One OnnxResult per image
+        """
+        if isinstance(source, (np.ndarray, str, Path)):
+            source = [source]
+        images = [cv2.imread(str(s)) if isinstance(s, (str, Path)) else s for s in source]
+        tensor = preprocess(images, int(imgsz or self.imgsz), self.stride)
+
+        output = self.session.run(None, {self.input_name: tensor})[0]
+        if output.ndim != 3 or output.shape[-1] != 6:
+            raise ValueError(
+                f"Unexpected ONNX output shape {output.shape}; expected YOLOv10 "
+                f"end-to-end output (batch, max_det, 6)"
+            )
+
+        input_shape = tensor.shape[2:]
+        results = []
+        for image, preds in zip(images, output):
+            preds = preds[preds[:, 4] > conf].astype(np.float32)
+            preds[:, :4] = scale_boxes(preds[:, :4], input_shape, image.shape[:2])
+            results.append(OnnxResult(OnnxBoxes(preds), self.names, image.shape[:2]))
+        return results
@@ -17,9 +17,19 @@ Design Rationale:
 -----------------
 - **Efficiency**: Single scan instead of multiple redundant scans
 - **Reuse**: Outputs zones for existing RAG agents (no agent modification)
-- **Parallelization**: Page-level parallel processing for maximum throughput
-- **Pairing**: Intelligent algorithm matches formulas with captions
+- **Parallelization**: Persistent model-per-worker process pool (spawn, pinned threads)
+- **Pairing**: Per-page global assignment matches formulas with captions
 - **PyTorch Fix**: Monkeypatch torch.load for PyTorch 2.6+ compatibility
+- **In-Memory Mode**: Optional batched inference on numpy pixmaps (no temp PNGs)
+- **Detection Cache**: Optional content-addressed per-page cache (skips unchanged pages)
+- **Model-Input Rendering**: Optional render mode that rasterizes pages directly at
+  the model's imgsz instead of 300 DPI (YOLO would downscale them anyway)
+- **Vectorized Decoding**: Each YOLO result is decoded in one NumPy pass into an
+  array-backed DetectionBatch; Detection objects are only built for pairing
+- **ONNX Backend**: Optional backend='onnx' exports the checkpoint once and runs
+  it on ONNX Runtime (CPU) instead of PyTorch eager mode (see onnx_backend.py)
+- **INT8 Mode**: backend='onnx_int8' runs the calibrated INT8 model built by
+  int8_quantization.py (CPU-only nodes)
 
 Author: Claude Code
 Date: 2025-11-16
@@ -85,16 +95,24 @@ print("✅ Applied PyTorch 2.9+ compatibility patch (torch.load weights_only=Fal
 # ============================================================================
 
 import fitz
+import numpy as np
 from doclayout_yolo import YOLOv10
 from pathlib import Path
 import re
+import tempfile
+import multiprocessing
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
 # Import Zone from base agent
-from common.src.base.base_extraction_agent import Zone
+from common.src.base.base_extraction_agent import Zone, ensure_unique_zone_ids
+from detection_v14_P14.src.cache.detection_cache import DetectionCache
+from detection_v14_P14.src.yolo.spatial_pairing import pair_detections
+from detection_v14_P14.src.yolo.detection_batch import DetectionBatch
+from detection_v14_P14.src.yolo.onnx_backend import OnnxYoloModel, export_onnx, ONNXRUNTIME_AVAILABLE
+from detection_v14_P14.src.yolo.int8_quantization import find_quantized_model, quantized_model_path
 
 
 @dataclass
@@ -138,35 +156,183 @@ class UnifiedDetectionModule:
         'title': 'title'
     }
 
-    def __init__(self, model_path: str, confidence_threshold: float = 0.2):
+    # Class vocabulary of DetectionBatch (mapped types)
+    CLASS_VOCABULARY = DetectionBatch.vocabulary(CLASS_MAPPING)
+
+    # Page render resolution used for detection (bboxes are scaled back to 72 DPI)
+    RENDER_DPI = 300
+
+    # Supported ways of handing rendered pages to YOLO
+    INFERENCE_MODES = ('tempfile', 'in_memory')
+
+    # 'dpi': render at RENDER_DPI; 'model_input': longest page side = model imgsz
+    RENDER_MODES = ('dpi', 'model_input')
+
+    # Model input size when neither the checkpoint nor its filename states one
+    DEFAULT_IMGSZ = 1024
+
+    # 'torch': doclayout_yolo.YOLOv10 (PyTorch eager); 'onnx': ONNX Runtime CPU;
+    # 'onnx_int8': INT8-quantized ONNX model on ONNX Runtime CPU
+    BACKENDS = ('torch', 'onnx', 'onnx_int8')
+
+    def __init__(self, model_path: str, confidence_threshold: float = 0.2,
+                 inference_mode: str = 'tempfile', batch_size: int = 8,
+                 cache: Optional[DetectionCache] = None, render_mode: str = 'dpi',
+                 imgsz: Optional[int] = None, backend: str = 'torch',
+                 onnx_path: Optional[str] = None):
         """
         Initialize unified detector.
 
         Args:
             model_path: Path to DocLayout-YOLO model
             confidence_threshold: Minimum confidence (default: 0.2)
+            inference_mode: 'tempfile' (render → PNG on disk → predict, one page
+                           at a time) or 'in_memory' (pixmaps passed to YOLO as
+                           numpy arrays, predicted in batches, no files)
+            batch_size: Pages per predict() call in 'in_memory' mode (default: 8)
+            cache: Optional DetectionCache; pages whose content, model, threshold
+                   and render DPI match a previous run skip inference
+            render_mode: 'dpi' (render at RENDER_DPI, default) or 'model_input'
+                        (render so the longest page side equals the model's imgsz;
+                        no full-resolution raster that YOLO downscales anyway)
+            imgsz: Model input size for 'model_input' mode (default: read from the
+                   checkpoint name, e.g. *_imgsz1280_*.pt, or the loaded model)
+            backend: 'torch' (YOLOv10 in PyTorch eager mode, default), 'onnx'
+                    (checkpoint exported to ONNX once, run with ONNX Runtime on CPU)
+                    or 'onnx_int8' (INT8 model from int8_quantization.py)
+            onnx_path: Existing ONNX model for the ONNX backends (default: the fp32
+                       export next to the checkpoint, created on first use, or its
+                       *_int8_static.onnx / *_int8_dynamic.onnx quantization for
+                       'onnx_int8')
         """
+        if inference_mode not in self.INFERENCE_MODES:
+            raise ValueError(
+                f"Unknown inference_mode '{inference_mode}' "
+                f"(expected one of {self.INFERENCE_MODES})"
+            )
+        if render_mode not in self.RENDER_MODES:
+            raise ValueError(
+                f"Unknown render_mode '{render_mode}' "
+                f"(expected one of {self.RENDER_MODES})"
+            )
+        if backend not in self.BACKENDS:
+            raise ValueError(
+                f"Unknown backend '{backend}' "
+                f"(expected one of {self.BACKENDS})"
+            )
+        if backend != 'torch' and not ONNXRUNTIME_AVAILABLE:
+            raise ImportError(f"backend='{backend}' requires onnxruntime (pip install onnxruntime)")
+
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
+        self.inference_mode = inference_mode
+        self.batch_size = max(1, int(batch_size))
+        self.cache = cache
+        self.render_mode = render_mode
+        self.imgsz = imgsz
+        self.backend = backend
+        self.onnx_path = onnx_path
         self.model = None
+        self.last_run_stats = {}
 
     def _load_model(self):
         """Load YOLO model with PyTorch compatibility fix already applied."""
         if self.model is None:
+            if self.backend != 'torch':
+                onnx_path = self._ensure_onnx_export()
+                print(f"Loading ONNX model from {onnx_path}...")
+                # Same intra-op share as torch (pool workers pin torch threads first)
+                self.model = OnnxYoloModel(onnx_path, intra_op_threads=torch.get_num_threads())
+                print(f"✅ ONNX model loaded successfully (ONNX Runtime CPU, backend {self.backend})")
+                return
+
             print(f"Loading YOLO model from {self.model_path}...")
             self.model = YOLOv10(self.model_path)
             print(f"✅ YOLO model loaded successfully (PyTorch {torch.__version__})")
 
-    def detect_all_objects(self, pdf_path: Path, num_workers: int = 8,
-                          start_page: int = 0, end_page: Optional[int] = None) -> List[Zone]:
+    def _ensure_onnx_export(self) -> str:
+        """Path of the ONNX model, exporting the checkpoint on first use."""
+        if self.onnx_path is None:
+            fp32_path = export_onnx(self.model_path, self._checkpoint_imgsz())
+            if self.backend == 'onnx_int8':
+                # Whichever mode tools/quantize_detection_model.py built (static first)
+                int8_path = find_quantized_model(fp32_path)
+                if int8_path is None:
+                    raise FileNotFoundError(
+                        f"No INT8 model at {quantized_model_path(fp32_path, 'static')} or "
+                        f"{quantized_model_path(fp32_path, 'dynamic')} - build it with "
+                        f"tools/quantize_detection_model.py"
+                    )
+                self.onnx_path = str(int8_path)
+            else:
+                self.onnx_path = str(fp32_path)
+        return self.onnx_path
+
+    def _checkpoint_imgsz(self) -> Optional[int]:
+        """Explicit imgsz, else the one encoded in the checkpoint filename (or None)."""
+        if self.imgsz is None:
+            match = re.search(r'imgsz(\d+)', Path(self.model_path).name)
+            if match:
+                self.imgsz = int(match.group(1))
+        return self.imgsz
+
+    def model_imgsz(self) -> int:
+        """
+        Model input size (longest side, pixels).
+
+        Resolved without loading the model when possible: explicit imgsz, then
+        the checkpoint filename (DocLayout-YOLO names encode it), then the
+        loaded model's training args.
+        """
+        if self._checkpoint_imgsz() is None:
+            self._load_model()
+            imgsz = self.model.overrides.get('imgsz', self.DEFAULT_IMGSZ)
+            self.imgsz = int(max(imgsz) if isinstance(imgsz, (list, tuple)) else imgsz)
+        return self.imgsz
+
+    def render_key(self):
+        """Render resolution (and non-default backend) identifier (part of the detection cache key)."""
+        key = f"imgsz{self.model_imgsz()}" if self.render_mode == 'model_input' else self.RENDER_DPI
+        if self.backend != 'torch':
+            # Backends agree within numerical tolerance, not bit-for-bit
+            key = f"{key}|{self.backend}"
+        if self.backend == 'onnx_int8':
+            # Static and dynamic quantizations detect differently
+            key = f"{key}|{Path(self._ensure_onnx_export()).stem}"
+        return key
+
+    def _render_zoom(self, page: fitz.Page) -> float:
+        """Pixels per PDF point for this page in the current render mode."""
+        if self.render_mode == 'model_input':
+            return self.model_imgsz() / max(page.rect.width, page.rect.height)
+        return self.RENDER_DPI / 72
+
+    def _predict_kwargs(self) -> Dict[str, Any]:
+        """Extra predict() arguments for the current render mode."""
+        if self.render_mode == 'model_input':
+            # Input already at imgsz: letterboxing only pads, never resizes
+            return {'imgsz': self.model_imgsz()}
+        return {}
+
+    def detect_all_objects(self, pdf_path: Path, num_workers: int = 1,
+                          start_page: int = 0, end_page: Optional[int] = None,
+                          cpu_budget: Optional[int] = None, document_session=None) -> List[Zone]:
         """
         Detect ALL object types in a single pass with parallel page processing.
 
         Args:
             pdf_path: Path to PDF file
-            num_workers: Number of parallel workers
+            num_workers: Number of parallel workers. 1 (default) = in-process
+                        detection; >1 = persistent spawned worker pool, opt-in
+                        (the calling script must guard its entry point with
+                        if __name__ == "__main__")
             start_page: Starting page (0-indexed)
             end_page: Ending page (None = all pages)
+            cpu_budget: CPUs the worker pool may use in total (None = all CPUs);
+                        set when another engine runs concurrently
+            document_session: Optional shared PdfDocumentSession; page counting, page
+                              hashing and in-process rendering use its document
+                              (pool workers still open their own)
 
         Returns:
             List[Zone] ready for existing RAG agents
@@ -179,96 +345,80 @@ class UnifiedDetectionModule:
         print(f"Confidence: {self.confidence_threshold}")
         print()
 
-        # Load model if not already loaded
-        self._load_model()
-
         # Get page range
-        doc = fitz.open(pdf_path)
-        total_pages = len(doc)
-        if end_page is None:
-            end_page = total_pages - 1
-        doc.close()
+        end_page = self._resolve_end_page(pdf_path, end_page, document_session)
 
         pages_to_process = list(range(start_page, end_page + 1))
         print(f"Processing {len(pages_to_process)} pages (pages {start_page+1} to {end_page+1})")
         print()
 
-        # Process pages sequentially (CPU mode - multiprocessing causes hangs)
-        all_detections = []
         start_time = datetime.now()
 
-        print("Starting sequential page detection (CPU mode)...")
-        # Open PDF once for all pages
-        doc = fitz.open(pdf_path)
-
-        for page_num in pages_to_process:
-            try:
-                page = doc[page_num]
-
-                # Render page to image (300 DPI)
-                mat = fitz.Matrix(300/72, 300/72)
-                pix = page.get_pixmap(matrix=mat)
-
-                # Save to temporary file for YOLO
-                import tempfile
-                import os
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                    pix.save(tmp.name)
-                    tmp_path = tmp.name
-
-                # Run YOLO detection
-                results = self.model.predict(tmp_path, conf=self.conf_threshold, verbose=False)
-
-                # Clean up temp file
-                os.unlink(tmp_path)
-
-                # Convert YOLO results to Detection objects
-                page_detections = []
-                if results and len(results) > 0:
-                    result = results[0]
-                    if result.boxes is not None and len(result.boxes) > 0:
-                        for box in result.boxes:
-                            class_id = int(box.cls[0].item())
-                            class_name = result.names[class_id]
-
-                            # Map YOLO class to our types
-                            if class_name in self.CLASS_MAPPING:
-                                obj_type = self.CLASS_MAPPING[class_name]
-
-                                # Get bbox coordinates (xyxy format)
-                                xyxy = box.xyxy[0].tolist()
-                                # Scale back from 300 DPI to PDF coords (72 DPI)
-                                scale = 72/300
-                                bbox = tuple(coord * scale for coord in xyxy)
-
-                                detection = Detection(
-                                    class_name=obj_type,
-                                    confidence=float(box.conf[0].item()),
-                                    page_num=page_num,
-                                    bbox=bbox,
-                                    text=""
-                                )
-                                page_detections.append(detection)
-
-                all_detections.extend(page_detections)
-                print(f"  Page {page_num+1}: {len(page_detections)} detections")
-
-            except Exception as e:
-                print(f"  ⚠️  Page {page_num+1} failed: {e}")
-
-        doc.close()
+        # Reuse cached per-page detections where page content, model, threshold
+        # and render DPI are all unchanged
+        detections_by_page = {}
+        page_hashes = {}
+        if self.cache is not None:
+            page_hashes = self.cache.page_hashes(
+                pdf_path, pages_to_process, doc=document_session.doc if document_session else None
+            )
+            model_hash = self.cache.model_hash(self.model_path)
+            render_key = self.render_key()
+            for page_num in pages_to_process:
+                cached = self.cache.get_page_detections(
+                    page_hashes[page_num], model_hash, self.confidence_threshold, render_key
+                )
+                if cached is not None:
+                    detections_by_page[page_num] = DetectionBatch.from_records(
+                        cached, page_num, self.CLASS_VOCABULARY
+                    )
+            print(f"Detection cache: {len(detections_by_page)}/{len(pages_to_process)} pages cached")
+
+        pages_to_detect = [p for p in pages_to_process if p not in detections_by_page]
+        num_workers = self.resolve_num_workers(num_workers, len(pages_to_detect))
+
+        if pages_to_detect:
+            detected = self._run_detection(pdf_path, pages_to_detect, num_workers, cpu_budget,
+                                           document_session)
+            detections_by_page.update(detected)
+
+            # Cache successfully detected pages (failed pages are absent and retried next run)
+            if self.cache is not None:
+                for page_num, page_detections in detected.items():
+                    self.cache.put_page_detections(
+                        page_hashes[page_num], model_hash, self.confidence_threshold,
+                        render_key, page_detections.to_records()
+                    )
+
+        all_detections = DetectionBatch.concatenate(
+            [DetectionBatch.empty(self.CLASS_VOCABULARY)] +
+            [detections_by_page[p] for p in pages_to_process if p in detections_by_page]
+        )
 
         duration = (datetime.now() - start_time).total_seconds()
-        print(f"\nDetection complete in {duration:.1f}s")
+        pages_per_second = len(pages_to_process) / duration if duration > 0 else 0.0
+        self.last_run_stats = {
+            'inference_mode': self.inference_mode if num_workers == 1 else 'in_memory',
+            'render_mode': self.render_mode,
+            'backend': self.backend,
+            'batch_size': self.batch_size,
+            'num_workers': num_workers,
+            'pages': len(pages_to_process),
+            'pages_detected': len(pages_to_detect),
+            'pages_from_cache': len(pages_to_process) - len(pages_to_detect),
+            'detection_seconds': duration,
+            'pages_per_second': pages_per_second
+        }
+        print(f"\nDetection complete in {duration:.1f}s ({pages_per_second:.2f} pages/sec)")
         print(f"Total raw detections: {len(all_detections)}")
         print()
 
-        # Group detections by type
-        equations = [d for d in all_detections if d.class_name == 'equation']
-        equation_numbers = [d for d in all_detections if d.class_name == 'equation_number']
-        figures = [d for d in all_detections if d.class_name == 'figure']
-        figure_captions = [d for d in all_detections if d.class_name == 'figure_caption']
-        text_blocks = [d for d in all_detections if d.class_name == 'text']
+        # Group detections by type (Detection objects only from here on)
+        equations = all_detections.of_class('equation').to_detections(Detection)
+        equation_numbers = all_detections.of_class('equation_number').to_detections(Detection)
+        figures = all_detections.of_class('figure').to_detections(Detection)
+        figure_captions = all_detections.of_class('figure_caption').to_detections(Detection)
+        text_blocks = all_detections.of_class('text').to_detections(Detection)
 
         print("Detection breakdown:")
         print(f"  Equations: {len(equations)}")
@@ -293,8 +443,8 @@ class UnifiedDetectionModule:
         text_zones = self._text_to_zones(text_blocks)
         print(f"  Created {len(text_zones)} text zones")
 
-        # Combine all zones
-        all_zones = equation_zones + figure_zones + text_zones
+        # Combine all zones (page-based IDs can repeat, e.g. two "unknown" numbers)
+        all_zones = ensure_unique_zone_ids(equation_zones + figure_zones + text_zones)
         print()
         print(f"Total zones created: {len(all_zones)}")
         print(f"  Equations: {len(equation_zones)}")
@@ -304,11 +454,273 @@ class UnifiedDetectionModule:
 
         return all_zones
 
+    @staticmethod
+    def resolve_num_workers(num_workers: int, pages_to_detect: int) -> int:
+        """Worker count detect_all_objects actually uses: no more workers than pages to detect."""
+        return max(1, min(num_workers, pages_to_detect))
+
+    def pages_to_detect(self, pdf_path: Path, start_page: int = 0, end_page: Optional[int] = None,
+                        document_session=None) -> List[int]:
+        """
+        Pages detect_all_objects would run YOLO on: the range minus pages with
+        cached detections (the whole range without a cache).
+
+        Lets a caller size what runs next to detection (e.g. decide whether
+        detection stays in-process) before starting it. Cache lookups here are
+        not counted in the cache statistics.
+
+        Args:
+            pdf_path: Path to PDF file
+            start_page: Starting page (0-indexed)
+            end_page: Ending page (None = all pages)
+            document_session: Optional shared PdfDocumentSession
+
+        Returns:
+            0-indexed page numbers
+        """
+        end_page = self._resolve_end_page(pdf_path, end_page, document_session)
+        pages = list(range(start_page, end_page + 1))
+        if self.cache is None:
+            return pages
+
+        page_hashes = self.cache.page_hashes(
+            pdf_path, pages, doc=document_session.doc if document_session else None
+        )
+        model_hash = self.cache.model_hash(self.model_path)
+        render_key = self.render_key()
+        return [
+            page_num for page_num in pages
+            if not self.cache.has_page_detections(
+                page_hashes[page_num], model_hash, self.confidence_threshold, render_key
+            )
+        ]
+
+    @staticmethod
+    def _resolve_end_page(pdf_path: Path, end_page: Optional[int], document_session=None) -> int:
+        """Last page to process (0-indexed): end_page, or the document's last page."""
+        if end_page is not None:
+            return end_page
+        if document_session is not None:
+            return len(document_session) - 1
+        with fitz.open(pdf_path) as doc:
+            return len(doc) - 1
+
+    def _run_detection(self, pdf_path: Path, pages: List[int], num_workers: int,
+                       cpu_budget: Optional[int] = None,
+                       document_session=None) -> Dict[int, DetectionBatch]:
+        """
+        Run YOLO over pages, on the worker pool or in-process.
+
+        Returns:
+            DetectionBatch per 0-indexed page (pages that failed are absent)
+        """
+        if num_workers > 1:
+            # Persistent model-per-worker pool (see PERSISTENT WORKER POOL below)
+            return self._detect_pages_pool(pdf_path, pages, num_workers, cpu_budget)
+
+        # Load model if not already loaded
+        self._load_model()
+
+        # Open PDF once for all pages (or use the shared session's document)
+        doc = document_session.doc if document_session is not None else fitz.open(pdf_path)
+        try:
+            if self.inference_mode == "in_memory":
+                print(f"Starting in-memory batched page detection (batch size {self.batch_size})...")
+                return self._detect_pages_in_memory(doc, pages)
+            print("Starting sequential page detection (CPU mode)...")
+            return self._detect_pages_tempfile(doc, pages)
+        finally:
+            if document_session is None:
+                doc.close()
+
+    def _render_page(self, page: fitz.Page) -> Tuple[fitz.Pixmap, float]:
+        """
+        Render page at detection resolution.
+
+        Returns:
+            (pixmap, zoom) - zoom is pixels per PDF point, needed to scale bboxes back
+        """
+        zoom = self._render_zoom(page)
+        return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)), zoom
+
+    @staticmethod
+    def _pixmap_to_array(pix: fitz.Pixmap) -> np.ndarray:
+        """
+        Convert a PyMuPDF pixmap to the HxWx3 BGR uint8 array YOLO expects.
+
+        YOLO treats numpy input as BGR (OpenCV convention), which is exactly what
+        cv2.imread() returns for the PNG written in 'tempfile' mode. Swapping the
+        channels here keeps both modes pixel-identical.
+        """
+        arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        if pix.n == 1:
+            arr = np.repeat(arr, 3, axis=2)
+        elif pix.n == 4:
+            arr = arr[:, :, :3]
+        return np.ascontiguousarray(arr[:, :, ::-1])
+
+    def _result_to_detections(self, result, page_num: int, zoom: float) -> DetectionBatch:
+        """
+        Decode one YOLO result (one page) into a DetectionBatch in PDF coordinates.
+
+        Args:
+            result: YOLO result for the page
+            page_num: 0-indexed page number
+            zoom: Pixels per PDF point the page was rendered at
+        """
+        # Scale back from render resolution to PDF coords (72 DPI)
+        return DetectionBatch.from_result(result, page_num, 1 / zoom, self.CLASS_MAPPING)
+
+    def _detect_pages_tempfile(self, doc: fitz.Document, pages: List[int]) -> Dict[int, DetectionBatch]:
+        """Detect pages one at a time via a temporary PNG file per page."""
+        detections_by_page = {}
+
+        for page_num in pages:
+            try:
+                page = doc[page_num]
+
+                # Render page to image (RENDER_DPI or model input size)
+                pix, zoom = self._render_page(page)
+
+                # Save to temporary file for YOLO
+                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
+                    pix.save(tmp.name)
+                    tmp_path = tmp.name
+
+                # Run YOLO detection
+                results = self.model.predict(tmp_path, conf=self.confidence_threshold, verbose=False,
+                                             **self._predict_kwargs())
+
+                # Clean up temp file
+                os.unlink(tmp_path)
+
+                # Decode YOLO results
+                page_detections = DetectionBatch.empty(self.CLASS_VOCABULARY)
+                if results and len(results) > 0:
+                    page_detections = self._result_to_detections(results[0], page_num, zoom)
+
+                detections_by_page[page_num] = page_detections
+                print(f"  Page {page_num+1}: {len(page_detections)} detections")
+
+            except Exception as e:
+                print(f"  ⚠️  Page {page_num+1} failed: {e}")
+
+        return detections_by_page
+
+    def _detect_pages_in_memory(self, doc: fitz.Document, pages: List[int]) -> Dict[int, DetectionBatch]:
+        """
+        Detect pages in batches, passing rendered pixmaps to YOLO as numpy arrays.
+
+        A batch only ever holds pages of identical pixel size: YOLO letterboxes
+        mixed-size batches to a full square, which would shift boxes relative to
+        the one-page-at-a-time path. Uniform batches keep output identical.
+        """
+        detections_by_page = {}
+        batch_pages: List[int] = []
+        batch_images: List[np.ndarray] = []
+        batch_zooms: List[float] = []
+
+        def flush():
+            if not batch_pages:
+                return
+            try:
+                results = self.model.predict(list(batch_images), conf=self.confidence_threshold,
+                                             verbose=False, **self._predict_kwargs())
+                for page_num, zoom, result in zip(batch_pages, batch_zooms, results):
+                    page_detections = self._result_to_detections(result, page_num, zoom)
+                    detections_by_page[page_num] = page_detections
+                    print(f"  Page {page_num+1}: {len(page_detections)} detections")
+            except Exception as e:
+                print(f"  ⚠️  Pages {batch_pages[0]+1}-{batch_pages[-1]+1} failed: {e}")
+            batch_pages.clear()
+            batch_images.clear()
+            batch_zooms.clear()
+
+        for page_num in pages:
+            try:
+                pix, zoom = self._render_page(doc[page_num])
+                image = self._pixmap_to_array(pix)
+            except Exception as e:
+                print(f"  ⚠️  Page {page_num+1} failed: {e}")
+                continue
+
+            if batch_images and image.shape != batch_images[0].shape:
+                flush()
+
+            batch_pages.append(page_num)
+            batch_images.append(image)
+            batch_zooms.append(zoom)
+
+            if len(batch_images) >= self.batch_size:
+                flush()
+
+        flush()
+        return detections_by_page
+
+    def _detect_pages_pool(self, pdf_path: Path, pages: List[int], num_workers: int,
+                           cpu_budget: Optional[int] = None) -> Dict[int, DetectionBatch]:
+        """
+        Detect pages on a pool of persistent worker processes.
+
+        Each worker loads YOLO once, keeps the PDF open and pulls page chunks from
+        the executor's task queue. torch intra-op threads are split evenly across
+        workers so the pool never oversubscribes the CPU.
+
+        Args:
+            pdf_path: Path to PDF file
+            pages: 0-indexed page numbers to detect
+            num_workers: Number of worker processes
+            cpu_budget: Total CPUs for the pool (None = all CPUs)
+
+        Returns:
+            DetectionBatch per 0-indexed page (pages that failed are absent)
+        """
+        intra_op_threads = max(1, (cpu_budget or os.cpu_count() or 1) // num_workers)
+        if self.backend != 'torch':
+            # Export once in the parent, not concurrently in every worker
+            self._ensure_onnx_export()
+        chunk_size = self.batch_size
+        chunks = [pages[i:i + chunk_size] for i in range(0, len(pages), chunk_size)]
+
+        print(f"Starting worker pool: {num_workers} processes × {intra_op_threads} threads, "
+              f"{len(chunks)} chunks of up to {chunk_size} pages...")
+
+        detections_by_page = {}
+        executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_detection_worker,
+            initargs=(str(pdf_path), self.model_path, self.confidence_threshold,
+                      intra_op_threads, self.batch_size, self.render_mode, self.imgsz,
+                      self.backend, self.onnx_path)
+        )
+        with executor:
+            futures = {
+                executor.submit(_detect_pages_worker, chunk): idx
+                for idx, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                idx = futures[future]
+                chunk = chunks[idx]
+                try:
+                    chunk_detections = future.result()
+                    detections_by_page.update(chunk_detections)
+                    print(f"  Pages {chunk[0]+1}-{chunk[-1]+1}: "
+                          f"{sum(len(d) for d in chunk_detections.values())} detections")
+                except Exception as e:
+                    print(f"  ⚠️  Pages {chunk[0]+1}-{chunk[-1]+1} failed: {e}")
+
+        return detections_by_page
+
     def _pair_equations(self, equations: List[Detection], numbers: List[Detection],
                        max_distance: float = 150.0) -> List[Zone]:
         """
         Pair equation regions with their numbers using spatial proximity.
 
+        Pairing is a global assignment per page (see spatial_pairing.py), so a
+        number always goes to the equation that needs it most, independent of
+        detection order.
+
         Args:
             equations: List of equation detections
             numbers: List of equation number detections
@@ -318,14 +730,10 @@ class UnifiedDetectionModule:
             List of Zone objects with equation metadata
         """
         zones = []
-        used_numbers = set()
+        pairings = pair_detections(equations, numbers, max_distance)
 
-        for eq in equations:
-            # Find closest number on same page
-            candidates = [n for n in numbers
-                         if n.page_num == eq.page_num and id(n) not in used_numbers]
-
-            if not candidates:
+        for eq, pairing in zip(equations, pairings):
+            if not pairing.had_candidates:
                 # No number found - create zone without number
                 zone_id = f"eq_yolo_{eq.page_num}_{len(zones)}"
                 zone = Zone(
@@ -342,11 +750,9 @@ class UnifiedDetectionModule:
                 zones.append(zone)
                 continue
 
-            # Find closest number
-            closest = min(candidates, key=lambda n: eq.distance_to(n))
-            distance = eq.distance_to(closest)
+            if pairing.partner is not None:
+                closest = pairing.partner
 
-            if distance <= max_distance:
                 # Extract equation number from text
                 number_text = closest.text
                 number_match = re.search(r'\((\d+[a-z]?)\)', number_text)
@@ -363,12 +769,11 @@ class UnifiedDetectionModule:
                         'confidence': eq.confidence,
                         'equation_number': equation_number,
                         'number_bbox': list(closest.bbox),
-                        'pairing_distance': distance,
+                        'pairing_distance': pairing.distance,
                         'has_number': True
                     }
                 )
                 zones.append(zone)
-                used_numbers.add(id(closest))
             else:
                 # Number too far - create zone without number
                 zone_id = f"eq_yolo_{eq.page_num}_{len(zones)}"
@@ -381,7 +786,7 @@ class UnifiedDetectionModule:
                         'detection_method': 'yolo',
                         'confidence': eq.confidence,
                         'has_number': False,
-                        'closest_number_distance': distance
+                        'closest_number_distance': pairing.closest_distance
                     }
                 )
                 zones.append(zone)
@@ -393,6 +798,8 @@ class UnifiedDetectionModule:
         """
         Pair figure regions with their captions using spatial proximity.
 
+        Uses the same per-page global assignment as _pair_equations.
+
         Args:
             figures: List of figure detections
             captions: List of caption detections
@@ -402,14 +809,10 @@ class UnifiedDetectionModule:
             List of Zone objects with figure metadata
         """
         zones = []
-        used_captions = set()
-
-        for fig in figures:
-            # Find closest caption on same page
-            candidates = [c for c in captions
-                         if c.page_num == fig.page_num and id(c) not in used_captions]
+        pairings = pair_detections(figures, captions, max_distance)
 
-            if not candidates:
+        for fig, pairing in zip(figures, pairings):
+            if not pairing.had_candidates:
                 # No caption found
                 zone_id = f"fig_yolo_{fig.page_num}_{len(zones)}"
                 zone = Zone(
@@ -426,11 +829,8 @@ class UnifiedDetectionModule:
                 zones.append(zone)
                 continue
 
-            # Find closest caption
-            closest = min(candidates, key=lambda c: fig.distance_to(c))
-            distance = fig.distance_to(closest)
-
-            if distance <= max_distance:
+            if pairing.partner is not None:
+                closest = pairing.partner
                 zone_id = f"fig_yolo_{fig.page_num}_{len(zones)}"
                 zone = Zone(
                     zone_id=zone_id,
@@ -442,12 +842,11 @@ class UnifiedDetectionModule:
                         'confidence': fig.confidence,
                         'caption': closest.text,
                         'caption_bbox': list(closest.bbox),
-                        'pairing_distance': distance,
+                        'pairing_distance': pairing.distance,
                         'has_caption': True
                     }
                 )
                 zones.append(zone)
-                used_captions.add(id(closest))
             else:
                 # Caption too far
                 zone_id = f"fig_yolo_{fig.page_num}_{len(zones)}"
@@ -460,7 +859,7 @@ class UnifiedDetectionModule:
                         'detection_method': 'yolo',
                         'confidence': fig.confidence,
                         'has_caption': False,
-                        'closest_caption_distance': distance
+                        'closest_caption_distance': pairing.closest_distance
                     }
                 )
                 zones.append(zone)
@@ -486,76 +885,83 @@ class UnifiedDetectionModule:
         return zones
 
 
-def _detect_page_worker(pdf_path: str, page_num: int, model_path: str,
-                       confidence_threshold: float) -> List[Detection]:
-    """
-    Worker function for parallel page detection.
+# ============================================================================
+# PERSISTENT WORKER POOL
+# ============================================================================
+# Why the old multiprocessing attempt hung:
+#   1. Linux forks by default. The parent had already imported torch, loaded the
+#      model and spun up its OpenMP/MKL thread pool; fork() copies that pool's
+#      locked mutexes but not its threads, so the first parallel op inside a
+#      child blocks forever.
+#   2. Every child then ran torch with one intra-op thread per core, so N workers
+#      meant N×cores threads fighting over the CPU.
+#   3. Each task reloaded YOLOv10 and reopened the PDF, so even when it did not
+#      hang it was slower than the sequential loop.
+#
+# Fix: 'spawn' start method (clean interpreter, no inherited locks), per-worker
+# thread pinning, and an initializer that loads the model and opens the PDF ONCE
+# per process. Page chunks are then pulled from the executor's shared task queue.
+# ============================================================================
 
-    Note: This loads the model for each worker. The PyTorch patch is applied
-    at module level, so it's safe for all workers.
+# Per-process state populated by _init_detection_worker
+_WORKER_STATE = {}
+
+
+def _init_detection_worker(pdf_path: str, model_path: str, confidence_threshold: float,
+                           intra_op_threads: int, batch_size: int, render_mode: str = 'dpi',
+                           imgsz: Optional[int] = None, backend: str = 'torch',
+                           onnx_path: Optional[str] = None):
     """
-    # Ensure PyTorch patch is applied in worker process
-    import torch
-    if not hasattr(torch.load, '__name__') or 'patched' not in str(torch.load):
-        # Re-apply patch in worker process
-        _original = torch.load
-        def _patched(*args, **kwargs):
-            if 'weights_only' not in kwargs:
-                kwargs['weights_only'] = False
-            return _original(*args, **kwargs)
-        torch.load = _patched
-
-    from doclayout_yolo import YOLOv10
-    import fitz
-
-    # Load model (with patch applied)
-    model = YOLOv10(model_path)
-
-    # Open PDF and render page
-    doc = fitz.open(pdf_path)
-    page = doc[page_num]
-
-    # Render page to image (300 DPI)
-    mat = fitz.Matrix(300/72, 300/72)
-    pix = page.get_pixmap(matrix=mat)
-    img_data = pix.tobytes("png")
-
-    doc.close()
-
-    # Run YOLO detection
-    results = model.predict(
-        img_data,
-        imgsz=1280,
-        conf=confidence_threshold,
-        device='cpu'
+    Worker process initializer: pin threads, load the model and open the PDF once.
+
+    Args:
+        pdf_path: PDF shared by every task this worker will receive
+        model_path: Path to DocLayout-YOLO model
+        confidence_threshold: Minimum confidence
+        intra_op_threads: torch/OpenCV threads for this process
+        batch_size: Pages per predict() call inside the worker
+        render_mode: 'dpi' or 'model_input' (see UnifiedDetectionModule)
+        imgsz: Model input size override for 'model_input' mode
+        backend: 'torch', 'onnx' or 'onnx_int8' (see UnifiedDetectionModule)
+        onnx_path: ONNX export prepared by the parent for backend='onnx'
+    """
+    torch.set_num_threads(intra_op_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already set (inter-op pool started)
+
+    try:
+        import cv2
+        cv2.setNumThreads(intra_op_threads)
+    except ImportError:
+        pass
+
+    detector = UnifiedDetectionModule(
+        model_path,
+        confidence_threshold=confidence_threshold,
+        inference_mode='in_memory',
+        batch_size=batch_size,
+        render_mode=render_mode,
+        imgsz=imgsz,
+        backend=backend,
+        onnx_path=onnx_path
     )
+    detector._load_model()
 
-    # Parse results
-    detections = []
-    for result in results:
-        for box in result.boxes:
-            class_id = int(box.cls[0])
-            class_name = result.names[class_id]
-            confidence = float(box.conf[0])
-            bbox = box.xyxy[0].tolist()  # [x0, y0, x1, y1]
-
-            # Scale bbox back to PDF coordinates (from 300 DPI to 72 DPI)
-            scale = 72 / 300
-            bbox = [coord * scale for coord in bbox]
-
-            # Map class name
-            mapped_class = UnifiedDetectionModule.CLASS_MAPPING.get(class_name, class_name)
-
-            detection = Detection(
-                class_name=mapped_class,
-                confidence=confidence,
-                page_num=page_num,
-                bbox=tuple(bbox),
-                text=""  # OCR would go here if needed
-            )
-            detections.append(detection)
+    _WORKER_STATE['detector'] = detector
+    _WORKER_STATE['doc'] = fitz.open(pdf_path)
 
-    return detections
+
+def _detect_pages_worker(page_nums: List[int]) -> Dict[int, DetectionBatch]:
+    """
+    Detect a chunk of pages inside a pool worker.
+
+    Uses the model and document opened by _init_detection_worker. Results cross
+    the process boundary as DetectionBatch arrays.
+    """
+    detector = _WORKER_STATE['detector']
+    return detector._detect_pages_in_memory(_WORKER_STATE['doc'], page_nums)
 
 
 if __name__ == "__main__":
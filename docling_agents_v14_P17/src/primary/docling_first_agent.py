@@ -86,6 +86,13 @@ except ImportError:
         HierarchicalChunker = None
         BaseChunk = None
 
+# Shared conversion cache (converted documents persisted by PDF hash + Docling version)
+try:
+    from detection_v14_P14.src.docling.docling_conversion_service import get_conversion_service
+    CONVERSION_CACHE_AVAILABLE = True
+except ImportError:
+    CONVERSION_CACHE_AVAILABLE = False
+
 logger = get_logger("DoclingFirstAgent")
 
 
@@ -105,6 +112,9 @@ class DoclingFirstAgent(BaseAgent):
         self.docling_config = config.get("docling", {})
         self.chunk_by_pages = self.docling_config.get("chunk_by_pages", True)
         self.timeout_seconds = self.docling_config.get("timeout_seconds", 300)
+        self.conversion_cache_dir = self.docling_config.get("conversion_cache_dir")
+        self.use_conversion_cache = self.docling_config.get("use_conversion_cache", True)
+        self.docling_pipeline = "default"
         
         # Table detection configuration  
         self.table_config = config.get("table_detection", {})
@@ -155,6 +165,7 @@ class DoclingFirstAgent(BaseAgent):
                 self.document_converter = DocumentConverter(
                     pipeline_options=pipeline_options
                 )
+                self.docling_pipeline = "docling_first_formula"
                 logger.info("Docling document converter initialized with enhanced formula extraction")
                 
             except (ImportError, AttributeError) as config_error:
@@ -537,13 +548,21 @@ class DoclingFirstAgent(BaseAgent):
             # Convert document using Docling - need BytesIO for DocumentStream
             from io import BytesIO
             
-            with pdf_path.open("rb") as f:
-                pdf_bytes = f.read()
-                pdf_stream = BytesIO(pdf_bytes)
-                document_stream = DocumentStream(name=pdf_path.name, stream=pdf_stream)
-                result = self.document_converter.convert(document_stream)
-            
-            docling_doc = result.document
+            def convert():
+                with pdf_path.open("rb") as f:
+                    pdf_bytes = f.read()
+                    pdf_stream = BytesIO(pdf_bytes)
+                    document_stream = DocumentStream(name=pdf_path.name, stream=pdf_stream)
+                    return self.document_converter.convert(document_stream)
+            
+            # Read through the shared conversion cache: parallel workers and
+            # repeat runs load the persisted document instead of reconverting
+            if CONVERSION_CACHE_AVAILABLE and self.use_conversion_cache:
+                service = get_conversion_service(self.conversion_cache_dir)
+                docling_doc = service.convert(pdf_path, pipeline=self.docling_pipeline,
+                                              convert_fn=convert).document
+            else:
+                docling_doc = convert().document
             conversion_time = time.time() - start_time
             
             # Note: DoclingDocument doesn't support custom attributes
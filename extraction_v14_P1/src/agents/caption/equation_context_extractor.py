@@ -50,6 +50,9 @@ if sys.platform == 'win32':
 # Third-party imports
 import fitz  # PyMuPDF
 
+# Local imports
+from common.src.file_io.pdf_document_session import PdfDocumentSession
+
 
 class EquationContextExtractor:
     """Extracts descriptive context and variable definitions for equations.
@@ -68,7 +71,8 @@ class EquationContextExtractor:
         self,
         pdf_path: Path,
         spatial_window: int = 200,
-        min_confidence: float = 0.5
+        min_confidence: float = 0.5,
+        document_session: Optional[PdfDocumentSession] = None
     ):
         """Initialize equation context extractor.
 
@@ -76,6 +80,8 @@ class EquationContextExtractor:
             pdf_path: Path to PDF document
             spatial_window: Pixel radius for text extraction around equations
             min_confidence: Minimum confidence threshold for context extraction
+            document_session: Optional shared PDF session (pages are indexed
+                once per page instead of scanned once per equation)
 
         Raises:
             FileNotFoundError: If PDF file does not exist
@@ -94,8 +100,10 @@ class EquationContextExtractor:
             re.compile(r'([A-Za-z_][A-Za-z0-9_]*)\s+(?:represents?|denotes?)\s+(.+?)(?:[.,;]|$)', re.IGNORECASE),
         ]
 
-        # Open PDF document
-        self.doc = fitz.open(str(self.pdf_path))
+        # Open PDF document (shared session if given)
+        self._owns_session = document_session is None
+        self.session = document_session or PdfDocumentSession(self.pdf_path)
+        self.doc = self.session.doc
 
     def extract_all_contexts(
         self,
@@ -204,28 +212,19 @@ class EquationContextExtractor:
             Bounding box [x0, y0, x1, y1] or None
         """
         # Search for equation number on page to get approximate location
-        page = self.doc[page_num]
-        text_blocks = page.get_text("dict")["blocks"]
-
-        # Look for equation number pattern "(N)"
-        pattern = re.compile(rf'\({eq_number}\)')
-
-        for block in text_blocks:
-            if "lines" not in block:
-                continue
-
-            for line in block["lines"]:
-                for span in line["spans"]:
-                    if pattern.search(span["text"]):
-                        # Found equation number - return bbox
-                        # Expand bbox to left for equation content
-                        bbox = span["bbox"]
-                        return [
-                            max(0, bbox[0] - 180),  # 180px left of number
-                            bbox[1] - 20,           # 20px above
-                            bbox[2] + 20,           # 20px right
-                            bbox[3] + 20            # 20px below
-                        ]
+        # (page text indexed once per page)
+        span = self.session.text_index(page_num).find_span(rf'\({eq_number}\)')
+
+        if span:
+            # Found equation number - return bbox
+            # Expand bbox to left for equation content
+            bbox = span[1]
+            return [
+                max(0, bbox[0] - 180),  # 180px left of number
+                bbox[1] - 20,           # 20px above
+                bbox[2] + 20,           # 20px right
+                bbox[3] + 20            # 20px below
+            ]
 
         return None
 
@@ -244,6 +243,7 @@ class EquationContextExtractor:
             Text within window
         """
         page = self.doc[page_num]
+        index = self.session.text_index(page_num)
 
         if eq_bbox:
             # Define search window
@@ -254,11 +254,11 @@ class EquationContextExtractor:
                 min(page.rect.height, eq_bbox[3] + self.spatial_window)
             )
 
-            # Extract text within window
-            window_text = page.get_textbox(search_bbox)
+            # Extract text within window (lines of the indexed page)
+            window_text = index.text_in(search_bbox)
         else:
             # Fallback: entire page text
-            window_text = page.get_text()
+            window_text = index.text
 
         return window_text
 
@@ -468,7 +468,11 @@ class EquationContextExtractor:
 
         print(f"✅ Saved equation contexts to: {output_path}")
 
+    def close(self):
+        """Close the PDF document handle (a shared session is left to its owner)."""
+        if getattr(self, '_owns_session', False):
+            self.session.close()
+
     def __del__(self):
         """Clean up PDF document handle."""
-        if hasattr(self, 'doc'):
-            self.doc.close()
+        self.close()
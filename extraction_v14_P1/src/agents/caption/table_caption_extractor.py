@@ -47,8 +47,8 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
-# Third-party imports
-import fitz  # PyMuPDF
+# Local imports
+from common.src.file_io.pdf_document_session import PdfDocumentSession
 
 
 class TableCaptionExtractor:
@@ -71,7 +71,8 @@ class TableCaptionExtractor:
         self,
         pdf_path: Path,
         proximity_threshold: int = 100,
-        confidence_threshold: float = 0.6
+        confidence_threshold: float = 0.6,
+        document_session: Optional[PdfDocumentSession] = None
     ):
         """Initialize table caption extractor.
 
@@ -79,6 +80,8 @@ class TableCaptionExtractor:
             pdf_path: Path to PDF document
             proximity_threshold: Maximum pixels for spatial proximity detection
             confidence_threshold: Minimum confidence score for automatic association
+            document_session: Optional shared PDF session (pages are indexed
+                once per page instead of scanned once per table and strategy)
 
         Raises:
             FileNotFoundError: If PDF file does not exist
@@ -97,8 +100,10 @@ class TableCaptionExtractor:
             re.compile(r'Tab\.\s+(\d+[a-z]?)[.:\s]+(.+)', re.IGNORECASE),
         ]
 
-        # Open PDF document
-        self.doc = fitz.open(str(self.pdf_path))
+        # Open PDF document (shared session if given)
+        self._owns_session = document_session is None
+        self.session = document_session or PdfDocumentSession(self.pdf_path)
+        self.doc = self.session.doc
 
     def extract_all_captions(
         self,
@@ -214,20 +219,10 @@ class TableCaptionExtractor:
         if page_num < 0 or page_num >= len(self.doc):
             return None
 
-        page = self.doc[page_num]
-        text_blocks = page.get_text("dict")["blocks"]
-
-        for block in text_blocks:
-            if "lines" not in block:
-                continue
-
-            # Reconstruct text from lines
-            block_text = ""
-            block_bbox = block["bbox"]
-
-            for line in block["lines"]:
-                for span in line["spans"]:
-                    block_text += span["text"] + " "
+        # Text blocks of the page, indexed once per page (sorted by y)
+        for block in self.session.text_index(page_num).blocks:
+            block_text = block.span_text
+            block_bbox = block.bbox
 
             # Try each pattern
             for pattern in self.patterns:
@@ -264,26 +259,23 @@ class TableCaptionExtractor:
         Returns:
             Caption data or None if not found
         """
-        page = self.doc[page_num]
-        text_blocks = page.get_text("dict")["blocks"]
-
         candidates = []
 
-        for block in text_blocks:
-            if "lines" not in block:
-                continue
+        # Only blocks within the threshold vertically can be close enough (center distance)
+        table_center_y = (table_bbox[1] + table_bbox[3]) / 2
+        nearby_blocks = self.session.text_index(page_num).blocks_overlapping(
+            table_center_y - self.proximity_threshold,
+            table_center_y + self.proximity_threshold
+        )
 
-            block_bbox = block["bbox"]
+        for block in nearby_blocks:
+            block_bbox = block.bbox
 
             # Calculate distance from block to table
             distance = self._calculate_distance(block_bbox, table_bbox)
 
             if distance < self.proximity_threshold:
-                # Extract text
-                block_text = ""
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        block_text += span["text"] + " "
+                block_text = block.span_text
 
                 # Check if it looks like a table caption
                 if "table" in block_text.lower():
@@ -322,17 +314,8 @@ class TableCaptionExtractor:
         Returns:
             Caption data or None if not found
         """
-        page = self.doc[page_num]
-        text_blocks = page.get_text("dict")["blocks"]
-
-        for block in text_blocks:
-            if "lines" not in block:
-                continue
-
-            block_text = ""
-            for line in block["lines"]:
-                for span in line["spans"]:
-                    block_text += span["text"] + " "
+        for block in self.session.text_index(page_num).blocks:
+            block_text = block.span_text
 
             # Look for "Table" mention
             if "table" in block_text.lower():
@@ -340,7 +323,7 @@ class TableCaptionExtractor:
                 if table_number in block_text or table_number.upper() in block_text:
                     return {
                         "caption": block_text.strip(),
-                        "caption_bbox": list(block["bbox"]),
+                        "caption_bbox": list(block.bbox),
                         "confidence": 0.5,  # Low confidence for heuristic
                         "detection_method": "heuristic_search",
                         "page": page_num
@@ -429,7 +412,11 @@ class TableCaptionExtractor:
 
         print(f"✅ Saved caption results to: {output_path}")
 
+    def close(self):
+        """Close the PDF document handle (a shared session is left to its owner)."""
+        if getattr(self, '_owns_session', False):
+            self.session.close()
+
     def __del__(self):
         """Clean up PDF document handle."""
-        if hasattr(self, 'doc'):
-            self.doc.close()
+        self.close()
@@ -8,5 +8,6 @@ __all__ = [
     'equation_refinement_agent',
     'semantic_equation_extractor',
     'sympy_equation_parser',
+    'latex_structure_validator',
     'latex_quality_control_agent',
 ]
@@ -29,10 +29,94 @@ class EquationRefineOptions:
     env_height_ratio: float = 0.98
 
 
+class PageGeometry:
+    """Text, drawings and a grayscale raster of one page, extracted once.
+
+    refine_from_labels queries the same page dozens of times per label
+    (lines, words, raw chars, drawings, raster slices). Each source is
+    extracted on first use and kept here; raster queries slice one 150 DPI
+    grayscale render of the whole page instead of rendering a clip each time.
+    """
+
+    RASTER_DPI = 150
+
+    def __init__(self, page) -> None:
+        self.page = page
+        self._text: Dict[str, Any] = {}
+        self._drawings: List[Dict[str, Any]] | None = None
+        self._gray = None
+        # Line boxes of the page (filled by EquationRefinementAgent._collect_lines)
+        self.lines: List[Dict[str, Any]] | None = None
+
+    def text(self, option: str) -> Any:
+        """page.get_text(option), or None if extraction failed."""
+        if option not in self._text:
+            try:
+                self._text[option] = self.page.get_text(option)
+            except Exception:
+                self._text[option] = None
+        return self._text[option]
+
+    def drawings(self) -> List[Dict[str, Any]]:
+        """page.get_drawings() ([] if extraction failed)."""
+        if self._drawings is None:
+            try:
+                self._drawings = self.page.get_drawings() or []
+            except Exception:
+                self._drawings = []
+        return self._drawings
+
+    def gray_clip(self, x0: float, y0: float, x1: float, y1: float):
+        """Grayscale slice of the page raster covering (x0, y0, x1, y1).
+
+        Returns (gray, left, top, scale): uint8 array, top-left of the region
+        (clipped to the page) in points, as a get_pixmap(clip=...) render of
+        it would be read, and pixels per point; None if the region is empty
+        or the page cannot be rendered.
+        """
+        try:
+            import fitz
+            import numpy as np
+        except Exception:
+            return None
+        scale = float(self.RASTER_DPI) / 72.0
+        if self._gray is None:
+            try:
+                pix = self.page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+                img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+                if img.shape[2] > 1:
+                    # grayscale approximation
+                    self._gray = (0.299 * img[:,:,0] + 0.587 * img[:,:,1] + 0.114 * img[:,:,2]).astype(np.uint8)
+                else:
+                    self._gray = img[:,:,0]
+            except Exception:
+                self._gray = False
+        if self._gray is False:
+            return None
+        # Same pixel rounding as get_pixmap(clip=...), clipped to the page
+        page_rect = self.page.rect
+        region = fitz.Rect(x0, y0, x1, y1) & page_rect
+        if region.is_empty:
+            return None
+        ox, oy = page_rect.x0, page_rect.y0
+        box = ((region - (ox, oy, ox, oy)) * fitz.Matrix(scale, scale)).round()
+        gray = self._gray[box.y0:box.y1, box.x0:box.x1]
+        if gray.size == 0:
+            return None
+        return gray, region.x0, region.y0, scale
+
+
 class EquationRefinementAgent:
     def __init__(self, options: EquationRefineOptions | None = None) -> None:
         self.opt = options or EquationRefineOptions()
         self._ocr_agent = None
+        self._geometry: PageGeometry | None = None
+
+    def _page_geometry(self, page) -> PageGeometry:
+        """Cached geometry of the page being refined (a fresh one for any other page)."""
+        if self._geometry is not None and self._geometry.page is page:
+            return self._geometry
+        return PageGeometry(page)
 
     def _get_ocr_agent(self):
         if self._ocr_agent is not None:
@@ -51,7 +135,6 @@ class EquationRefinementAgent:
         Returns snapped x0 (points) or None if not found. Right column only for now.
         """
         try:
-            import fitz
             import numpy as np
         except Exception:
             return None
@@ -63,43 +146,23 @@ class EquationRefinementAgent:
         x1 = max(x0 + 20.0, min(x1_limit, x0 + 400.0))
         if x1 <= x0 + 4.0:
             return None
-        # Clip rect and rasterize at modest DPI for speed
-        dpi = 150
-        scale = float(dpi) / 72.0
-        clip = fitz.Rect(x0, y0, x1, y1)
-        try:
-            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), clip=clip, alpha=False)
-        except Exception:
+        # Slice of the page raster (rendered once at modest DPI for speed)
+        clip = self._page_geometry(page).gray_clip(x0, y0, x1, y1)
+        if clip is None:
             return None
-        arr = np.frombuffer(pix.samples, dtype=np.uint8)
-        if arr.size == 0:
-            return None
-        img = arr.reshape(pix.height, pix.width, pix.n)
-        if img.shape[2] > 1:
-            # grayscale approximation
-            gray = (0.299 * img[:,:,0] + 0.587 * img[:,:,1] + 0.114 * img[:,:,2]).astype(np.uint8)
-        else:
-            gray = img[:,:,0]
+        gray, left, _, scale = clip
         # Binarize: treat near-white as background
         ink = gray < int(thr)
         if not ink.any():
             return None
         # Compute earliest ink index per row, then take requested percentile for robustness
         rows_have = ink.any(axis=1)
-        if not rows_have.any():
-            return None
-        earliest = []
-        for r in range(ink.shape[0]):
-            row = ink[r]
-            if row.any():
-                earliest.append(int(np.argmax(row)))
-        if not earliest:
-            return None
+        earliest = np.sort(np.argmax(ink[rows_have], axis=1))
         k = 0
         if percentile > 0.0:
             k = max(0, min(len(earliest) - 1, int(round(percentile * (len(earliest) - 1)))))
-        left_col_idx = sorted(earliest)[k]
-        snapped_x0 = x0 + (left_col_idx / scale)
+        left_col_idx = int(earliest[k])
+        snapped_x0 = left + (left_col_idx / scale)
         # Add left margin but do not cross gutter
         snapped_x0 = max(gutter + 2.0, snapped_x0 - float(margin))
         return snapped_x0
@@ -109,7 +172,6 @@ class EquationRefinementAgent:
         Returns None on failure.
         """
         try:
-            import fitz
             import numpy as np
         except Exception:
             return None
@@ -119,21 +181,10 @@ class EquationRefinementAgent:
         bot = max(y0, y1) + vm
         if bot <= top + 2.0:
             return None
-        dpi = 150
-        scale = float(dpi) / 72.0
-        clip = fitz.Rect(x0, top, x1, bot)
-        try:
-            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), clip=clip, alpha=False)
-        except Exception:
-            return None
-        arr = np.frombuffer(pix.samples, dtype=np.uint8)
-        if arr.size == 0:
+        clip = self._page_geometry(page).gray_clip(x0, top, x1, bot)
+        if clip is None:
             return None
-        img = arr.reshape(pix.height, pix.width, pix.n)
-        if img.shape[2] > 1:
-            gray = (0.299 * img[:,:,0] + 0.587 * img[:,:,1] + 0.114 * img[:,:,2]).astype(np.uint8)
-        else:
-            gray = img[:,:,0]
+        gray, _, top, scale = clip
         ink = gray < 235
         if not ink.any():
             return None
@@ -181,7 +232,7 @@ class EquationRefinementAgent:
         # 1) Char/word cloud within band
         char_x0s: List[float] = []
         try:
-            words = page.get_text("words") or []
+            words = self._page_geometry(page).text("words") or []
             for w in words:
                 if not (isinstance(w, (list, tuple)) and len(w) >= 8):
                     continue
@@ -232,10 +283,12 @@ class EquationRefinementAgent:
         return best
 
     def _collect_lines(self, page) -> List[Dict[str, Any]]:
-        try:
-            raw = page.get_text("rawdict")
-        except Exception:
-            raw = None
+        geometry = self._page_geometry(page)
+        if geometry.lines is None:
+            geometry.lines = self._lines_from_raw(geometry.text("rawdict"))
+        return geometry.lines
+
+    def _lines_from_raw(self, raw) -> List[Dict[str, Any]]:
         lines: List[Dict[str, Any]] = []
         if not isinstance(raw, dict):
             return lines
@@ -267,10 +320,7 @@ class EquationRefinementAgent:
         patt1 = re.compile(r"\((\d{1,3}[a-z])\)")
         patt2 = re.compile(r"\((\d{1,3})\s*([a-z])\)")
         out: List[Tuple[str, Tuple[float,float,float,float]]] = []
-        try:
-            raw = page.get_text("rawdict")
-        except Exception:
-            raw = None
+        raw = self._page_geometry(page).text("rawdict")
         if not isinstance(raw, dict):
             return out
         for blk in raw.get("blocks", []) or []:
@@ -311,10 +361,7 @@ class EquationRefinementAgent:
 
     def _lettered_from_words(self, page) -> List[Tuple[str, Tuple[float,float,float,float]]]:
         out: List[Tuple[str, Tuple[float,float,float,float]]] = []
-        try:
-            words = page.get_text("words")
-        except Exception:
-            words = []
+        words = self._page_geometry(page).text("words")
         if not words:
             return out
         from collections import defaultdict
@@ -568,6 +615,8 @@ class EquationRefinementAgent:
 
     def refine_from_labels(self, page, eq_number_labels: List[Dict[str, Any]], debug_out_dir: Any = None) -> Dict[Any, Dict[str, Any]]:
         results: Dict[Any, Dict[str, Any]] = {}
+        # Every query below (all labels of this page) reuses one extraction/render
+        self._geometry = PageGeometry(page)
         lines = self._collect_lines(page)
         page_rect = page.rect
         opt = self.opt
@@ -638,7 +687,7 @@ class EquationRefinementAgent:
                         env_y0 = min(env_y0, ay0); env_y1 = max(env_y1, ay1)
                 # Vector fraction bars via drawings
                 try:
-                    drawings = page.get_drawings()
+                    drawings = self._geometry.drawings()
                     band_w = max(1.0, (seed_x1 - seed_x0))
                     min_bar_w = max(80.0, 0.3 * band_w)
                     for d in drawings or []:
@@ -741,7 +790,7 @@ class EquationRefinementAgent:
                         merged = (ux0, env_y0, ux1, env_y1)
                     # Vector fraction bars via page.get_drawings()
                     try:
-                        drawings = page.get_drawings()
+                        drawings = self._geometry.drawings()
                         band_w = max(1.0, (ux1 - ux0))
                         min_bar_w = max(80.0, 0.3 * band_w)
                         for d in drawings or []:
@@ -976,7 +1025,7 @@ class EquationRefinementAgent:
                             env_y0 = min(env_y0, ay0); env_y1 = max(env_y1, ay1)
                     # drawings
                     try:
-                        drawings = page.get_drawings()
+                        drawings = self._geometry.drawings()
                         band_w = max(1.0, (seed_x1 - seed_x0))
                         min_bar_w = max(80.0, 0.3 * band_w)
                         for d in drawings or []:
@@ -1115,6 +1164,7 @@ class EquationRefinementAgent:
             logger.append(record)
         except Exception:
             pass
+        self._geometry = None
         return results
 
 
@@ -44,6 +44,9 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
+from extraction_v14_P1.src.agents.equation.latex_structure_validator import LaTeXStructureValidator, StructureCheck
+from common.src.utilities.sympy_parse_engine import SYMPY_AVAILABLE, SymPyParseEngine
+
 
 class FailureCategory(Enum):
     """Categories of extraction failures that can be fixed by re-extraction"""
@@ -78,32 +81,67 @@ class ReextractionAttempt:
 
 
 class LaTeXQualityValidator:
-    """Validates LaTeX quality by attempting SymPy parsing"""
+    """Validates LaTeX quality: structural pre-check, then SymPy parsing"""
 
-    def __init__(self):
-        try:
-            from sympy.parsing.latex import parse_latex
-            self.parse_latex = parse_latex
-            self.sympy_available = True
-        except ImportError:
+    def __init__(self, parse_engine: Optional[SymPyParseEngine] = None):
+        """
+        Args:
+            parse_engine: SymPyParseEngine to parse with (e.g. the one of
+                          SymPyEquationParser); default: one worker process
+        """
+        self.sympy_available = SYMPY_AVAILABLE
+        self.engine = None
+        self.structure = LaTeXStructureValidator()
+        self.last_check: Optional[StructureCheck] = None
+        self.validated = 0
+        self.structural_rejects = 0
+        self.sympy_parses = 0
+        if not self.sympy_available:
             print("⚠️  SymPy not available - LaTeX validation disabled")
-            self.sympy_available = False
+        else:
+            # Identical LaTeX is parsed once; a hanging parse times out
+            self.engine = parse_engine or SymPyParseEngine(num_workers=1)
 
     def validate(self, latex: str) -> Tuple[bool, Optional[str]]:
         """
         Validate LaTeX can be parsed by SymPy.
 
+        Structurally broken LaTeX (unbalanced braces, empty fractions, stray &,
+        unknown macros) is rejected without calling SymPy; the check is kept
+        in self.last_check.
+
         Returns:
             (success, error_message)
         """
+        self.validated += 1
+        self.last_check = self.check(latex)
+        if not self.last_check.valid:
+            self.structural_rejects += 1
+            return (False, self.last_check.error_message)
+
         if not self.sympy_available:
             return (False, "SymPy not installed")
 
-        try:
-            expr = self.parse_latex(latex)
-            return (True, None)
-        except Exception as e:
-            return (False, str(e))
+        self.sympy_parses += 1
+        result = self.engine.parse([latex])[0]
+        return (result['success'], result['error'])
+
+    def check(self, latex: str) -> StructureCheck:
+        """Structural check only (single pass, no SymPy)."""
+        return self.structure.check(latex)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Validated strings, structural rejects and SymPy parses."""
+        return {
+            'validated': self.validated,
+            'structural_rejects': self.structural_rejects,
+            'sympy_parses': self.sympy_parses
+        }
+
+    def close(self):
+        """Stop the parse engine's workers."""
+        if self.engine is not None:
+            self.engine.close()
 
 
 class FailurePatternAnalyzer:
@@ -139,13 +177,20 @@ class FailurePatternAnalyzer:
             ],
         }
 
-    def analyze(self, equation: Dict, error_message: str) -> FailureAnalysis:
+    def analyze(
+        self,
+        equation: Dict,
+        error_message: str,
+        structure_check: Optional[StructureCheck] = None
+    ) -> FailureAnalysis:
         """
         Analyze why equation parsing failed and categorize the issue.
 
         Args:
             equation: Equation dict with 'latex' and metadata
             error_message: SymPy parsing error message
+            structure_check: Structural check of the LaTeX; if it failed, its
+                             category is taken directly (no pattern scoring)
 
         Returns:
             FailureAnalysis with category and recommended actions
@@ -153,6 +198,16 @@ class FailurePatternAnalyzer:
         latex = equation.get('latex', '')
         eq_id = equation.get('equation_number', 'unknown')
 
+        if structure_check is not None and not structure_check.valid:
+            category = FailureCategory(structure_check.category)
+            return FailureAnalysis(
+                equation_id=eq_id,
+                category=category,
+                confidence=0.9,
+                evidence=structure_check.issues,
+                recommended_actions=self._generate_actions(category, equation)
+            )
+
         # Score each category based on pattern matches
         category_scores = {}
         evidence_by_category = {}
@@ -277,14 +332,15 @@ class ReextractionController:
         self,
         max_attempts: int = 3,
         quality_threshold: float = 0.8,
-        output_dir: Path = None
+        output_dir: Path = None,
+        parse_engine: Optional[SymPyParseEngine] = None
     ):
         self.max_attempts = max_attempts
         self.quality_threshold = quality_threshold
         self.output_dir = output_dir or Path('results/reextraction')
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        self.validator = LaTeXQualityValidator()
+        self.validator = LaTeXQualityValidator(parse_engine)
         self.analyzer = FailurePatternAnalyzer()
 
         self.reextraction_history: Dict[str, List[ReextractionAttempt]] = {}
@@ -310,7 +366,11 @@ class ReextractionController:
         print(f"\n🔄 Processing failed equation {eq_id}")
 
         # Analyze failure
-        analysis = self.analyzer.analyze(equation, error_message)
+        analysis = self.analyzer.analyze(
+            equation,
+            error_message,
+            self.validator.check(equation.get('latex', ''))
+        )
         print(f"   Diagnosis: {analysis.category.value} (confidence: {analysis.confidence:.2f})")
         print(f"   Evidence: {', '.join(analysis.evidence[:2])}")
 
@@ -459,6 +519,7 @@ class ReextractionController:
                 'total_attempts': sum(
                     len(attempts) for attempts in self.reextraction_history.values()
                 ),
+                'validator': self.validator.get_statistics(),
             },
             'details': {}
         }
@@ -543,6 +604,7 @@ def main():
     # Generate report
     report_path = controller.output_dir / 'reextraction_report.json'
     controller.generate_reextraction_report(report_path)
+    controller.validator.close()
 
     print(f"\n💡 NEXT STEPS:")
     print(f"   1. Integrate with actual extraction pipeline")
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LaTeX Structure Validator - Cheap Pre-Check in Front of SymPy
+
+Single-pass tokenizer and structural validator for pix2tex output. Most
+LaTeX that SymPy rejects is structurally broken in a way that needs no
+parser to see: a crop cut through a fraction leaves an unbalanced brace or
+an empty \\frac argument, a multi-line crop leaves a stray &, a misread
+glyph becomes a macro that does not exist. Checking that costs one scan of
+the string; parse_latex (antlr) costs orders of magnitude more.
+
+Checks:
+    - Unbalanced { } and \\left / \\right (and \\left without a delimiter)
+    - \\begin / \\end mismatch
+    - Empty or missing \\frac arguments, ^ / _ without an argument
+    - & outside an alignment environment (array, matrix, cases, aligned...)
+    - Unknown macros (not in KNOWN_MACROS)
+
+Each problem carries the FailureCategory value (latex_quality_control_agent)
+it points to, so FailurePatternAnalyzer can take the category directly
+instead of re-deriving it from the SymPy error.
+
+Author: Claude Code
+Date: 2025-11-17
+"""
+
+import sys
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# MANDATORY UTF-8 SETUP
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+
+# FailureCategory values (see latex_quality_control_agent.FailureCategory)
+INCOMPLETE_CROP = "incomplete_crop"
+COMPLEX_STRUCTURE = "complex_structure"
+SYMBOL_MISRECOGNITION = "symbol_misrecognition"
+
+# Macros pix2tex emits (and SymPy-relevant LaTeX math in general); includes
+# every macro literal of SymPy's LaTeX lexer (LaTeXLexer.literalNames)
+KNOWN_MACROS = frozenset("""
+    alpha beta gamma delta epsilon varepsilon zeta eta theta vartheta iota kappa varkappa
+    lambda mu nu xi omicron pi varpi rho varrho sigma varsigma tau upsilon phi varphi chi
+    psi omega Gamma Delta Theta Lambda Xi Pi Sigma Upsilon Phi Psi Omega digamma
+    varGamma varDelta varTheta varLambda varXi varPi varSigma varUpsilon varPhi varPsi varOmega
+    frac dfrac tfrac cfrac sqrt binom dbinom tbinom choose over
+    sum prod coprod int iint iiint oint bigcup bigcap bigoplus bigotimes bigvee bigwedge
+    bigsqcup lim limsup liminf sup inf max min arg det exp log ln lg sin cos tan cot sec csc
+    arcsin arccos arctan arcsec arccsc arccot sinh cosh tanh coth arsinh arcosh artanh
+    deg dim gcd hom ker Pr mod bmod pmod
+    left right big Big bigg Bigg bigl bigr Bigl Bigr biggl biggr Biggl Biggr middle
+    langle rangle lfloor rfloor lceil rceil lbrace rbrace lbrack rbrack vert Vert lvert rvert
+    lVert rVert backslash
+    cdot cdots ldots dots vdots ddots times div pm mp ast star circ bullet oplus ominus otimes
+    oslash odot wedge vee cap cup setminus sqcup sqcap wr amalg dagger ddagger
+    leq geq leqq geqq le ge neq ne equiv approx cong sim simeq propto ll gg prec succ preceq succeq
+    subset supset subseteq supseteq in notin ni mid parallel perp models vdash dashv
+    leqslant geqslant lesssim gtrsim doteq asymp bowtie smile frown
+    to rightarrow leftarrow leftrightarrow Rightarrow Leftarrow Leftrightarrow mapsto
+    longrightarrow longleftarrow longleftrightarrow Longrightarrow Longleftarrow
+    Longleftrightarrow longmapsto uparrow downarrow
+    Uparrow Downarrow updownarrow nearrow searrow swarrow nwarrow rightleftharpoons
+    hookrightarrow hookleftarrow iff implies
+    infty partial nabla forall exists nexists emptyset varnothing neg lnot aleph hbar ell
+    wp Re Im prime angle triangle surd top bot diamond Box clubsuit diamondsuit heartsuit
+    spadesuit flat natural sharp imath jmath S P dag
+    hat widehat tilde widetilde bar overline underline vec dot ddot dddot acute grave breve
+    check mathring overbrace underbrace overrightarrow overleftarrow stackrel overset
+    underset not boxed
+    mathrm mathbf mathit mathsf mathtt mathcal mathbb mathfrak mathscr boldsymbol bm
+    operatorname text textrm textbf textit textnormal mbox hbox rm bf it cal sf tt
+    displaystyle textstyle scriptstyle scriptscriptstyle mathop mathrel mathbin mathord
+    mathopen mathclose mathpunct limits nolimits
+    quad qquad enspace negmedspace negthickspace hspace vspace hfill kern mkern mskip phantom hphantom vphantom
+    smash strut
+    begin end hline cline multicolumn substack atop
+    tiny scriptsize footnotesize small normalsize large Large LARGE huge Huge
+    color textcolor label tag nonumber notag
+""".split())
+
+# Environments whose cells are separated by &
+ALIGNMENT_ENVIRONMENTS = frozenset("""
+    array matrix pmatrix bmatrix Bmatrix vmatrix Vmatrix smallmatrix cases dcases rcases
+    aligned alignedat align align* split gathered eqnarray eqnarray* tabular subarray
+""".split())
+
+# Arguments \left / \right accept besides single characters
+DELIMITER_MACROS = frozenset("""
+    { } | langle rangle lfloor rfloor lceil rceil lbrace rbrace lbrack rbrack vert Vert
+    lvert rvert lVert rVert backslash uparrow downarrow Uparrow Downarrow updownarrow
+""".split())
+DELIMITER_CHARS = frozenset("()[]|./<>")
+
+FRACTION_MACROS = frozenset(("frac", "dfrac", "tfrac", "cfrac", "binom", "dbinom", "tbinom"))
+
+
+@dataclass
+class StructureCheck:
+    """Result of the structural check of one LaTeX string."""
+    valid: bool
+    category: Optional[str] = None  # FailureCategory value of the first problem
+    issues: List[str] = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def error_message(self) -> Optional[str]:
+        """One-line description of the problems (None if valid)."""
+        if self.valid:
+            return None
+        return "Structural check failed: " + "; ".join(self.issues)
+
+
+def tokenize_latex(latex: str) -> List[Tuple[str, str, int]]:
+    """
+    Split LaTeX into (kind, value, position) tokens in one pass.
+
+    Kinds: 'command' (value = macro name, or the symbol of \\{ \\, \\\\ ...),
+    'open' / 'close' (braces), 'sup', 'sub', 'amp', 'space', 'char'.
+    """
+    tokens: List[Tuple[str, str, int]] = []
+    i, n = 0, len(latex)
+    while i < n:
+        c = latex[i]
+        if c == '\\':
+            j = i + 1
+            while j < n and latex[j].isalpha():
+                j += 1
+            if j == i + 1:
+                j = min(n, i + 2)  # Control symbol: \{ \, \\ (or a lone trailing backslash)
+            tokens.append(('command', latex[i + 1:j], i))
+            i = j
+            continue
+        if c == '{':
+            kind = 'open'
+        elif c == '}':
+            kind = 'close'
+        elif c == '^':
+            kind = 'sup'
+        elif c == '_':
+            kind = 'sub'
+        elif c == '&':
+            kind = 'amp'
+        elif c.isspace():
+            kind = 'space'
+        else:
+            kind = 'char'
+        tokens.append((kind, c, i))
+        i += 1
+    return tokens
+
+
+class LaTeXStructureValidator:
+    """
+    Structural validator for OCR'd LaTeX (no SymPy needed).
+
+    Example:
+        >>> validator = LaTeXStructureValidator()
+        >>> check = validator.check(r"\\frac{dT}{} = q")
+        >>> check.valid, check.category, check.issues
+        (False, 'incomplete_crop', ['Empty \\\\frac argument at 0'])
+    """
+
+    def __init__(self, known_macros=KNOWN_MACROS):
+        """
+        Args:
+            known_macros: Macro names (without backslash) accepted as known
+        """
+        self.known_macros = known_macros
+
+    def check(self, latex: str) -> StructureCheck:
+        """
+        Check one LaTeX string.
+
+        Returns:
+            StructureCheck (valid, category of the first problem, all problems)
+        """
+        tokens = [t for t in tokenize_latex(latex or '') if t[0] != 'space']
+        issues: List[Tuple[str, str]] = []
+
+        if not tokens:
+            return StructureCheck(False, INCOMPLETE_CROP, ["Empty LaTeX"], 0)
+
+        # Open groups: [kind, position, name, has_content, is_fraction_argument]
+        stack: List[list] = []
+        # Fractions still waiting for arguments: [group depth, arguments left, position]
+        pending: List[list] = []
+
+        index, count = 0, len(tokens)
+        while index < count:
+            kind, value, pos = tokens[index]
+            if stack and kind != 'close':
+                stack[-1][3] = True
+
+            # Argument of a fraction at this depth?
+            if pending and pending[-1][0] == len(stack):
+                if kind in ('close', 'amp', 'sup', 'sub') or (kind == 'command' and value in ('\\', 'right', 'end')):
+                    issues.append((INCOMPLETE_CROP, f"Missing \\frac argument at {pending[-1][2]}"))
+                    pending.pop()
+                else:
+                    pending[-1][1] -= 1
+                    frame_pos = pending[-1][2]
+                    if pending[-1][1] == 0:
+                        pending.pop()
+                    if kind == 'open':
+                        stack.append(['{', pos, None, False, frame_pos])
+                        index += 1
+                        continue
+
+            if kind == 'open':
+                stack.append(['{', pos, None, False, None])
+            elif kind == 'close':
+                if not stack or stack[-1][0] != '{':
+                    if stack and stack[-1][0] == 'left':
+                        issues.append((INCOMPLETE_CROP, f"\\left at {stack[-1][1]} not closed before }} at {pos}"))
+                        stack.pop()
+                        if stack and stack[-1][0] == '{':
+                            stack.pop()
+                    else:
+                        issues.append((INCOMPLETE_CROP, f"Unmatched }} at {pos}"))
+                else:
+                    frame = stack.pop()
+                    if frame[4] is not None and not frame[3]:
+                        issues.append((INCOMPLETE_CROP, f"Empty \\frac argument at {frame[4]}"))
+            elif kind in ('sup', 'sub'):
+                nxt = tokens[index + 1] if index + 1 < count else None
+                if nxt is None or nxt[0] in ('close', 'amp', 'sup', 'sub'):
+                    issues.append((INCOMPLETE_CROP, f"{value} without argument at {pos}"))
+            elif kind == 'amp':
+                if not any(frame[0] == 'env' and frame[2] in ALIGNMENT_ENVIRONMENTS for frame in stack):
+                    issues.append((COMPLEX_STRUCTURE, f"Stray & at {pos}"))
+            elif kind == 'command':
+                index = self._command(tokens, index, stack, pending, issues)
+            index += 1
+
+        for frame in reversed(stack):
+            if frame[0] == '{':
+                issues.append((INCOMPLETE_CROP, f"Unclosed {{ at {frame[1]}"))
+            elif frame[0] == 'left':
+                issues.append((INCOMPLETE_CROP, f"\\left at {frame[1]} without \\right"))
+            else:
+                issues.append((INCOMPLETE_CROP, f"\\begin{{{frame[2]}}} at {frame[1]} without \\end"))
+        for _, _, pos in pending:
+            issues.append((INCOMPLETE_CROP, f"Missing \\frac argument at {pos}"))
+
+        if not issues:
+            return StructureCheck(True, None, [], len(tokens))
+        return StructureCheck(False, issues[0][0], [message for _, message in issues], len(tokens))
+
+    def _command(self, tokens, index: int, stack: List[list], pending: List[list],
+                 issues: List[Tuple[str, str]]) -> int:
+        """Handle the macro at tokens[index]. Returns the index of the last token it consumed."""
+        _, name, pos = tokens[index]
+
+        if name in ('left', 'right'):
+            delimiter = tokens[index + 1] if index + 1 < len(tokens) else None
+            is_delimiter = delimiter is not None and (
+                (delimiter[0] == 'command' and delimiter[1] in DELIMITER_MACROS) or
+                (delimiter[0] == 'char' and delimiter[1] in DELIMITER_CHARS)
+            )
+            if not is_delimiter:
+                issues.append((INCOMPLETE_CROP, f"\\{name} without delimiter at {pos}"))
+            if name == 'left':
+                stack.append(['left', pos, None, False, None])
+            elif stack and stack[-1][0] == 'left':
+                stack.pop()
+            else:
+                issues.append((INCOMPLETE_CROP, f"\\right without \\left at {pos}"))
+            return index + 1 if is_delimiter else index
+
+        if name in ('begin', 'end'):
+            env, last = _environment_name(tokens, index + 1)
+            if env is None:
+                issues.append((INCOMPLETE_CROP, f"\\{name} without environment name at {pos}"))
+                return index
+            if name == 'begin':
+                stack.append(['env', pos, env, False, None])
+            elif stack and stack[-1][0] == 'env' and stack[-1][2] == env:
+                stack.pop()
+            else:
+                issues.append((INCOMPLETE_CROP, f"\\end{{{env}}} at {pos} does not close an open environment"))
+            return last
+
+        if name in FRACTION_MACROS:
+            pending.append([len(stack), 2, pos])
+        elif name.isalpha() and name not in self.known_macros:
+            issues.append((SYMBOL_MISRECOGNITION, f"Unknown macro \\{name} at {pos}"))
+        return index
+
+
+def _environment_name(tokens, index: int) -> Tuple[Optional[str], int]:
+    """Name in {...} starting at tokens[index], and the index of its closing brace."""
+    if index >= len(tokens) or tokens[index][0] != 'open':
+        return None, index - 1
+    name = []
+    for j in range(index + 1, len(tokens)):
+        kind, value, _ = tokens[j]
+        if kind == 'close':
+            return ''.join(name) or None, j
+        if kind not in ('char',):
+            return None, index - 1
+        name.append(value)
+    return None, index - 1
@@ -26,6 +26,9 @@ Phase A Scope:
 Operations: parse, srepr, simplify, solve (basic)
 Deferred to Phase B: dimensional checking, derivatives, integrals, equation systems
 
+SymPy runs in SymPyParseEngine worker processes with a per-equation timeout
+(see common/src/utilities/sympy_parse_engine.py); identical LaTeX is parsed once.
+
 Author: Claude Code (Phase A Implementation)
 Date: 2025-10-11
 """
@@ -58,13 +61,13 @@ if sys.platform == 'win32':
 # SymPy imports
 try:
     import sympy as sp
-    from sympy.parsing.latex import parse_latex
-    from sympy import srepr, simplify, solve, symbols
     SYMPY_AVAILABLE = True
 except ImportError:
     SYMPY_AVAILABLE = False
     print("⚠️  WARNING: SymPy not available. Install with: pip install sympy")
 
+from common.src.utilities.sympy_parse_engine import SymPyParseEngine, identify_target_variable
+
 
 @dataclass
 class SymPyResult:
@@ -74,7 +77,8 @@ class SymPyResult:
     Attributes:
         equation_id: Original equation identifier (e.g., "eq_1", "eq_79a")
         parse_success: True if LaTeX successfully parsed to SymPy expression
-        sympy_expr: SymPy expression object (if parse succeeded)
+        sympy_expr: SymPy expression object (not set - parsing runs in worker
+                    processes; rebuild with sympy.sympify(srepr_string))
         srepr_string: Serialized representation for storage/reconstruction
         target_variable: Variable to solve for (e.g., "q", "h", "Nu")
         solved_form: Solved expression with target isolated (if solvable)
@@ -82,6 +86,8 @@ class SymPyResult:
         simplification: Simplified form of expression (optional)
         error_message: Description of failure (if parse failed)
         latex_cleaned: Cleaned LaTeX that was attempted to parse
+        timed_out: True if SymPy hit the per-equation timeout (parse results
+                   obtained before it are kept)
     """
     equation_id: str
     parse_success: bool
@@ -93,6 +99,7 @@ class SymPyResult:
     simplification: Optional[str] = None
     error_message: Optional[str] = None
     latex_cleaned: Optional[str] = None
+    timed_out: bool = False
 
 
 class SymPyEquationParser:
@@ -116,18 +123,24 @@ class SymPyEquationParser:
     - Complex notation: Attempt cleaning, document failures for improvement
     """
 
-    def __init__(self, equations_file: Path, output_dir: Path):
+    def __init__(self, equations_file: Path, output_dir: Path, num_workers: Optional[int] = None,
+                 timeout: float = 30.0, parse_engine: Optional[SymPyParseEngine] = None):
         """
         Initialize SymPy equation parser.
 
         Args:
             equations_file: Path to V11 equations_latex.json
             output_dir: Directory for enhanced outputs
+            num_workers: SymPy worker processes (None = engine default, 0 = in this process)
+            timeout: Seconds of SymPy work allowed per equation
+            parse_engine: Shared SymPyParseEngine (overrides num_workers/timeout)
         """
         self.equations_file = Path(equations_file)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        self.engine = parse_engine or SymPyParseEngine(num_workers=num_workers, timeout=timeout)
+
         # Statistics tracking
         self.stats = {
             "total_equations": 0,
@@ -136,6 +149,7 @@ class SymPyEquationParser:
             "code_gen_eligible": 0,
             "target_identified": 0,
             "simplified": 0,
+            "timed_out": 0,
             "start_time": None,
             "end_time": None
         }
@@ -226,30 +240,8 @@ class SymPyEquationParser:
         Returns:
             Target variable symbol name (e.g., "q", "h", "Nu")
         """
-        try:
-            # Check if equation (Eq) or inequality
-            if hasattr(expr, 'lhs') and hasattr(expr, 'rhs'):
-                # Get free symbols from both sides
-                lhs_symbols = expr.lhs.free_symbols
-                rhs_symbols = expr.rhs.free_symbols
-
-                # If LHS has single symbol not on RHS, that's likely target
-                if len(lhs_symbols) == 1 and lhs_symbols.isdisjoint(rhs_symbols):
-                    return str(list(lhs_symbols)[0])
-
-                # If RHS has single symbol not on LHS, that's likely target
-                if len(rhs_symbols) == 1 and rhs_symbols.isdisjoint(lhs_symbols):
-                    return str(list(rhs_symbols)[0])
-
-            # Fallback: Return first symbol alphabetically (deterministic)
-            all_symbols = expr.free_symbols
-            if all_symbols:
-                return str(sorted([str(s) for s in all_symbols])[0])
-
-            return None
-
-        except Exception as e:
-            return None
+        # Shared with the worker processes of the parse engine
+        return identify_target_variable(expr)
 
     def parse_equation(self, equation: Dict[str, Any]) -> SymPyResult:
         """
@@ -271,7 +263,19 @@ class SymPyEquationParser:
         6. Attempt solve for target
         7. Flag code-gen eligibility
         8. Return complete result
+
+        Steps 3-6 run in the parse engine (process_all_equations does them for
+        all equations in one batch).
         """
+        result = self._prepare_equation(equation)
+        if result.latex_cleaned is None or result.error_message:
+            return result
+
+        analysis = self.engine.analyze([result.latex_cleaned], [result.equation_id])[0]
+        return self._apply_analysis(result, analysis)
+
+    def _prepare_equation(self, equation: Dict[str, Any]) -> SymPyResult:
+        """Steps 1-2 of parse_equation: equation ID and cleaned LaTeX (or the cleaning error)."""
         eq_id = equation.get('equation_number', 'unknown')
         if eq_id is None:
             eq_id = f"unnumbered_{equation.get('page', 'unknown')}"
@@ -298,49 +302,26 @@ class SymPyEquationParser:
             result.error_message = f"LaTeX cleaning failed: {str(e)}"
             return result
 
-        # Parse with SymPy
-        try:
-            expr = parse_latex(cleaned_latex)
-            result.sympy_expr = expr
-            result.parse_success = True
-
-            # Generate srepr
-            result.srepr_string = srepr(expr)
-
-            # Identify target variable
-            target = self.identify_target_variable(expr, latex)
-            result.target_variable = target
-
-            # Attempt simplification
-            try:
-                simplified = simplify(expr)
-                result.simplification = str(simplified)
-                self.stats["simplified"] += 1
-            except:
-                pass  # Simplification optional
-
-            # Attempt solve for target (if target identified)
-            if target:
-                result.target_identified = True
-                try:
-                    # Solve for target variable
-                    target_sym = symbols(target)
-                    if hasattr(expr, 'lhs') and hasattr(expr, 'rhs'):
-                        # It's an equation (Eq object)
-                        solved = solve(expr, target_sym)
-                        if solved:
-                            result.solved_form = str(solved[0]) if isinstance(solved, list) else str(solved)
-                            result.code_gen_eligible = True
-                except:
-                    pass  # Solve failure doesn't block code-gen with srepr
-
-            # If we have srepr, mark as code-gen eligible even without solve
-            if result.srepr_string:
-                result.code_gen_eligible = True
+        return result
 
-        except Exception as e:
-            result.parse_success = False
-            result.error_message = f"SymPy parse failed: {str(e)}"
+    def _apply_analysis(self, result: SymPyResult, analysis: Dict[str, Any]) -> SymPyResult:
+        """Steps 3-7 of parse_equation: fill the result from the engine's analysis."""
+        result.parse_success = analysis['success']
+        result.error_message = analysis['error']
+        result.timed_out = analysis['timed_out']
+        if not result.parse_success:
+            return result
+
+        result.srepr_string = analysis['srepr']
+        result.target_variable = analysis['target_variable']
+        result.simplification = analysis['simplification']
+        if result.simplification is not None:
+            self.stats["simplified"] += 1
+        result.solved_form = analysis['solved_form']
+
+        # If we have srepr, mark as code-gen eligible even without solve
+        if result.srepr_string:
+            result.code_gen_eligible = True
 
         return result
 
@@ -363,17 +344,23 @@ class SymPyEquationParser:
 
         enhanced_equations = []
 
-        for i, eq in enumerate(equations, 1):
-            eq_id = eq.get('equation_number', 'unknown')
-            print(f"  [{i}/{len(equations)}] Processing equation {eq_id}...", end=' ')
+        # Parse all cleaned equations in one batch (worker processes, per-equation timeout)
+        results = [self._prepare_equation(eq) for eq in equations]
+        pending = [r for r in results if r.latex_cleaned is not None and not r.error_message]
+        analyses = self.engine.analyze([r.latex_cleaned for r in pending], [r.equation_id for r in pending])
+        for result, analysis in zip(pending, analyses):
+            self._apply_analysis(result, analysis)
 
-            # Parse with SymPy
-            result = self.parse_equation(eq)
+        for i, (eq, result) in enumerate(zip(equations, results), 1):
+            eq_id = eq.get('equation_number', 'unknown')
+            print(f"  [{i}/{len(equations)}] Equation {eq_id}...", end=' ')
 
             # Update statistics
+            if result.timed_out:
+                self.stats["timed_out"] += 1
             if result.parse_success:
                 self.stats["parse_success"] += 1
-                print("✅ Success")
+                print("✅ Success" + (" (simplify/solve timed out)" if result.timed_out else ""))
             else:
                 self.stats["parse_failure"] += 1
                 print(f"❌ Failed: {result.error_message}")
@@ -394,7 +381,8 @@ class SymPyEquationParser:
                 "code_gen_eligible": result.code_gen_eligible,
                 "simplification": result.simplification,
                 "parse_error": result.error_message,
-                "latex_cleaned": result.latex_cleaned
+                "latex_cleaned": result.latex_cleaned,
+                "sympy_timed_out": result.timed_out
             }
 
             enhanced_equations.append(enhanced_eq)
@@ -420,6 +408,8 @@ class SymPyEquationParser:
                 # Categorize error
                 if "Array" in error or "array" in error:
                     category = "Array/alignment structures"
+                elif eq.get("sympy_timed_out"):
+                    category = "SymPy timeout"
                 elif "parse" in error.lower():
                     category = "LaTeX parse failure"
                 elif "cleaning" in error.lower():
@@ -434,6 +424,7 @@ class SymPyEquationParser:
         parse_success_rate = (self.stats["parse_success"] / total * 100) if total > 0 else 0
         code_gen_rate = (self.stats["code_gen_eligible"] / total * 100) if total > 0 else 0
         target_id_rate = (self.stats["target_identified"] / total * 100) if total > 0 else 0
+        engine_stats = self.engine.get_statistics()
 
         report = {
             "phase": "A",
@@ -448,7 +439,18 @@ class SymPyEquationParser:
                 "target_identified": self.stats["target_identified"],
                 "target_identification_rate": f"{target_id_rate:.1f}%",
                 "simplified": self.stats["simplified"],
-                "processing_time_seconds": elapsed
+                "timed_out": self.stats["timed_out"],
+                "processing_time_seconds": elapsed,
+                "equations_per_second": total / elapsed if elapsed > 0 else 0.0
+            },
+            "parse_engine": {
+                "workers": engine_stats["workers"],
+                "timeout_seconds": engine_stats["timeout"],
+                "timeouts": engine_stats["timeouts"],
+                "worker_restarts": engine_stats["worker_restarts"],
+                "cache_hits": engine_stats["cache_hits"],
+                "distinct_latex_parsed": engine_stats["parsed"],
+                "parse_seconds": engine_stats["parse_seconds"]
             },
             "failure_analysis": {
                 "patterns": failure_patterns,
@@ -481,7 +483,11 @@ class SymPyEquationParser:
         print(f"  Code-gen eligible: {stats['code_gen_eligible']} ({stats['code_gen_rate']})")
         print(f"  Target identified: {stats['target_identified']} ({stats['target_identification_rate']})")
         print(f"  Simplified: {stats['simplified']}")
-        print(f"  Processing time: {stats['processing_time_seconds']:.2f}s")
+        print(f"  Processing time: {stats['processing_time_seconds']:.2f}s "
+              f"({stats['equations_per_second']:.1f} equations/sec)")
+        engine = report["parse_engine"]
+        print(f"  SymPy workers: {engine['workers']}, {engine['timeouts']} timeouts "
+              f"(limit {engine['timeout_seconds']:.0f}s), {engine['cache_hits']} cached")
         print(f"\n  Phase A Target: {criteria['target_parse_success']}")
         print(f"  Actual Result: {criteria['actual_parse_success']}")
         print(f"  Target Met: {'✅ YES' if criteria['target_met'] else '❌ NO'}")
@@ -523,6 +529,10 @@ class SymPyEquationParser:
         print(f"  💾 Code-gen eligible equations saved: {code_gen_file}")
         print(f"      ({len(code_gen_eligible)} equations ready for code generation)")
 
+    def close(self):
+        """Stop the SymPy worker processes."""
+        self.engine.close()
+
 
 def main():
     """Main execution for SymPy equation parser."""
@@ -542,6 +552,7 @@ def main():
     report = parser.generate_report(enhanced_equations)
     parser.print_statistics(report)
     parser.save_results(enhanced_equations, report)
+    parser.close()
 
     print("\n✅ Phase A Day 1-2: SymPy Integration Complete")
     print(f"   Next: Review {output_dir / 'sympy_baseline_report.json'}")
@@ -21,6 +21,11 @@ Design Rationale:
   - Embedded images at appropriate scale
   - Notes section clearly separated
 
+- **Streaming Mode**: Write-only workbook for table-heavy documents
+  - One multi-sheet workbook, rows streamed to disk as they are written
+  - Memory stays flat regardless of table count
+  - CSVs written on a thread pool while the workbook is streamed
+
 - **Single Responsibility**: Only exports, doesn't extract
   - Takes ExtractedObject as input
   - Produces formatted output files
@@ -38,10 +43,13 @@ Usage:
 >>> exporter = TableExportAgent(output_dir="results/tables")
 >>> exporter.export_to_csv(extracted_object)
 >>> exporter.export_to_excel([extracted_object1, extracted_object2])
+>>> streaming = TableExportAgent(output_dir="results/tables", streaming=True, csv_workers=4)
+>>> streaming.export_all(extracted_objects)
 """
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import pandas as pd
@@ -93,15 +101,23 @@ class TableExportAgent:
     files from ExtractedObjects.
     """
 
-    def __init__(self, output_dir: Path):
+    # Note marker rows dropped from table data (notes are exported separately)
+    NOTE_MARKERS = ['notes:', 'note:', 'notes', 'note']
+
+    def __init__(self, output_dir: Path, streaming: bool = False, csv_workers: int = 1):
         """
         Initialize export agent.
 
         Args:
             output_dir: Base directory for output files
+            streaming: export_all writes the workbook in write-only mode
+                       (export_to_excel_streaming) instead of export_to_excel
+            csv_workers: Threads writing CSV files in export_all (1 = serial)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.streaming = streaming
+        self.csv_workers = max(1, csv_workers)
 
         # Create subdirectories
         self.csv_dir = self.output_dir / "csv"
@@ -320,12 +336,169 @@ class TableExportAgent:
 
         return excel_path
 
-    def export_all(self, objects: List[ExtractedObject]) -> Dict[str, List[Path]]:
+    def export_to_excel_streaming(
+        self,
+        objects: List[ExtractedObject],
+        excel_filename: str = "tables.xlsx"
+    ) -> Path:
+        """
+        Export tables to one multi-sheet Excel workbook in write-only mode.
+
+        Same sheets as export_to_excel (styled header, borders, column widths,
+        embedded diagrams, notes section), but rows are streamed to disk as
+        they are appended and no DataFrame or cell objects are kept, so memory
+        does not grow with the number of tables.
+
+        Args:
+            objects: List of extracted table objects
+            excel_filename: Output Excel filename
+
+        Returns:
+            Path to created Excel file
+        """
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+        from openpyxl.drawing.image import Image as XLImage
+        from openpyxl.utils import get_column_letter
+
+        excel_path = self.excel_dir / excel_filename
+        wb = Workbook(write_only=True)
+
+        # Styles shared by every sheet (write-only cells are styled before they are appended)
+        border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+        header_font = Font(bold=True)
+        header_fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
+        header_alignment = Alignment(horizontal="center", vertical="center")
+        notes_font = Font(bold=True, size=12)
+
+        def styled_cell(ws, value, header: bool = False):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.border = border
+            if header:
+                cell.font = header_font
+                cell.fill = header_fill
+                cell.alignment = header_alignment
+            return cell
+
+        for obj in objects:
+            if obj.type != 'table':
+                continue
+
+            headers, rows = self._table_rows(obj)
+            notes = obj.content.get('notes', '')
+            notes_lines = notes.split('\n') if notes and len(notes.strip()) > 0 else []
+
+            # Create worksheet with validated name
+            ws = wb.create_sheet(title=validate_sheet_name(obj.id))
+
+            # Column widths must be set before the first row is written
+            widths = [0] * max([len(headers)] + [len(row) for row in rows] + [1 if notes_lines else 0])
+            for values in [headers] + rows + ([["NOTES:"]] + [[line] for line in notes_lines]):
+                for c_idx, value in enumerate(values):
+                    if value:
+                        widths[c_idx] = max(widths[c_idx], len(str(value)))
+            for c_idx, width in enumerate(widths, 1):
+                ws.column_dimensions[get_column_letter(c_idx)].width = min(width + 2, 50)
+
+            # Write data
+            ws.append([styled_cell(ws, value, header=True) for value in headers])
+            for row in rows:
+                ws.append([styled_cell(ws, value) for value in row])
+            written_rows = len(rows) + 1
+
+            # Embed diagrams (images are anchored to cells, independent of the row stream)
+            diagrams = obj.content.get('diagrams', [])
+            diagram_row = len(rows) + 3  # Start after table data with blank row
+
+            for diag_idx, diag in enumerate(diagrams):
+                try:
+                    img_path = Path(diag.get('image_path', ''))
+                    if img_path.exists():
+                        img = XLImage(str(img_path))
+
+                        # Scale image to fit Excel (default 0.7 scale, ~70% of original)
+                        scale = diag.get('scale', 0.7)
+                        img.width = int(img.width * scale)
+                        img.height = int(img.height * scale)
+
+                        ws.add_image(img, f'A{diagram_row}')
+
+                        # Reserve rows for this image (~15 pixels per Excel row)
+                        rows_needed = max(int(img.height / 15) + 1, 5)  # Minimum 5 rows
+                        diagram_row += rows_needed + 1  # Add spacing between images
+
+                        print(f"  ✅ Embedded diagram {diag_idx + 1} from {img_path.name}")
+                except Exception as e:
+                    print(f"  ⚠️  Failed to embed diagram {diag_idx + 1}: {e}")
+                    continue
+
+            # Add notes section (after diagrams if present)
+            if notes_lines:
+                notes_start_row = diagram_row if diagrams else len(rows) + 3
+                for _ in range(notes_start_row - 1 - written_rows):
+                    ws.append([])
+
+                notes_cell = WriteOnlyCell(ws, value="NOTES:")
+                notes_cell.font = notes_font
+                ws.append([notes_cell])
+                for line in notes_lines:
+                    ws.append([line])
+
+        # Save Excel file (closes the streamed sheets)
+        wb.save(excel_path)
+
+        return excel_path
+
+    def _table_rows(self, obj: ExtractedObject):
+        """
+        Headers and data rows of a table, without building a DataFrame.
+
+        Applies the same clean-up as export_to_excel: headers are padded or
+        truncated to the widest row, short rows are padded, note marker rows
+        are dropped.
+
+        Returns:
+            (headers, rows)
+        """
+        structured = obj.content.get('structured_data', {})
+        headers = list(structured.get('headers', []))
+        rows = [list(row) for row in structured.get('rows', [])]
+
+        # Handle column/row mismatch
+        if rows:
+            max_cols = max(len(row) for row in rows)
+            if len(headers) < max_cols:
+                headers = headers + [f'Column {i+1}' for i in range(len(headers), max_cols)]
+            elif len(headers) > max_cols:
+                headers = headers[:max_cols]
+            rows = [row + [''] * (max_cols - len(row)) for row in rows]
+
+        # Remove "Notes:" marker rows
+        rows = [
+            row for row in rows
+            if not row or str(row[0] if row[0] is not None else '').lower().strip() not in self.NOTE_MARKERS
+        ]
+
+        return headers, rows
+
+    def export_all(self, objects: List[ExtractedObject],
+                   excel_filename: str = "all_tables.xlsx") -> Dict[str, List[Path]]:
         """
         Export tables to all formats.
 
+        With csv_workers > 1 the CSV files are written on a thread pool while
+        the workbook is built; with streaming=True the workbook is written in
+        write-only mode.
+
         Args:
             objects: List of extracted table objects
+            excel_filename: Filename of the combined workbook
 
         Returns:
             Dictionary of format -> list of output paths
@@ -335,18 +508,34 @@ class TableExportAgent:
             'excel': []
         }
 
-        # Export individual CSVs
-        for obj in objects:
-            if obj.type == 'table':
-                csv_path = self.export_to_csv(obj)
-                results['csv'].append(csv_path)
-
-        # Export combined Excel
         table_objects = [obj for obj in objects if obj.type == 'table']
-        if table_objects:
-            excel_path = self.export_to_excel(table_objects, excel_filename="all_tables.xlsx")
+        if not table_objects:
+            return results
+
+        executor = None
+        if self.csv_workers > 1 and len(table_objects) > 1:
+            executor = ThreadPoolExecutor(max_workers=self.csv_workers, thread_name_prefix='csv_export')
+
+        try:
+            # Export individual CSVs (in the background if parallel)
+            if executor:
+                csv_futures = [executor.submit(self.export_to_csv, obj) for obj in table_objects]
+            else:
+                results['csv'] = [self.export_to_csv(obj) for obj in table_objects]
+
+            # Export combined Excel
+            if self.streaming:
+                excel_path = self.export_to_excel_streaming(table_objects, excel_filename=excel_filename)
+            else:
+                excel_path = self.export_to_excel(table_objects, excel_filename=excel_filename)
             results['excel'].append(excel_path)
 
+            if executor:
+                results['csv'] = [future.result() for future in csv_futures]
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
         return results
 
 
@@ -58,9 +58,10 @@ if sys.platform == 'win32':
         except (AttributeError, ValueError):
             pass
 
-import fitz  # PyMuPDF
 import requests
 
+from common.src.file_io.pdf_document_session import PdfDocumentSession
+
 
 @dataclass
 class BibliographicReference:
@@ -127,12 +128,15 @@ class BibliographyExtractionAgent:
         except requests.exceptions.RequestException:
             return False
 
-    def extract_bibliography(self, pdf_path: Path) -> List[BibliographicReference]:
+    def extract_bibliography(self, pdf_path: Path,
+                             document_session: Optional[PdfDocumentSession] = None) -> List[BibliographicReference]:
         """
         Extract bibliographic references from PDF document.
 
         Args:
             pdf_path: Path to PDF document
+            document_session: Optional shared PDF session for the fallback extractor
+                              (reuses page text already parsed by earlier stages)
 
         Returns:
             List of BibliographicReference objects
@@ -149,7 +153,7 @@ class BibliographyExtractionAgent:
             references = self._extract_with_grobid(pdf_path)
         else:
             print("⚠️  GROBID unavailable, using fallback text extraction...")
-            references = self._extract_with_fallback(pdf_path)
+            references = self._extract_with_fallback(pdf_path, document_session)
 
         print(f"✅ Extracted {len(references)} bibliographic references")
         print()
@@ -355,7 +359,8 @@ class BibliographyExtractionAgent:
 
         return ". ".join(parts) + "."
 
-    def _extract_with_fallback(self, pdf_path: Path) -> List[BibliographicReference]:
+    def _extract_with_fallback(self, pdf_path: Path,
+                               document_session: Optional[PdfDocumentSession] = None) -> List[BibliographicReference]:
         """
         Fallback extraction using PyMuPDF text extraction.
 
@@ -363,20 +368,29 @@ class BibliographyExtractionAgent:
 
         Args:
             pdf_path: Path to PDF document
+            document_session: Shared PDF session (a private one is opened and closed if None)
 
         Returns:
             List of BibliographicReference objects
         """
-        doc = fitz.open(str(pdf_path))
+        owns_session = document_session is None
+        session = document_session or PdfDocumentSession(pdf_path)
+        try:
+            return self._extract_references_section(session)
+        finally:
+            if owns_session:
+                session.close()
+
+    def _extract_references_section(self, session: PdfDocumentSession) -> List[BibliographicReference]:
+        """Find the "References" heading and parse the numbered entries after it."""
         references = []
 
         # Search for "References" section
         refs_page = None
         refs_start_y = None
 
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
+        for page_num in range(len(session)):
+            text = session.page_text(page_num)
 
             # Look for "References" or "REFERENCES" as standalone heading
             lines = text.split('\n')
@@ -384,7 +398,7 @@ class BibliographyExtractionAgent:
                 if re.match(r'^\s*REFERENCES?\s*$', line, re.IGNORECASE):
                     refs_page = page_num
                     # Get approximate Y position by searching text blocks
-                    blocks = page.get_text("blocks")
+                    blocks = session.page_blocks(page_num)
                     for block in blocks:
                         if "REFERENCES" in block[4].upper():
                             refs_start_y = block[1]  # Y0 coordinate
@@ -396,21 +410,20 @@ class BibliographyExtractionAgent:
 
         if refs_page is None:
             print("⚠️  'References' section not found in document")
-            doc.close()
             return []
 
         # Extract references text from References section
         refs_text_lines = []
 
-        for page_num in range(refs_page, len(doc)):
-            page = doc[page_num]
-            blocks = page.get_text("blocks")
+        for page_num in range(refs_page, len(session)):
+            page_height = session[page_num].rect.height
+            blocks = session.page_blocks(page_num)
 
             for block in blocks:
                 x0, y0, x1, y1, text, block_no, block_type = block
 
                 # Skip headers and footers (approximate)
-                if y0 < 50 or y0 > page.rect.height - 50:
+                if y0 < 50 or y0 > page_height - 50:
                     continue
 
                 # On first page, skip until we reach references heading
@@ -451,7 +464,6 @@ class BibliographyExtractionAgent:
             ref = self._parse_fallback_reference(current_ref_num, " ".join(current_ref_text))
             references.append(ref)
 
-        doc.close()
         return references
 
     def _parse_fallback_reference(self, ref_num: str, text: str) -> BibliographicReference:
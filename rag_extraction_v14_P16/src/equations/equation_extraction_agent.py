@@ -64,6 +64,7 @@ import os
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import re
+from datetime import datetime
 
 # MANDATORY UTF-8 SETUP - NO EXCEPTIONS
 if sys.platform == 'win32':
@@ -82,10 +83,15 @@ if sys.platform == 'win32':
             pass
 
 import fitz  # PyMuPDF
+import numpy as np
 from PIL import Image
 
 # Import base agent using proper package structure
 from common.src.base.base_extraction_agent import BaseExtractionAgent, Zone, ExtractedObject
+from rag_extraction_v14_P16.src.equations.batched_latex_ocr import BatchedLatexOCR
+from rag_extraction_v14_P16.src.equations.latex_ocr_cache import LatexOCRCache, get_pix2tex_model_version
+from rag_extraction_v14_P16.src.equations.parallel_latex_ocr import ParallelLatexOCR
+from rag_extraction_v14_P16.src.equations.text_layer_latex import TextLayerLatexReader
 
 
 class EquationExtractionAgent(BaseExtractionAgent):
@@ -125,19 +131,45 @@ class EquationExtractionAgent(BaseExtractionAgent):
         }
     """
 
-    def __init__(self, pdf_path: Path, output_dir: Path):
+    # 216 DPI (3x scale) - optimal resolution for LaTeX-OCR
+    RASTER_DPI = 216
+
+    # Crops collected (in batches) before process_zones runs LaTeX-OCR on them
+    OCR_WINDOW_BATCHES = 4
+
+    def __init__(self, pdf_path: Path, output_dir: Path, raster_cache=None, document_session=None,
+                 image_writer=None, ocr_batch_size: int = 8, latex_cache_dir: Optional[Path] = None,
+                 latex_cache_max_mb: int = 64, ocr_workers: int = 0, ocr_timeout: float = 60.0,
+                 use_text_layer: bool = True, text_layer_min_confidence: float = 0.9):
         """
         Initialize equation extraction agent.
 
         Args:
             pdf_path: Path to source PDF
             output_dir: Base output directory
+            raster_cache: Optional shared PageRasterCache (see BaseExtractionAgent)
+            document_session: Optional shared PdfDocumentSession (see BaseExtractionAgent)
+            image_writer: Optional shared CropImageWriter (see BaseExtractionAgent)
+            ocr_batch_size: Equation crops per pix2tex encoder/decoder pass in
+                            process_zones (1 = one LatexOCR call per equation)
+            latex_cache_dir: Directory of the persistent LaTeX-OCR result cache
+                             (shared across documents; None = no cache)
+            latex_cache_max_mb: LaTeX-OCR cache size cap before LRU eviction
+            ocr_workers: Run LaTeX-OCR on this many worker processes, each loading
+                         pix2tex once (0 = in this process, batched)
+            ocr_timeout: Seconds one equation may take in a worker before it is
+                         given up (ocr_workers > 0 only)
+            use_text_layer: Read born-digital equations from the PDF text layer
+                            and only OCR the rest
+            text_layer_min_confidence: Text-layer LaTeX below this confidence
+                                       goes to LaTeX-OCR instead
 
         Raises:
             ImportError: If pix2tex library not installed
             FileNotFoundError: If PDF not found
         """
-        super().__init__(pdf_path, output_dir)
+        super().__init__(pdf_path, output_dir, raster_cache=raster_cache,
+                         document_session=document_session, image_writer=image_writer)
 
         self.agent_type = "equation_extraction"
         self.agent_version = "3.0.0"  # CRITICAL FIX: Use YOLO isolate_formula bbox directly
@@ -146,12 +178,15 @@ class EquationExtractionAgent(BaseExtractionAgent):
         self.equations_dir = self.output_dir / "equations"
         self.equations_dir.mkdir(parents=True, exist_ok=True)
 
-        # Load LaTeX-OCR model
-        print(f"🔧 Loading pix2tex LaTeX-OCR model...")
+        # Load LaTeX-OCR model (in the worker processes only, if any)
+        self.ocr_workers = ocr_workers
+        self.ocr_model = None
         try:
             from pix2tex.cli import LatexOCR
-            self.ocr_model = LatexOCR()
-            print(f"✅ LaTeX-OCR model ready")
+            if not ocr_workers:
+                print("🔧 Loading pix2tex LaTeX-OCR model...")
+                self.ocr_model = LatexOCR()
+                print("✅ LaTeX-OCR model ready")
         except ImportError:
             raise ImportError(
                 "pix2tex not installed. Install with: pip install pix2tex[gui]"
@@ -159,30 +194,160 @@ class EquationExtractionAgent(BaseExtractionAgent):
         except Exception as e:
             raise RuntimeError(f"Failed to load LaTeX-OCR model: {e}")
 
-        # Open PDF document
-        self.doc = fitz.open(str(self.pdf_path))
+        # Crops OCR'd before (this or any other document, same model) skip inference
+        self.latex_cache = None
+        if latex_cache_dir is not None:
+            self.latex_cache = LatexOCRCache(latex_cache_dir, get_pix2tex_model_version(self.ocr_model),
+                                             max_size_mb=latex_cache_max_mb)
+
+        self.ocr_batch_size = max(1, ocr_batch_size)
+        if ocr_workers:
+            self.latex_ocr = ParallelLatexOCR(ocr_workers, timeout=ocr_timeout, cache=self.latex_cache)
+        else:
+            self.latex_ocr = BatchedLatexOCR(self.ocr_model, batch_size=self.ocr_batch_size,
+                                             cache=self.latex_cache)
+
+        # Born-digital equations whose text layer reads cleanly skip OCR
+        self.text_layer = TextLayerLatexReader() if use_text_layer else None
+        self.text_layer_min_confidence = text_layer_min_confidence
+        self.text_layer_stats = {"attempted": 0, "accepted": 0, "rejected": {}}
+
+        # Open PDF document (shared session if given)
+        self.doc = self.session.doc
         print(f"📄 PDF loaded: {len(self.doc)} pages")
 
     def extract_from_zone(self, zone: Zone) -> Optional[ExtractedObject]:
         """
-        Extract equation from zone using LaTeX-OCR.
+        Extract equation from zone using the text layer or LaTeX-OCR.
 
         Process:
         --------
         1. Get equation number from zone metadata
         2. Crop equation region using center-based method
-        3. Render crop at 216 DPI
-        4. Apply LaTeX-OCR to generate LaTeX string
+        3. Render crop at 216 DPI, read the zone's text layer
+        4. Apply LaTeX-OCR to generate LaTeX string (unless the text layer
+           gave LaTeX with enough confidence)
         5. Extract surrounding context text
         6. Classify equation type
         7. Build ExtractedObject with all data
 
+        process_zones() runs the same steps with step 4 batched over many zones.
+
         Args:
             zone: Zone containing equation
 
         Returns:
             ExtractedObject with LaTeX, image, context, classification
         """
+        prepared = self._prepare_zone(zone)
+        if not prepared:
+            return None
+
+        if self._text_layer_accepted(prepared):
+            return self._build_equation(prepared, prepared[5].latex)
+
+        # Extract LaTeX using OCR (in-memory crop - the file may still be encoding)
+        return self._build_equation(prepared, self._extract_latex(prepared[4]))
+
+    def process_zones(self, zones: List[Zone]) -> List[ExtractedObject]:
+        """
+        Extract all equation zones with batched LaTeX-OCR.
+
+        Zones are cropped one by one; their crops (except those read from the
+        text layer) are collected and sent to
+        pix2tex OCR_WINDOW_BATCHES batches (or rounds of the worker pool) at
+        a time, then context,
+        classification and the ExtractedObject are built per zone. Same
+        results as calling extract_from_zone() on each zone.
+
+        Args:
+            zones: List of equation zones to process
+
+        Returns:
+            List of successfully extracted objects (in zone order)
+        """
+        self.stats["start_time"] = datetime.now()
+        results = []
+
+        print(f"\n{'='*70}")
+        print(f"{self.agent_type.upper()} EXTRACTION")
+        print(f"{'='*70}")
+        if self.ocr_workers:
+            print(f"Processing {len(zones)} zones (LaTeX-OCR on {self.ocr_workers} worker processes)...")
+        else:
+            print(f"Processing {len(zones)} zones (LaTeX-OCR batch size {self.ocr_batch_size})...")
+
+        window = max(self.ocr_batch_size, self.ocr_workers) * self.OCR_WINDOW_BATCHES
+        pending = []
+        for zone in zones:
+            self.stats["zones_processed"] += 1
+
+            if not self.validate_zone(zone):
+                self.stats["failed_extractions"] += 1
+                continue
+
+            print(f"  Processing {zone.zone_id} (page {zone.page})...")
+            prepared = self._prepare_zone(zone)
+            if not prepared:
+                self.stats["failed_extractions"] += 1
+                print("    ❌ Failed")
+                continue
+
+            pending.append(prepared)
+            if len(pending) >= window:
+                results.extend(self._finish_zones(pending))
+                pending = []
+
+        results.extend(self._finish_zones(pending))
+
+        # Crop images still being encoded must be on disk before post-processing
+        if self.image_writer.wait():
+            print("  ⚠️  Some crop images failed to write (see warnings above)")
+
+        results = self.post_process(results)
+
+        self.stats["end_time"] = datetime.now()
+        self._print_statistics()
+
+        return results
+
+    def _finish_zones(self, pending: List[tuple]) -> List[ExtractedObject]:
+        """Run LaTeX-OCR over the pending crops not read from the text layer and build their objects."""
+        if not pending:
+            return []
+
+        latex_results = [prepared[5].latex if self._text_layer_accepted(prepared) else None
+                         for prepared in pending]
+        to_ocr = [index for index, latex in enumerate(latex_results) if latex is None]
+        if to_ocr:
+            print(f"  🔤 LaTeX-OCR on {len(to_ocr)} of {len(pending)} equations...")
+            recognized = self.latex_ocr.recognize([pending[index][4] for index in to_ocr],
+                                                  [pending[index][0].zone_id for index in to_ocr])
+            for index, latex in zip(to_ocr, recognized):
+                latex_results[index] = latex
+
+        results = []
+        for prepared, latex in zip(pending, latex_results):
+            extracted = self._build_equation(prepared, latex)
+            if extracted:
+                results.append(extracted)
+                self.stats["successful_extractions"] += 1
+                print(f"    ✅ {prepared[0].zone_id}")
+            else:
+                self.stats["failed_extractions"] += 1
+                print(f"    ❌ {prepared[0].zone_id} failed")
+        return results
+
+    def _prepare_zone(self, zone: Zone) -> Optional[tuple]:
+        """
+        Steps 1-3 of extract_from_zone: metadata check, page lookup, crop,
+        text layer.
+
+        Returns:
+            Tuple of (zone, page, crop_path, crop_metadata, crop_image,
+            text_layer_result), or None. text_layer_result is None when the
+            text layer is not used.
+        """
         try:
             # Validate equation-specific metadata
             if not zone.metadata or "equation_number" not in zone.metadata:
@@ -199,15 +364,71 @@ class EquationExtractionAgent(BaseExtractionAgent):
 
             page = self.doc[page_idx]
 
-            # Crop equation using center-based method (returns tuple: path, metadata)
+            # Crop equation using center-based method (returns tuple: path, metadata, image)
             crop_result = self._crop_equation(page, zone, equation_number)
             if not crop_result:
                 return None
 
-            crop_path, crop_metadata = crop_result
+            crop_path, crop_metadata, crop_image = crop_result
+            text_layer = self._read_text_layer(page, zone, equation_number, crop_image)
+            return (zone, page, crop_path, crop_metadata, crop_image, text_layer)
+
+        except Exception as e:
+            print(f"    ❌ Exception: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def _read_text_layer(self, page: fitz.Page, zone: Zone, equation_number: str,
+                         crop_image: Image.Image):
+        """
+        LaTeX of the zone rebuilt from the PDF text layer (None when disabled).
+
+        Returns:
+            TextLayerLatex; it replaces OCR if its confidence reaches
+            text_layer_min_confidence
+        """
+        if self.text_layer is None:
+            return None
 
-            # Extract LaTeX using OCR
-            latex = self._extract_latex(crop_path)
+        try:
+            result = self.text_layer.read(
+                page, zone.bbox, self.session.get_text(page.number, "rawdict"),
+                crop=np.asarray(crop_image), dpi=self.RASTER_DPI,
+                equation_number=equation_number
+            )
+        except Exception as e:
+            print(f"    ⚠️  Text layer unreadable ({e}), using LaTeX-OCR")
+            return None
+
+        self.text_layer_stats["attempted"] += 1
+        if result.confidence >= self.text_layer_min_confidence:
+            self.text_layer_stats["accepted"] += 1
+            print(f"    📝 Text layer LaTeX (confidence {result.confidence:.2f})")
+        else:
+            rejected = self.text_layer_stats["rejected"]
+            for reason in result.reason.split(", "):
+                rejected[reason] = rejected.get(reason, 0) + 1
+        return result
+
+    def _text_layer_accepted(self, prepared: tuple) -> bool:
+        """True if the zone's text-layer LaTeX is used instead of OCR."""
+        text_layer = prepared[5]
+        return text_layer is not None and text_layer.confidence >= self.text_layer_min_confidence
+
+    def _build_equation(self, prepared: tuple, latex: Optional[str]) -> Optional[ExtractedObject]:
+        """
+        Steps 5-7 of extract_from_zone for a cropped zone and its LaTeX.
+
+        Args:
+            prepared: Tuple from _prepare_zone()
+            latex: Text-layer or OCR result (None if OCR failed)
+
+        Returns:
+            ExtractedObject, or None if OCR failed
+        """
+        zone, page, crop_path, crop_metadata, _, text_layer = prepared
+        try:
             if not latex:
                 print(f"    ❌ LaTeX-OCR failed")
                 return None
@@ -218,6 +439,13 @@ class EquationExtractionAgent(BaseExtractionAgent):
             # Classify equation
             classification = self._classify_equation(latex)
 
+            if self._text_layer_accepted(prepared):
+                method = {"extraction_method": "pdf_text_layer",
+                          "confidence": text_layer.confidence}
+            else:
+                method = {"extraction_method": "pix2tex_v0.1.0",
+                          "confidence": 0.95}  # pix2tex doesn't provide confidence scores
+
             # Build ExtractedObject
             return ExtractedObject(
                 id=zone.zone_id,
@@ -226,7 +454,7 @@ class EquationExtractionAgent(BaseExtractionAgent):
                 bbox=zone.bbox,
                 content={
                     "latex": latex,
-                    "equation_number": equation_number,
+                    "equation_number": zone.metadata["equation_number"],
                     "text_description": context.get("description", ""),
                     "image_path": str(crop_path.relative_to(self.output_dir.parent))
                 },
@@ -238,10 +466,10 @@ class EquationExtractionAgent(BaseExtractionAgent):
                 },
                 metadata={
                     "classification": classification,
-                    "extraction_method": "pix2tex_v0.1.0",
+                    "extraction_method": method["extraction_method"],
                     "crop_method": crop_metadata.get("method", "complexity_adaptive_multiline"),
                     "rendering_dpi": crop_metadata.get("dpi", 216),
-                    "confidence": 0.95  # pix2tex doesn't provide confidence scores
+                    "confidence": method["confidence"]
                 },
                 document_id=self.document_metadata.get("document_id"),
                 zotero_key=self.document_metadata.get("zotero_key")
@@ -269,29 +497,28 @@ class EquationExtractionAgent(BaseExtractionAgent):
             equation_number: Equation identifier (e.g., "79a")
 
         Returns:
-            Tuple of (crop_path, metadata_dict) with DPI and method info, or None if crop failed
+            Tuple of (crop_path, metadata_dict, crop_image) with DPI and method info
+            and the RGB crop as a PIL image, or None if crop failed
         """
         try:
             # Use YOLO's bbox directly - it already detected the equation content!
             rect = fitz.Rect(zone.bbox)
 
-            # Render at 216 DPI (3x scale)
-            dpi_scale = 3.0
-            mat = fitz.Matrix(dpi_scale, dpi_scale)
-            pix = page.get_pixmap(matrix=mat, clip=rect)
+            # Render at 216 DPI (3x scale), sliced from the shared page raster if enabled
+            crop = self.render_region(page, rect)
 
-            print(f"    📐 YOLO bbox: {int(rect.width)}×{int(rect.height)}px, DPI=216")
+            print(f"    📐 YOLO bbox: {int(rect.width)}×{int(rect.height)}px, DPI={self.RASTER_DPI}")
 
-            # Save crop
-            crop_path = self.equations_dir / f"{zone.zone_id}.png"
-            pix.save(str(crop_path))
+            # Save crop (encoded by the image writer, path is final now)
+            crop_image = Image.fromarray(crop)
+            crop_path = self.save_image(crop_image, self.equations_dir / f"{zone.zone_id}.png")
 
-            # Return path and metadata
+            # Return path, metadata and image
             metadata = {
-                "dpi": 216,
+                "dpi": self.RASTER_DPI,
                 "method": "yolo_isolate_formula_bbox"
             }
-            return (crop_path, metadata)
+            return (crop_path, metadata, crop_image)
 
         except Exception as e:
             print(f"    ❌ Crop failed: {e}")
@@ -528,23 +755,17 @@ class EquationExtractionAgent(BaseExtractionAgent):
 
         return min(complexity, 5)
 
-    def _extract_latex(self, image_path: Path) -> Optional[str]:
+    def _extract_latex(self, image: Image.Image) -> Optional[str]:
         """
         Extract LaTeX from equation image using pix2tex.
 
         Args:
-            image_path: Path to equation crop image
+            image: Equation crop (RGB)
 
         Returns:
             LaTeX string, or None if OCR failed
         """
-        try:
-            image = Image.open(image_path)
-            latex = self.ocr_model(image)
-            return latex.strip()
-        except Exception as e:
-            print(f"    ❌ LaTeX-OCR error: {e}")
-            return None
+        return self.latex_ocr.recognize([image])[0]
 
     def _extract_context(self, page: fitz.Page, zone: Zone) -> Dict[str, Any]:
         """
@@ -561,8 +782,8 @@ class EquationExtractionAgent(BaseExtractionAgent):
             Dictionary with before/after context and description
         """
         try:
-            # Get full page text
-            page_text = page.get_text()
+            # Get full page text (cached per page)
+            page_text = self.session.page_text(page.number)
 
             # Find equation number in text
             equation_number = zone.metadata.get("equation_number", "")
@@ -666,7 +887,46 @@ class EquationExtractionAgent(BaseExtractionAgent):
         # TODO: Refine classification with more sophisticated parsing
         return "computational"
 
+    def _print_statistics(self):
+        """Print extraction statistics, with text-layer and LaTeX-OCR throughput (also kept in self.stats)."""
+        ocr_stats = self.latex_ocr.get_statistics()
+        self.stats["latex_ocr"] = ocr_stats
+        self.stats["equations_per_second"] = ocr_stats["equations_per_second"]
+
+        if self.text_layer is not None:
+            text_stats = dict(self.text_layer_stats, rejected=dict(self.text_layer_stats["rejected"]))
+            attempted = text_stats["attempted"]
+            text_stats["ocr_avoided_rate"] = text_stats["accepted"] / attempted if attempted else 0.0
+            self.stats["text_layer"] = text_stats
+            print(f"\n  Text layer: {text_stats['accepted']} of {attempted} equations read without OCR "
+                  f"({text_stats['ocr_avoided_rate']:.0%} OCR avoided)")
+            if text_stats["rejected"]:
+                reasons = ", ".join(f"{reason} {count}" for reason, count in
+                                    sorted(text_stats["rejected"].items(), key=lambda item: -item[1]))
+                print(f"  Text layer rejected: {reasons}")
+
+        print(f"\n  LaTeX-OCR: {ocr_stats['equations']} equations in {ocr_stats['batches']} batches "
+              f"(batch size {ocr_stats['batch_size']}, mean {ocr_stats['mean_batch_size']:.1f}), "
+              f"{ocr_stats['ocr_seconds']:.2f}s, "
+              f"{ocr_stats['equations_per_second']:.2f} equations/sec")
+        if self.latex_cache is not None:
+            print(f"  LaTeX-OCR cache: {ocr_stats['cache_hits']} of {ocr_stats['equations']} crops cached")
+        if self.ocr_workers:
+            print(f"  LaTeX-OCR workers: {ocr_stats['workers']}, {ocr_stats['timeouts']} timeouts "
+                  f"(limit {ocr_stats['timeout']:.0f}s), {ocr_stats['worker_restarts']} restarts")
+        super()._print_statistics()
+
+    def close(self):
+        """Stop OCR workers and close the LaTeX-OCR cache, then the PDF session and image writer."""
+        if getattr(self, 'latex_ocr', None) is not None:
+            self.latex_ocr.close()
+        if getattr(self, 'latex_cache', None) is not None:
+            self.latex_cache.close()
+            self.latex_cache = None
+            self.latex_ocr.cache = None
+        super().close()
+
     def __del__(self):
-        """Clean up PDF document on deletion."""
-        if hasattr(self, 'doc'):
-            self.doc.close()
+        """Clean up PDF document on deletion (close() releases it deterministically)."""
+        if hasattr(self, '_session'):
+            self.close()
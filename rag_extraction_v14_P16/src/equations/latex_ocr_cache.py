@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LaTeX-OCR Result Cache
+
+Persistent cache of pix2tex results keyed by the equation crop itself.
+pix2tex is the slowest per-object step of the pipeline, and re-runs of the
+equation phase (or other documents containing the same formula, e.g.
+reprints of a textbook) produce identical crops. A hit skips model
+inference entirely.
+
+Key:
+    (OCR model version, hash of the normalized crop pixels)
+
+    Crops are normalized the way pix2tex's pad() sees them: grayscale,
+    trimmed to the bounding box of the ink, so the same equation cropped
+    with slightly different margins still hits. Nothing document-specific
+    is in the key - one cache directory serves every document.
+
+Design Rationale:
+-----------------
+- **Content-Addressed**: Same crop → same LaTeX, whatever the document
+- **Model-Aware**: The model version (pix2tex version + weights hash) is
+  part of every key; entries of an older model are dropped when the cache
+  is opened with a new one (or explicitly via invalidate_model())
+- **Size Cap**: LRU eviction via DiskLRUCache keeps the cache bounded
+- **Failures Not Cached**: A failed OCR is retried on the next run
+
+Author: Claude Code
+Date: 2025-11-17
+Version: 1.0
+"""
+
+import sys
+import os
+
+# MANDATORY UTF-8 SETUP
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+from common.src.file_io.disk_cache import DiskLRUCache
+from common.src.file_io.pdf_hash import compute_file_hash
+
+
+# Key of the entry recording which model the cached results came from
+_MODEL_KEY = "latex-model"
+
+
+def get_pix2tex_model_version(ocr_model) -> str:
+    """
+    Identity of a loaded pix2tex model: package version plus weights hash.
+
+    Args:
+        ocr_model: pix2tex.cli.LatexOCR instance (None = pix2tex's default
+                   checkpoint, e.g. when only worker processes load the model)
+
+    Returns:
+        'pix2tex=<version>|<weights hash>' (weights part 'unknown' if not found)
+    """
+    try:
+        from importlib.metadata import version
+        package_version = version('pix2tex')
+    except Exception:
+        package_version = 'unknown'
+
+    weights_hash = 'unknown'
+    try:
+        # LatexOCR resolves its checkpoint path relative to the pix2tex model directory
+        import pix2tex
+        checkpoint = Path(ocr_model.args.checkpoint if ocr_model is not None else 'checkpoints/weights.pth')
+        if not checkpoint.is_absolute():
+            checkpoint = Path(pix2tex.__file__).parent / 'model' / checkpoint
+        weights_hash = compute_file_hash(checkpoint)
+    except Exception:
+        pass
+
+    return f"pix2tex={package_version}|{weights_hash}"
+
+
+def compute_crop_hash(image: Image.Image) -> str:
+    """
+    Content hash of an equation crop, normalized as pix2tex reads it.
+
+    The crop is converted to grayscale and trimmed to the bounding box of
+    its ink (pixels darker than the midpoint of its value range), so margins
+    do not change the hash.
+
+    Returns:
+        'sha256:<hex>' over the trimmed pixels and their shape
+    """
+    gray = np.asarray(image.convert('L'))
+    if gray.size:
+        ink = gray < (int(gray.min()) + int(gray.max())) / 2
+        rows = np.flatnonzero(ink.any(axis=1))
+        cols = np.flatnonzero(ink.any(axis=0))
+        if len(rows) and len(cols):
+            gray = gray[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+    digest = hashlib.sha256()
+    digest.update(f"{gray.shape[0]}x{gray.shape[1]}".encode('ascii'))
+    digest.update(np.ascontiguousarray(gray).tobytes())
+    return f"sha256:{digest.hexdigest()}"
+
+
+class LatexOCRCache:
+    """
+    On-disk LaTeX-OCR results keyed by model version and crop content.
+
+    Usage Example:
+    --------------
+    >>> cache = LatexOCRCache(Path("results/cache"), model_version=get_pix2tex_model_version(ocr))
+    >>> agent = EquationExtractionAgent(pdf_path, output_dir, latex_cache=cache)
+    >>> agent.process_zones(zones)   # 2nd run (or another document with the same formulas): no OCR
+    """
+
+    def __init__(self, cache_dir: Path, model_version: str, max_size_mb: int = 64):
+        """
+        Open (or create) the cache.
+
+        Entries from a different model version than the last one recorded
+        are dropped on open.
+
+        Args:
+            cache_dir: Directory holding the cache database (shared across documents)
+            model_version: OCR model identity (see get_pix2tex_model_version)
+            max_size_mb: Size cap; least-recently-used entries are evicted beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.model_version = model_version
+        self.store = DiskLRUCache(
+            self.cache_dir / 'latex_ocr_cache.db',
+            max_bytes=max_size_mb * 1024 * 1024
+        )
+
+        previous = self.store.get(_MODEL_KEY)
+        if previous is not None and previous != model_version:
+            removed = self.invalidate_model(previous)
+            print(f"🔄 LaTeX-OCR model changed - dropped {removed} cached results")
+        if previous != model_version:
+            self.store.put(_MODEL_KEY, model_version)
+        # Counters report crop lookups only
+        self.store.hits = self.store.misses = 0
+
+    def _key(self, crop_hash: str, model_version: Optional[str] = None) -> str:
+        return f"latex|{model_version or self.model_version}|{crop_hash}"
+
+    def get(self, image: Image.Image) -> Optional[str]:
+        """
+        Cached LaTeX for a crop.
+
+        Returns:
+            LaTeX string, or None on a miss
+        """
+        return self.store.get(self._key(compute_crop_hash(image)))
+
+    def put(self, image: Image.Image, latex: str):
+        """Store the LaTeX recognized for a crop (failed results are not stored)."""
+        if latex:
+            self.store.put(self._key(compute_crop_hash(image)), latex)
+
+    def invalidate_model(self, model_version: Optional[str] = None) -> int:
+        """
+        Drop the results of one OCR model.
+
+        Args:
+            model_version: Model whose entries to drop (default: the current one)
+
+        Returns:
+            Number of entries removed
+        """
+        return self.store.invalidate(f"latex|{model_version or self.model_version}|")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Hit/miss counters and cache size."""
+        return self.store.get_statistics()
+
+    def clear(self) -> int:
+        """Drop every cached result. Returns number of entries removed."""
+        return self.store.invalidate("latex|")
+
+    def close(self):
+        """Close the cache database."""
+        self.store.close()
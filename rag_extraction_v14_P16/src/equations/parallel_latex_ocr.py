@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Parallel LaTeX-OCR
+
+Runs pix2tex on a pool of worker processes. Each worker loads LatexOCR once,
+then receives equation crops (raw RGB bytes plus the zone ID) and returns the
+LaTeX with its OCR time. The main process never loads the model.
+
+Every worker holds at most one equation at a time, so the parent knows
+when each equation started. An equation that exceeds the per-equation
+timeout (a pathological crop can make the decoder run to max_seq_len or
+the resizer loop never settle) is given up: its worker is terminated and
+replaced, and the rest of the chapter carries on.
+
+Key Features:
+    - One LatexOCR per worker process, loaded once ('spawn' start method,
+      torch threads split across workers - see the YOLO worker pool)
+    - Per-equation timeout with worker replacement
+    - One pipe per worker, so killing a stuck worker cannot corrupt the
+      channel of the others
+    - Crashed workers are detected and replaced the same way
+    - Results in input order; same cache/statistics interface as
+      BatchedLatexOCR (drop-in for EquationExtractionAgent)
+
+Author: Claude Code
+Created: 2025-11-17
+"""
+
+import sys
+import os
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional, Sequence
+
+# MANDATORY UTF-8 SETUP - NO EXCEPTIONS
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+from PIL import Image
+
+from rag_extraction_v14_P16.src.equations.batched_latex_ocr import BatchedLatexOCR
+
+
+class ParallelLatexOCR(BatchedLatexOCR):
+    """
+    LaTeX-OCR on persistent worker processes with a per-equation timeout.
+
+    Example:
+        >>> ocr = ParallelLatexOCR(num_workers=4, timeout=60)
+        >>> latex = ocr.recognize(crops, labels=zone_ids)   # None for failures/timeouts
+        >>> ocr.get_statistics()['timeouts']
+        >>> ocr.close()
+    """
+
+    def __init__(self, num_workers: int, timeout: float = 60.0, cache=None,
+                 intra_op_threads: Optional[int] = None):
+        """
+        Configure the pool (workers start on first use).
+
+        Args:
+            num_workers: Worker processes, each with its own LatexOCR model
+            timeout: Seconds one equation may take before its worker is replaced
+            cache: Optional LatexOCRCache consulted before (and filled after) inference
+            intra_op_threads: torch threads per worker (default: CPUs / workers)
+        """
+        self.ocr_model = None
+        self.args = None
+        self.batch_size = 1
+        self.cache = cache
+
+        self.num_workers = max(1, num_workers)
+        self.timeout = timeout
+        self.intra_op_threads = intra_op_threads or max(1, (os.cpu_count() or 1) // self.num_workers)
+
+        self.equations = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self.worker_seconds = 0.0
+        self.timeouts = 0
+        self.worker_restarts = 0
+
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: Dict[int, Dict[str, Any]] = {}
+        self._next_worker_id = 0
+        self._started = False
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """BatchedLatexOCR statistics plus worker count, worker OCR seconds and timeouts."""
+        stats = super().get_statistics()
+        stats.update({
+            'workers': self.num_workers,
+            'timeout': self.timeout,
+            'worker_ocr_seconds': self.worker_seconds,
+            'timeouts': self.timeouts,
+            'worker_restarts': self.worker_restarts
+        })
+        return stats
+
+    def close(self):
+        """Stop the workers (idempotent)."""
+        for worker_id in list(self._workers):
+            worker = self._workers.pop(worker_id)
+            try:
+                worker['conn'].send(None)
+            except (OSError, EOFError):
+                pass
+            worker['process'].join(timeout=5)
+            if worker['process'].is_alive():
+                worker['process'].terminate()
+                worker['process'].join()
+            worker['conn'].close()
+        self._started = False
+
+    def _run_model(self, images: Sequence[Image.Image],
+                   labels: Optional[Sequence[str]] = None) -> List[Optional[str]]:
+        """Hand crops to idle workers one at a time until every crop has a result."""
+        if not images:
+            return []
+        if not self._started:
+            print(f"🔧 Starting {self.num_workers} LaTeX-OCR worker processes "
+                  f"({self.intra_op_threads} threads each)...")
+            for _ in range(self.num_workers):
+                self._spawn_worker()
+            self._started = True
+
+        labels = labels or [f"crop {index + 1}" for index in range(len(images))]
+        results: List[Optional[str]] = [None] * len(images)
+        queued = deque(range(len(images)))
+        remaining = len(images)
+
+        while remaining:
+            if not self._workers:
+                print(f"    ❌ No LaTeX-OCR workers left - {remaining} equations not recognized")
+                break
+
+            # Dispatch to idle workers; the timeout clock starts now
+            for worker in self._workers.values():
+                if worker['ready'] and worker['task'] is None and queued:
+                    index = queued.popleft()
+                    image = images[index].convert('RGB')
+                    worker['conn'].send((index, labels[index], image.size, image.tobytes()))
+                    worker['task'] = index
+                    worker['deadline'] = time.monotonic() + self.timeout
+
+            deadlines = [w['deadline'] for w in self._workers.values() if w['task'] is not None]
+            wait_seconds = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+            handles = {}
+            for worker_id, worker in self._workers.items():
+                handles[worker['conn']] = worker_id
+                handles[worker['process'].sentinel] = worker_id
+            ready = wait(list(handles), timeout=wait_seconds)
+
+            for handle in ready:
+                worker_id = handles[handle]
+                worker = self._workers.get(worker_id)
+                if worker is None:
+                    continue  # Already handled through its other handle
+                if handle is worker['conn'] and worker['conn'].poll():
+                    remaining -= self._receive(worker_id, results, labels)
+                elif not worker['process'].is_alive() and not worker['conn'].poll():
+                    remaining -= self._replace_worker(worker_id, results, labels, "worker process died")
+
+            # Equations past their deadline cost their worker
+            now = time.monotonic()
+            for worker_id, worker in list(self._workers.items()):
+                if worker['task'] is not None and now >= worker['deadline']:
+                    self.timeouts += 1
+                    remaining -= self._replace_worker(worker_id, results, labels,
+                                                      f"timed out after {self.timeout:.0f}s")
+
+        return results
+
+    def _receive(self, worker_id: int, results: List[Optional[str]], labels: Sequence[str]) -> int:
+        """Handle one message from a worker. Returns 1 if it finished an equation."""
+        worker = self._workers[worker_id]
+        try:
+            kind, payload = worker['conn'].recv()
+        except (EOFError, OSError):
+            return self._replace_worker(worker_id, results, labels, "worker connection lost")
+
+        if kind == 'ready':
+            worker['ready'] = True
+            return 0
+
+        if kind == 'load_failed':
+            # Not replaced: a replacement would fail to load the model the same way
+            print(f"    ❌ LaTeX-OCR worker could not load pix2tex: {payload}")
+            self._stop_worker(worker_id)
+            return 0
+
+        index, latex, seconds, error = payload
+        worker['task'] = None
+        self.batches += 1
+        self.worker_seconds += seconds
+        if error:
+            print(f"    ❌ LaTeX-OCR error ({error})")
+        results[index] = latex
+        return 1
+
+    def _replace_worker(self, worker_id: int, results: List[Optional[str]],
+                        labels: Sequence[str], reason: str) -> int:
+        """Kill a worker, fail its equation and start a fresh worker. Returns 1 if it held an equation."""
+        index = self._workers[worker_id]['task']
+        self._stop_worker(worker_id, kill=True)
+        if index is None:
+            print(f"    ⚠️  LaTeX-OCR worker lost ({reason})")
+            return 0
+
+        print(f"    ⚠️  LaTeX-OCR {reason} ({labels[index]}) - restarting worker")
+        results[index] = None
+        self.worker_restarts += 1
+        self._spawn_worker()
+        return 1
+
+    def _spawn_worker(self):
+        """Start one worker process (it reports 'ready' once pix2tex is loaded)."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_latex_ocr_worker,
+            args=(child_conn, self.intra_op_threads),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+
+        self._workers[self._next_worker_id] = {
+            'process': process,
+            'conn': parent_conn,
+            'ready': False,
+            'task': None,
+            'deadline': None
+        }
+        self._next_worker_id += 1
+
+    def _stop_worker(self, worker_id: int, kill: bool = False):
+        """Remove a worker from the pool (terminating it if asked)."""
+        worker = self._workers.pop(worker_id)
+        if kill and worker['process'].is_alive():
+            worker['process'].terminate()
+        worker['process'].join(timeout=5)
+        worker['conn'].close()
+
+
+# ============================================================================
+# WORKER PROCESS
+# ============================================================================
+
+def _latex_ocr_worker(conn, intra_op_threads: int):
+    """
+    Worker process main loop: load pix2tex once, then OCR one crop per message.
+
+    Messages in: (index, zone_id, (width, height), RGB bytes), or None to stop.
+    Messages out: ('ready', None), ('load_failed', error) or
+    ('result', (index, latex, seconds, error)).
+    """
+    try:
+        import torch
+        torch.set_num_threads(intra_op_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # Already set (inter-op pool started)
+
+        from pix2tex.cli import LatexOCR
+        ocr_model = LatexOCR()
+    except Exception as e:
+        conn.send(('load_failed', f"{type(e).__name__}: {e}"))
+        conn.close()
+        return
+
+    conn.send(('ready', None))
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        index, zone_id, size, pixels = task
+        start = time.perf_counter()
+        try:
+            latex, error = ocr_model(Image.frombytes('RGB', size, pixels)).strip(), None
+        except Exception as e:
+            latex, error = None, f"{zone_id}: {type(e).__name__}: {e}"
+        conn.send(('result', (index, latex, time.perf_counter() - start, error)))
+
+    conn.close()
@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Text-Layer LaTeX Reader
+
+Pre-OCR stage for born-digital PDFs: rebuilds an equation's LaTeX from the
+glyphs already in the PDF text layer (page.get_text("rawdict")), so only
+equations whose text layer is missing, garbled or not understood go to
+pix2tex.
+
+Reconstruction:
+    - Glyphs whose center lies in the zone are collected with their font,
+      size, baseline and italic flag
+    - Horizontal rules drawn in the zone (page.get_drawings()) become
+      fraction bars (glyphs above → numerator, below → denominator) or the
+      vinculum of a √ directly to their left (→ \\sqrt{...}), recursively
+    - The rest is one row: smaller glyphs above/below the row baseline are
+      super-/subscripts of the item before them (so limits of ∑/∫ come out
+      as _{...}^{...}); upright letter runs become \\sin, \\log, ... or
+      \\mathrm{...} labels in scripts (T_{\\mathrm{in}}); Unicode math symbols
+      map to their LaTeX commands
+    - A trailing "(N)" matching the zone's equation number is dropped
+
+Confidence (0-1) starts at 1.0 and drops for anything the reader is
+unsure about: unknown symbols, nested scripts, unknown upright letter runs
+on the main row (a word or a product of variables?), glyphs off the row
+that no fraction explains (matrices, cases, multi-line layouts), rules
+that are neither fraction bars nor radicals, extensible delimiters from
+TeX extension fonts. A zone without any operator, relation, fraction or
+radical (prose or a label the detector took for an equation) stays below
+acceptance. With the rendered crop available, ink not covered by any
+glyph or rule (math drawn as paths or images) rejects the text layer.
+
+Author: Claude Code
+Created: 2025-11-17
+"""
+
+import sys
+import os
+import re
+import statistics
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# MANDATORY UTF-8 SETUP - NO EXCEPTIONS
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import fitz  # PyMuPDF
+import numpy as np
+
+
+# Unicode math symbols → LaTeX
+SYMBOL_LATEX = {
+    # Greek (lowercase)
+    'α': r'\alpha', 'β': r'\beta', 'γ': r'\gamma', 'δ': r'\delta', 'ε': r'\varepsilon',
+    'ϵ': r'\epsilon', 'ζ': r'\zeta', 'η': r'\eta', 'θ': r'\theta', 'ϑ': r'\vartheta',
+    'ι': r'\iota', 'κ': r'\kappa', 'λ': r'\lambda', 'μ': r'\mu', 'µ': r'\mu', 'ν': r'\nu',
+    'ξ': r'\xi', 'π': r'\pi', 'ϖ': r'\varpi', 'ρ': r'\rho', 'ϱ': r'\varrho', 'σ': r'\sigma',
+    'ς': r'\varsigma', 'τ': r'\tau', 'υ': r'\upsilon', 'φ': r'\varphi', 'ϕ': r'\phi',
+    'χ': r'\chi', 'ψ': r'\psi', 'ω': r'\omega',
+    # Greek (uppercase, those that differ from Latin letters)
+    'Γ': r'\Gamma', 'Δ': r'\Delta', '∆': r'\Delta', 'Θ': r'\Theta', 'Λ': r'\Lambda',
+    'Ξ': r'\Xi', 'Π': r'\Pi', 'Σ': r'\Sigma', 'Υ': r'\Upsilon', 'Φ': r'\Phi',
+    'Ψ': r'\Psi', 'Ω': r'\Omega', '\u2126': r'\Omega',
+    # Operators and relations
+    '−': '-', '–': '-', '×': r'\times', '·': r'\cdot', '⋅': r'\cdot', '∙': r'\cdot',
+    '÷': r'\div', '±': r'\pm', '∓': r'\mp', '∗': '*', '∘': r'\circ',
+    '≤': r'\leq', '≥': r'\geq', '≦': r'\leq', '≧': r'\geq', '≠': r'\neq', '≈': r'\approx',
+    '≅': r'\cong', '≡': r'\equiv', '∼': r'\sim', '≃': r'\simeq', '∝': r'\propto',
+    '≪': r'\ll', '≫': r'\gg', '∈': r'\in', '∉': r'\notin', '⊂': r'\subset', '⊆': r'\subseteq',
+    '∪': r'\cup', '∩': r'\cap', '∧': r'\wedge', '∨': r'\vee', '¬': r'\neg',
+    '→': r'\rightarrow', '←': r'\leftarrow', '↔': r'\leftrightarrow', '⇒': r'\Rightarrow',
+    '⇐': r'\Leftarrow', '⇔': r'\Leftrightarrow', '↦': r'\mapsto',
+    '∀': r'\forall', '∃': r'\exists', '∅': r'\emptyset',
+    # Big operators and calculus
+    '∑': r'\sum', '∏': r'\prod', '∫': r'\int', '∬': r'\iint', '∭': r'\iiint', '∮': r'\oint',
+    '∂': r'\partial', '∇': r'\nabla', '∞': r'\infty',
+    # Misc
+    '′': "'", '″': "''", '°': r'^{\circ}', '…': r'\ldots', '⋯': r'\cdots', '⟨': r'\langle',
+    '⟩': r'\rangle', '‖': r'\|', 'ℏ': r'\hbar', 'ℓ': r'\ell', '⊥': r'\perp', '∥': r'\parallel',
+    '{': r'\{', '}': r'\}', '%': r'\%', '#': r'\#', '&': r'\&', '$': r'\$', '_': r'\_',
+}
+
+# Upright letter runs typeset as operator names
+FUNCTION_NAMES = {
+    'sin', 'cos', 'tan', 'cot', 'sec', 'csc', 'sinh', 'cosh', 'tanh', 'coth',
+    'arcsin', 'arccos', 'arctan', 'log', 'ln', 'lg', 'exp', 'lim', 'max', 'min',
+    'sup', 'inf', 'det', 'dim', 'ker', 'arg', 'deg', 'gcd'
+}
+
+# Glyphs that make a row math rather than prose (operators, relations, big operators)
+MATH_OPERATORS = set('=+-<>/*') | {
+    '−', '–', '×', '·', '⋅', '∙', '÷', '±', '∓', '∗', '∘',
+    '≤', '≥', '≦', '≧', '≠', '≈', '≅', '≡', '∼', '≃', '∝', '≪', '≫', '∈', '∉', '⊂', '⊆',
+    '∪', '∩', '∧', '∨', '¬', '→', '←', '↔', '⇒', '⇐', '⇔', '↦',
+    '∑', '∏', '∫', '∬', '∭', '∮', '∂', '∇'
+}
+
+# Confidence cap for an unknown upright letter run on the main row: well below
+# any acceptance threshold, so such equations go to OCR
+UNKNOWN_RUN_CONFIDENCE = 0.5
+
+# In an equation without italics, upright runs this long that are no operator
+# name are more likely words than products of variables (E = mc^2 has "mc")
+MIN_WORD_LETTERS = 3
+
+# Confidence cap for a zone with no operator, relation, fraction or radical
+NO_OPERATOR_CONFIDENCE = 0.5
+
+# Fonts carrying extensible delimiters/radicals drawn from pieces
+EXTENSION_FONTS = ('CMEX', 'Extension', 'MTEX', 'Symbol-Ext')
+
+# Thickness/length limits of a drawn rule (points)
+MAX_RULE_THICKNESS = 1.5
+MIN_RULE_LENGTH = 3.0
+
+
+@dataclass
+class TextLayerLatex:
+    """Result of reading one equation zone from the text layer."""
+    latex: str
+    confidence: float
+    reason: str = "ok"                    # why confidence was lowered (or "ok")
+    chars: int = 0                        # glyphs found in the zone
+    ink_coverage: Optional[float] = None  # share of crop ink under glyphs/rules
+    issues: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _Glyph:
+    c: str
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    baseline: float
+    size: float
+    font: str
+    italic: bool
+    space_before: bool = False  # A blank glyph precedes it on its line
+
+    @property
+    def cx(self) -> float:
+        return (self.x0 + self.x1) / 2
+
+    @property
+    def cy(self) -> float:
+        return (self.y0 + self.y1) / 2
+
+
+class _Score:
+    """Confidence with the reasons it was lowered."""
+
+    def __init__(self, upright: bool = False):
+        self.value = 1.0
+        self.issues: List[str] = []
+        self.upright = upright  # No italic letters: the font says nothing about variables
+        self.has_math = False   # Seen an operator, relation, fraction or radical
+
+    def penalize(self, factor: float, issue: str):
+        self.value *= factor
+        self.issues.append(issue)
+
+    def cap(self, limit: float, issue: str):
+        self.value = min(self.value, limit)
+        self.issues.append(issue)
+
+
+class TextLayerLatexReader:
+    """
+    Rebuilds equation LaTeX from a page's text layer.
+
+    Example:
+        >>> reader = TextLayerLatexReader()
+        >>> rawdict = session.get_text(page.number, "rawdict")
+        >>> result = reader.read(page, zone.bbox, rawdict, crop=crop_array, dpi=216)
+        >>> result.latex, result.confidence
+        ('q = -k A \\\\frac{dT}{dx}', 0.95)
+    """
+
+    def __init__(self, min_ink_coverage: float = 0.97):
+        """
+        Args:
+            min_ink_coverage: Share of the crop's ink that glyphs and rules must
+                              cover; below it the text layer is rejected
+        """
+        self.min_ink_coverage = min_ink_coverage
+        self._rules: Dict[Tuple[str, int], List[fitz.Rect]] = {}
+
+    def read(self, page: fitz.Page, rect: Sequence[float], rawdict: Dict[str, Any],
+             crop: Optional[np.ndarray] = None, dpi: Optional[float] = None,
+             equation_number: Optional[str] = None) -> TextLayerLatex:
+        """
+        LaTeX of the equation in rect, with a confidence score.
+
+        Args:
+            page: PyMuPDF page
+            rect: Zone in PDF points, top-left origin
+            rawdict: page.get_text("rawdict") of the page (e.g. cached by PdfDocumentSession)
+            crop: Rendered zone (HxWx3 RGB) for the ink coverage check (optional)
+            dpi: Resolution of crop
+            equation_number: Zone's equation number (a trailing "(N)" is dropped)
+
+        Returns:
+            TextLayerLatex (confidence 0 when the text layer is missing or garbled)
+        """
+        rect = fitz.Rect(rect)
+        glyphs = self._glyphs_in(rawdict, rect)
+        if not glyphs:
+            return TextLayerLatex("", 0.0, "no_text")
+
+        garbled = sum(1 for g in glyphs if _is_garbled(g.c))
+        if garbled:
+            return TextLayerLatex("", 0.0, "garbled", chars=len(glyphs))
+
+        # The number's ink still counts as covered below
+        ink_boxes = [(g.x0, g.y0, g.x1, g.y1) for g in glyphs]
+        if equation_number:
+            glyphs = _strip_equation_number(glyphs, equation_number)
+            if not glyphs:
+                return TextLayerLatex("", 0.0, "no_text")
+
+        zone = rect + (-1, -1, 1, 1)
+        rules = [r for r in self._page_rules(page) if zone.contains(r)]
+
+        score = _Score(upright=not any(g.italic for g in glyphs if g.c.isalpha()))
+        latex = self._layout(glyphs, rules, score)
+        if not score.has_math:
+            score.cap(NO_OPERATOR_CONFIDENCE, "no_operator")
+
+        coverage = None
+        if crop is not None and dpi:
+            coverage = _ink_coverage(crop, rect & page.rect, dpi, ink_boxes + [tuple(r) for r in rules])
+            if coverage < self.min_ink_coverage:
+                score.cap(0.0, "uncovered_ink")
+
+        if not latex.strip():
+            score.cap(0.0, "empty")
+
+        return TextLayerLatex(
+            latex=latex.strip(),
+            confidence=round(score.value, 3),
+            reason=", ".join(sorted(set(score.issues))) or "ok",
+            chars=len(glyphs),
+            ink_coverage=coverage,
+            issues=score.issues
+        )
+
+    # =========================================================================
+    # INPUT
+    # =========================================================================
+
+    @staticmethod
+    def _glyphs_in(rawdict: Dict[str, Any], rect: fitz.Rect) -> List[_Glyph]:
+        """Non-blank glyphs whose center lies in rect (flagged when a blank precedes them)."""
+        glyphs = []
+        for block in rawdict.get("blocks", []):
+            for line in block.get("lines", []):
+                space = False
+                for span in line.get("spans", []):
+                    font = span.get("font", "")
+                    italic = bool(span.get("flags", 0) & 2) or any(
+                        tag in font for tag in ("Italic", "Oblique", "CMMI", "MathItalic"))
+                    for char in span.get("chars", []):
+                        c = char["c"]
+                        if not c.strip():
+                            space = True
+                            continue
+                        x0, y0, x1, y1 = char["bbox"]
+                        if rect.x0 <= (x0 + x1) / 2 <= rect.x1 and rect.y0 <= (y0 + y1) / 2 <= rect.y1:
+                            glyphs.append(_Glyph(c, x0, y0, x1, y1, char["origin"][1],
+                                                 span.get("size", 0.0), font, italic, space))
+                        space = False
+        return glyphs
+
+    def _page_rules(self, page: fitz.Page) -> List[fitz.Rect]:
+        """Thin horizontal rules drawn on the page (fraction bars, vincula), cached per page."""
+        key = (page.parent.name, page.number)
+        if key not in self._rules:
+            rules = []
+            for path in page.get_drawings():
+                for item in path.get("items", []):
+                    if item[0] == 'l':
+                        p1, p2 = item[1], item[2]
+                        r = fitz.Rect(min(p1.x, p2.x), min(p1.y, p2.y), max(p1.x, p2.x), max(p1.y, p2.y))
+                    elif item[0] == 're':
+                        r = fitz.Rect(item[1])
+                    else:
+                        continue
+                    if r.height <= MAX_RULE_THICKNESS and r.width >= MIN_RULE_LENGTH:
+                        rules.append(r)
+            self._rules[key] = rules
+        return self._rules[key]
+
+    # =========================================================================
+    # LAYOUT
+    # =========================================================================
+
+    def _layout(self, glyphs: List[_Glyph], rules: List[fitz.Rect], score: _Score) -> str:
+        """LaTeX of a group of glyphs: radicals and fractions first, then one row."""
+        glyphs = list(glyphs)
+        rules = sorted(rules, key=lambda r: -r.width)
+        size = _main_size(glyphs)
+        items = []  # (x, latex) for structures
+
+        # √ followed by a vinculum: radicand is what lies under the rule
+        for radical in [g for g in glyphs if g.c == '√']:
+            vinculum = next((r for r in rules
+                             if abs(r.x0 - radical.x1) <= 0.4 * radical.size
+                             and radical.y0 - 0.3 * radical.size <= r.y0 <= radical.cy), None)
+            if vinculum is None:
+                continue
+            inside = [g for g in glyphs if g is not radical
+                      and vinculum.x0 <= g.cx <= vinculum.x1 and vinculum.y1 <= g.cy <= radical.y1 + 0.2 * size]
+            inner_rules = [r for r in rules if r is not vinculum and vinculum.x0 <= r.x0 and r.x1 <= vinculum.x1
+                           and vinculum.y1 < r.y0 <= radical.y1]
+            if not inside:
+                continue
+            items.append((radical.x0, r'\sqrt{' + self._layout(inside, inner_rules, score) + '}'))
+            score.has_math = True
+            used = {id(g) for g in inside} | {id(radical)}
+            glyphs = [g for g in glyphs if id(g) not in used]
+            rules = [r for r in rules if r is not vinculum and all(r is not i for i in inner_rules)]
+
+        # Fraction bars, widest (outermost) first
+        for bar in list(rules):
+            if all(r is not bar for r in rules):
+                continue  # Consumed by an enclosing fraction
+            reach = 4 * size
+            numerator = [g for g in glyphs if bar.x0 - 1 <= g.cx <= bar.x1 + 1 and bar.y0 - reach <= g.cy < bar.y0]
+            denominator = [g for g in glyphs if bar.x0 - 1 <= g.cx <= bar.x1 + 1 and bar.y1 < g.cy <= bar.y1 + reach]
+            if not numerator or not denominator:
+                continue
+
+            def within(r: fitz.Rect, members: List[_Glyph]) -> bool:
+                return (r is not bar and bar.x0 - 1 <= r.x0 and r.x1 <= bar.x1 + 1
+                        and min(g.y0 for g in members) <= r.y0 <= max(g.y1 for g in members))
+
+            num_rules = [r for r in rules if within(r, numerator)]
+            den_rules = [r for r in rules if within(r, denominator)]
+            items.append((bar.x0, r'\frac{' + self._layout(numerator, num_rules, score) + '}{'
+                          + self._layout(denominator, den_rules, score) + '}'))
+            score.has_math = True
+            used = {id(g) for g in numerator + denominator}
+            glyphs = [g for g in glyphs if id(g) not in used]
+            used_rules = {id(r) for r in num_rules + den_rules} | {id(bar)}
+            rules = [r for r in rules if id(r) not in used_rules]
+
+        if rules:
+            # Overlines, underlines, table rules ... nothing we can express
+            score.penalize(0.5, "unexplained_rule")
+        if any(g.c == '√' for g in glyphs):
+            score.cap(0.3, "radical_without_vinculum")
+
+        return self._row(glyphs, items, score)
+
+    def _row(self, glyphs: List[_Glyph], structures: List[Tuple[float, str]], score: _Score,
+             script: bool = False) -> str:
+        """One line of math (script: inside a sub-/superscript): base items with scripts attached."""
+        if not glyphs and not structures:
+            return ""
+
+        size = _main_size(glyphs) if glyphs else 0.0
+        base_glyphs = [g for g in glyphs if g.size >= 0.85 * size] or glyphs
+        baseline = statistics.median(g.baseline for g in base_glyphs) if base_glyphs else 0.0
+
+        # Sort glyphs and structures into one left-to-right sequence
+        sequence: List[Tuple[float, Any]] = [(g.x0, g) for g in glyphs] + list(structures)
+        sequence.sort(key=lambda entry: entry[0])
+
+        items: List[Dict[str, Any]] = []
+        for _, entry in sequence:
+            if isinstance(entry, str):
+                items.append({'latex': entry, 'glyph': None, 'sub': [], 'sup': []})
+                continue
+
+            g = entry
+            offset = g.baseline - baseline
+            if g.size < 0.85 * size:
+                if offset < -0.15 * size:
+                    role = 'sup'
+                elif offset > 0.1 * size:
+                    role = 'sub'
+                else:
+                    role = 'base'
+                if role != 'base' and g.size < 0.6 * size:
+                    score.penalize(0.7, "nested_script")
+            else:
+                role = 'base'
+                if abs(offset) > 0.3 * size and g.c not in '∑∏∫∬∭∮()[]|':
+                    score.cap(0.3, "off_baseline")
+
+            if role == 'base':
+                if any(tag in g.font for tag in EXTENSION_FONTS):
+                    score.penalize(0.5, "extension_font")
+                items.append({'latex': None, 'glyph': g, 'sub': [], 'sup': []})
+            elif items:
+                items[-1][role].append(g)
+            else:
+                score.penalize(0.5, "leading_script")
+                items.append({'latex': None, 'glyph': g, 'sub': [], 'sup': []})
+
+        return self._render(items, score, script)
+
+    def _render(self, items: List[Dict[str, Any]], score: _Score, script: bool = False) -> str:
+        """
+        Turn row items into LaTeX (letter runs → operator names, symbols → commands).
+
+        Letter runs end at blanks and wide gaps. An upright run that is no
+        operator name is a label in a script (\\mathrm{...}). On the main row
+        it is ambiguous: with no italics in the equation it is read as
+        separate variables (E = mc^2), but from MIN_WORD_LETTERS letters on
+        it is likely a word, so confidence is capped; with italics it stays
+        \\mathrm{...}, also capped, so OCR gets the equation.
+        """
+        parts: List[str] = []
+        index = 0
+        while index < len(items):
+            item = items[index]
+            g = item['glyph']
+
+            if g is not None and g.c.isalpha() and g.c.isascii() and not g.italic:
+                # Upright letter run without scripts inside it
+                run = [item]
+                while (index + len(run) < len(items)
+                       and not run[-1]['sub'] and not run[-1]['sup']):
+                    nxt = items[index + len(run)]
+                    ng = nxt['glyph']
+                    if (ng is None or not ng.c.isalpha() or not ng.c.isascii() or ng.italic
+                            or ng.space_before or ng.x0 - run[-1]['glyph'].x1 > 0.25 * ng.size):
+                        break
+                    run.append(nxt)
+                word = ''.join(member['glyph'].c for member in run)
+                if len(word) > 1 and (word in FUNCTION_NAMES or script or not score.upright):
+                    if word in FUNCTION_NAMES:
+                        latex = '\\' + word
+                    else:
+                        latex = r'\mathrm{' + word + '}'
+                        if not script:
+                            score.cap(UNKNOWN_RUN_CONFIDENCE, "unknown_upright_run")
+                    parts.append(latex + self._scripts(run[-1], score))
+                    index += len(run)
+                    continue
+                if len(word) > 1:
+                    # All-upright equation: one variable per letter
+                    if len(word) >= MIN_WORD_LETTERS:
+                        score.cap(UNKNOWN_RUN_CONFIDENCE, "unknown_upright_run")
+                    parts.extend(member['glyph'].c for member in run[:-1])
+                    parts.append(run[-1]['glyph'].c + self._scripts(run[-1], score))
+                    index += len(run)
+                    continue
+
+            base = item['latex'] if g is None else self._symbol(g.c, score)
+            parts.append(base + self._scripts(item, score))
+            index += 1
+
+        return _join(parts)
+
+    def _scripts(self, item: Dict[str, Any], score: _Score) -> str:
+        """_{...}^{...} of an item."""
+        latex = ""
+        if item['sub']:
+            latex += '_{' + self._row(item['sub'], [], score, script=True) + '}'
+        if item['sup']:
+            latex += '^{' + self._row(item['sup'], [], score, script=True) + '}'
+        return latex
+
+    @staticmethod
+    def _symbol(c: str, score: _Score) -> str:
+        """LaTeX of one glyph."""
+        if c in MATH_OPERATORS:
+            score.has_math = True
+        if c in SYMBOL_LATEX:
+            return SYMBOL_LATEX[c]
+        if c.isascii():
+            return c
+        normalized = unicodedata.normalize('NFKC', c)
+        if normalized != c and normalized.isascii():
+            return normalized  # Mathematical alphanumerics (𝑥 → x), ligatures
+        score.penalize(0.7, "unknown_symbol")
+        return c
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _is_garbled(c: str) -> bool:
+    """Glyphs without a usable Unicode mapping (missing ToUnicode, private use, controls)."""
+    code = ord(c[0])
+    return (c == '�' or 0xE000 <= code <= 0xF8FF or code < 0x20
+            or unicodedata.category(c[0]) in ('Cc', 'Co', 'Cn'))
+
+
+def _main_size(glyphs: Sequence[_Glyph]) -> float:
+    """Font size covering the most glyphs (the equation's base size)."""
+    sizes: Dict[float, int] = {}
+    for g in glyphs:
+        sizes[round(g.size, 1)] = sizes.get(round(g.size, 1), 0) + 1
+    return max(sizes.items(), key=lambda item: (item[1], item[0]))[0] if sizes else 0.0
+
+
+def _strip_equation_number(glyphs: List[_Glyph], equation_number: str) -> List[_Glyph]:
+    """Drop a trailing '(N)' equal to the zone's equation number."""
+    ordered = sorted(glyphs, key=lambda g: g.x0)
+    tail = f"({equation_number})"
+    text = ''.join(g.c for g in ordered)
+    if text.endswith(tail):
+        return ordered[:-len(tail)]
+    return glyphs
+
+
+def _join(parts: List[str]) -> str:
+    """Concatenate LaTeX pieces, separating control words from following letters."""
+    latex = ""
+    for part in parts:
+        if latex and part and re.search(r'\\[A-Za-z]+$', latex) and part[0].isalpha():
+            latex += ' '
+        latex += part
+    return latex
+
+
+def _ink_coverage(crop: np.ndarray, rect: fitz.Rect, dpi: float,
+                  boxes: Sequence[Tuple[float, float, float, float]]) -> float:
+    """Share of dark crop pixels lying under one of the boxes (PDF points)."""
+    gray = crop.mean(axis=2) if crop.ndim == 3 else crop
+    ink = gray < 160
+    total = int(ink.sum())
+    if total == 0:
+        return 1.0
+
+    scale = dpi / 72
+    covered = np.zeros_like(ink)
+    height, width = ink.shape
+    for x0, y0, x1, y1 in boxes:
+        c0 = max(0, int((x0 - rect.x0) * scale) - 1)
+        r0 = max(0, int((y0 - rect.y0) * scale) - 1)
+        c1 = min(width, int(np.ceil((x1 - rect.x0) * scale)) + 1)
+        r1 = min(height, int(np.ceil((y1 - rect.y0) * scale)) + 1)
+        if c1 > c0 and r1 > r0:
+            covered[r0:r1, c0:c1] = True
+    return float((ink & covered).sum()) / total
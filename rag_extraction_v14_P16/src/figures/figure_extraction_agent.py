@@ -46,7 +46,6 @@ if sys.platform == 'win32':
 import fitz  # PyMuPDF
 import cv2
 import numpy as np
-from PIL import Image
 
 # Import base agent (proper package import, no sys.path manipulation)
 from common.src.base.base_extraction_agent import BaseExtractionAgent, Zone, ExtractedObject
@@ -264,15 +263,20 @@ class FigureExtractionAgent(BaseExtractionAgent):
     >>> results = agent.process_zones(zones)
     """
 
-    def __init__(self, pdf_path: Path, output_dir: Path):
-        super().__init__(pdf_path, output_dir)
+    # 300 DPI for clear visualization (like working October version)
+    RASTER_DPI = 300
+
+    def __init__(self, pdf_path: Path, output_dir: Path, raster_cache=None, document_session=None,
+                 image_writer=None):
+        super().__init__(pdf_path, output_dir, raster_cache=raster_cache,
+                         document_session=document_session, image_writer=image_writer)
         self.agent_type = "figure_extraction"
         self.agent_version = "2.0.0"  # Fixed version - removed broken deduplication, added classification
 
         self.figures_dir = self.output_dir / "figures"
         self.figures_dir.mkdir(parents=True, exist_ok=True)
 
-        self.doc = fitz.open(str(self.pdf_path))
+        self.doc = self.session.doc
 
         # Initialize classifier
         self.classifier = PlotImageClassifier()
@@ -336,7 +340,7 @@ class FigureExtractionAgent(BaseExtractionAgent):
 
         Returns:
             Tuple of (image_path, fig_type, confidence, characteristics) or None
-            - image_path: Path to saved PNG file
+            - image_path: Path to the figure image (PNG unless the image writer says otherwise)
             - fig_type: "plot", "image", or "uncertain"
             - confidence: 0.0 to 1.0
             - characteristics: dict with feature scores
@@ -351,22 +355,15 @@ class FigureExtractionAgent(BaseExtractionAgent):
             y1_flip = page_height - y1
             y0_flip, y1_flip = min(y0_flip, y1_flip), max(y0_flip, y1_flip)
 
-            # Render at 300 DPI for clear visualization (like working October version)
+            # Render at 300 DPI, not 150 (sliced from the shared page raster if enabled)
             rect = fitz.Rect(x0, y0_flip, x1, y1_flip)
-            mat = fitz.Matrix(300/72, 300/72)  # 300 DPI, not 150
-            pix = page.get_pixmap(matrix=mat, clip=rect)
-
-            # Convert PyMuPDF pixmap to numpy array for classification
-            img_data = pix.tobytes("png")
-            pil_img = Image.open(io.BytesIO(img_data))
-            img_array = np.array(pil_img)
+            img_array = self.render_region(page, rect)
 
             # Classify as plot vs image
             fig_type, confidence, characteristics = self.classifier.classify(img_array)
 
-            # Save figure image
-            img_path = self.figures_dir / f"{zone.zone_id}.png"
-            pix.save(str(img_path))
+            # Save figure image (encoded by the image writer, path is final now)
+            img_path = self.save_image(img_array, self.figures_dir / f"{zone.zone_id}.png")
 
             return img_path, fig_type, confidence, characteristics
 
@@ -377,8 +374,7 @@ class FigureExtractionAgent(BaseExtractionAgent):
     def _extract_caption(self, zone: Zone) -> str:
         """Extract figure caption (Figure X: ...)."""
         try:
-            page = self.doc[zone.page - 1]
-            page_text = page.get_text()
+            page_text = self.session.page_text(zone.page - 1)
 
             patterns = [
                 r'(Figure\s+\d+[a-z]?[\s\.:][^\n]+)',
@@ -415,5 +411,5 @@ class FigureExtractionAgent(BaseExtractionAgent):
                 print(f"{'='*70}\n")
 
     def __del__(self):
-        if hasattr(self, 'doc'):
-            self.doc.close()
+        if hasattr(self, '_session'):
+            self.close()
@@ -5,11 +5,14 @@
 Table Extraction Agent - RAG-Ready Structured Table Data Extraction
 
 Extracts tables as structured data (JSON, CSV) with images and captions.
-Uses Docling markdown output and converts to multiple machine-readable formats.
+Builds tables from Docling's cell grid (markdown output as fallback) and
+converts them to multiple machine-readable formats.
 
 Key Features:
 -------------
 - **Structured Data**: Pandas DataFrame → JSON/CSV for ML/LLM processing
+- **Cell Grid Path**: DataFrame built directly from Docling cells and spans
+  (no markdown re-parsing, merged cells resolved from their spans)
 - **Markdown Preservation**: Keep Docling markdown for human readability
 - **Image Extraction**: Crop table images at proper resolution
 - **Caption Detection**: Auto-detect "Table X:" patterns above bbox
@@ -17,7 +20,7 @@ Key Features:
 
 Technical Approach:
 -------------------
-1. Parse Docling markdown to pandas DataFrame
+1. Build pandas DataFrame from the Docling cell grid (parse markdown if no grid)
 2. Crop table image using bbox coordinates
 3. Extract caption from text above table
 4. Convert to multiple formats (JSON, CSV, markdown)
@@ -25,7 +28,8 @@ Technical Approach:
 
 Design Rationale:
 -----------------
-- **Why Docling markdown**: Already provides accurate table structure
+- **Why the cell grid**: Docling already knows rows, columns, spans and
+  header cells; markdown flattens merged cells and has to be parsed again
 - **Why pandas**: Standard library for tabular data, easy CSV/JSON conversion
 - **Why multiple formats**: Different use cases (CSV for spreadsheets, JSON for APIs)
 - **Why caption detection**: Essential context for LLM understanding
@@ -75,7 +79,8 @@ class TableExtractionAgent(BaseExtractionAgent):
     """
     Specialized agent for extracting tables as structured data.
 
-    This agent converts Docling markdown tables to multiple RAG-ready formats.
+    This agent converts Docling tables (cell grid, or markdown as fallback)
+    to multiple RAG-ready formats.
 
     Usage Example:
     --------------
@@ -85,7 +90,7 @@ class TableExtractionAgent(BaseExtractionAgent):
     ...     output_dir=Path("results/rag_extractions")
     ... )
     >>> zones = [Zone(id="table_1", type="table", page=2, bbox=[...],
-    ...               metadata={"markdown": "| col1 | col2 |\\n..."})]
+    ...               metadata={"cell_grid": {...}})]  # or {"markdown": "| col1 | col2 |\\n..."}
     >>> results = agent.process_zones(zones)
     >>> # Results contain structured JSON, CSV, markdown, images
 
@@ -108,39 +113,47 @@ class TableExtractionAgent(BaseExtractionAgent):
         }
     """
 
-    def __init__(self, pdf_path: Path, output_dir: Path):
+    # Table crop images are rendered at 150 DPI
+    RASTER_DPI = 150
+
+    def __init__(self, pdf_path: Path, output_dir: Path, raster_cache=None, document_session=None,
+                 image_writer=None):
         """
         Initialize table extraction agent.
 
         Args:
             pdf_path: Path to source PDF
             output_dir: Base output directory
+            raster_cache: Optional shared PageRasterCache (see BaseExtractionAgent)
+            document_session: Optional shared PdfDocumentSession (see BaseExtractionAgent)
+            image_writer: Optional shared CropImageWriter (see BaseExtractionAgent)
 
         Raises:
             ImportError: If pandas library not installed
             FileNotFoundError: If PDF not found
         """
-        super().__init__(pdf_path, output_dir)
+        super().__init__(pdf_path, output_dir, raster_cache=raster_cache,
+                         document_session=document_session, image_writer=image_writer)
 
         self.agent_type = "table_extraction"
-        self.agent_version = "2.0.0"  # Bumped for enhanced markdown parsing
+        self.agent_version = "2.1.0"  # Bumped for Docling cell grid path
 
         # Create output subdirectories
         self.tables_dir = self.output_dir / "tables"
         self.tables_dir.mkdir(parents=True, exist_ok=True)
 
-        # Open PDF document
-        self.doc = fitz.open(str(self.pdf_path))
+        # Open PDF document (shared session if given)
+        self.doc = self.session.doc
         print(f"📄 PDF loaded: {len(self.doc)} pages")
 
     def extract_from_zone(self, zone: Zone) -> Optional[ExtractedObject]:
         """
-        Extract table from zone using Docling markdown.
+        Extract table from zone using the Docling cell grid (or markdown).
 
         Process:
         --------
-        1. Get markdown from zone metadata
-        2. Parse markdown to pandas DataFrame
+        1. Get cell grid (fallback: markdown) from zone metadata
+        2. Build pandas DataFrame from the grid (fallback: parse markdown)
         3. Convert to JSON structured data
         4. Save as CSV
         5. Crop table image
@@ -155,23 +168,32 @@ class TableExtractionAgent(BaseExtractionAgent):
         """
         try:
             # Validate table-specific metadata
-            if not zone.metadata or "markdown" not in zone.metadata:
-                print(f"    ⚠️  No markdown in metadata")
+            metadata = zone.metadata or {}
+            cell_grid = metadata.get("cell_grid")
+            markdown = metadata.get("markdown", "")
+            if not cell_grid and not markdown:
+                print("    ⚠️  No cell grid or markdown in metadata")
                 return None
 
-            markdown = zone.metadata["markdown"]
-
-            # Parse markdown to DataFrame
-            df = self._parse_markdown_table(markdown)
-            if df is None or df.empty:
-                print(f"    ❌ Failed to parse markdown table")
-                return None
+            # Build DataFrame from Docling cells; markdown only as fallback
+            df = self._grid_to_dataframe(cell_grid) if cell_grid else None
+            from_grid = df is not None and not df.empty
+            if not from_grid:
+                if not markdown:
+                    print("    ❌ Failed to build table from cell grid")
+                    return None
+                df = self._parse_markdown_table(markdown)
+                if df is None or df.empty:
+                    print("    ❌ Failed to parse markdown table")
+                    return None
+            elif not markdown:
+                markdown = self._dataframe_to_markdown(df)
 
             # Convert to structured JSON
             structured_data = self._dataframe_to_structured(df)
 
             # Extract notes (GENERIC: works for any table) - do this BEFORE CSV save
-            notes = self._extract_notes(zone)
+            notes = self._extract_notes(zone, markdown)
 
             # Save as CSV with notes
             csv_path = self._save_csv(zone.zone_id, df, notes)
@@ -208,9 +230,9 @@ class TableExtractionAgent(BaseExtractionAgent):
                     "related_figures": []
                 },
                 metadata={
-                    "extraction_method": "docling_markdown_v2.0",
-                    "parsing_library": "pandas",
-                    "confidence": 1.0  # Docling markdown is highly reliable
+                    "extraction_method": "docling_cell_grid_v2.1" if from_grid else "docling_markdown_v2.0",
+                    "parsing_library": "docling" if from_grid else "pandas",
+                    "confidence": 1.0  # Docling table structure is highly reliable
                 },
                 document_id=self.document_metadata.get("document_id"),
                 zotero_key=self.document_metadata.get("zotero_key")
@@ -222,6 +244,130 @@ class TableExtractionAgent(BaseExtractionAgent):
             traceback.print_exc()
             return None
 
+    def _grid_to_dataframe(self, grid: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """
+        Build DataFrame directly from a Docling cell grid (zone.metadata['cell_grid']).
+
+        Merged cells are resolved from their spans instead of being guessed
+        from flattened markdown:
+        - Header rows are the leading rows with column header cells (first
+          row if Docling flagged none); a header spanning several columns
+          prefixes each of their names ("Thermal Conductivity / W/m C")
+        - Body cells spanning rows are repeated in every row they cover
+        - Body cells spanning columns (e.g. section rows) fill their first column
+        - A first row that repeats the table caption across the table is skipped
+
+        Args:
+            grid: Serialized cell grid ({'num_rows', 'num_cols', 'fields', 'cells'})
+
+        Returns:
+            DataFrame of cell text, numeric columns converted to numbers (as
+            read_csv infers them on the markdown path), or None if the grid
+            is unusable
+        """
+        try:
+            num_rows, num_cols = grid["num_rows"], grid["num_cols"]
+            fields = grid["fields"]
+
+            header = [[""] * num_cols for _ in range(num_rows)]  # Spans repeated in every position
+            body = [[""] * num_cols for _ in range(num_rows)]    # Row spans repeated, column spans once
+            column_header_rows = set()
+            caption_row = False
+
+            for values in grid["cells"]:
+                cell = dict(zip(fields, values))
+                text = re.sub(r'\s+', ' ', cell["text"]).strip()
+                row0, col0 = cell["row"], cell["col"]
+                row1 = min(num_rows, row0 + cell["row_span"])
+                col1 = min(num_cols, col0 + cell["col_span"])
+
+                if cell["column_header"]:
+                    column_header_rows.update(range(row0, row1))
+                if row0 == 0 and col1 - col0 == num_cols > 1 and re.search(r'Table\s*\d', text, re.IGNORECASE):
+                    caption_row = True
+
+                for row in range(row0, row1):
+                    body[row][col0] = text
+                    for col in range(col0, col1):
+                        header[row][col] = text
+
+            first = 0
+            if caption_row:
+                print(f"    🔧 Skipping repeated caption row: {header[0][0][:50]}...")
+                first = 1
+
+            num_headers = 0
+            while first + num_headers < num_rows and first + num_headers in column_header_rows:
+                num_headers += 1
+            num_headers = max(1, num_headers)
+
+            if first + num_headers >= num_rows:
+                print("    ⚠️  Cell grid has no data rows")
+                return None
+
+            # Column names: distinct header texts top-down
+            columns = []
+            for col in range(num_cols):
+                parts = []
+                for row in range(first, first + num_headers):
+                    text = header[row][col]
+                    if text and (not parts or parts[-1] != text):
+                        parts.append(text)
+                columns.append(" / ".join(parts))
+
+            rows = [row for row in body[first + num_headers:] if any(row)]
+
+            # Drop empty columns, name unnamed ones, de-duplicate names (as pandas does)
+            keep = [col for col in range(num_cols) if columns[col] or any(row[col] for row in rows)]
+            names, seen = [], {}
+            for col in keep:
+                name = columns[col] or f"Column {col + 1}"
+                if name in seen:
+                    seen[name] += 1
+                    name = f"{name}.{seen[name]}"
+                else:
+                    seen[name] = 0
+                names.append(name)
+
+            df = pd.DataFrame([[row[col] for col in keep] for row in rows], columns=names)
+
+            # Columns whose non-empty cells are all numbers become int/float
+            # (empty cells → NaN), so exports store numbers, not text
+            for position in range(len(df.columns)):
+                column = df.iloc[:, position]
+                if not column.ne("").any():
+                    continue
+                try:
+                    df.isetitem(position, pd.to_numeric(column.mask(column.eq(""))))
+                except (ValueError, TypeError):
+                    pass  # Text column
+
+            print(f"    ✅ Built table from cell grid: {len(df)} rows × {len(df.columns)} columns")
+
+            return df
+
+        except Exception as e:
+            print(f"    ⚠️  Cell grid conversion failed: {e}")
+            return None
+
+    def _dataframe_to_markdown(self, df: pd.DataFrame) -> str:
+        """
+        Render DataFrame as a markdown pipe table (for zones without Docling markdown).
+
+        Args:
+            df: pandas DataFrame
+
+        Returns:
+            Markdown table string
+        """
+        def markdown_row(values) -> str:
+            cells = ("" if pd.isna(value) else str(value) for value in values)
+            return "| " + " | ".join(cell.replace("|", "\\|") for cell in cells) + " |"
+
+        lines = [markdown_row(df.columns), "|" + "|".join("---" for _ in df.columns) + "|"]
+        lines.extend(markdown_row(values) for values in df.values.tolist())
+        return "\n".join(lines)
+
     def _parse_markdown_table(self, markdown: str) -> Optional[pd.DataFrame]:
         """
         Enhanced markdown table parser with Docling export issue handling.
@@ -443,15 +589,11 @@ class TableExtractionAgent(BaseExtractionAgent):
             # Create rect
             rect = fitz.Rect(x0, y0_flip, x1, y1_flip)
 
-            # Render at 150 DPI
-            mat = fitz.Matrix(150/72, 150/72)
-            pix = page.get_pixmap(matrix=mat, clip=rect)
-
-            # Save image
-            img_path = self.tables_dir / f"{zone.zone_id}.png"
-            pix.save(str(img_path))
+            # Render at 150 DPI (sliced from the shared page raster if enabled)
+            crop = self.render_region(page, rect)
 
-            return img_path
+            # Save image (encoded by the image writer, path is final now)
+            return self.save_image(crop, self.tables_dir / f"{zone.zone_id}.png")
 
         except Exception as e:
             print(f"    ⚠️  Image crop failed: {e}")
@@ -475,8 +617,8 @@ class TableExtractionAgent(BaseExtractionAgent):
             if page_idx >= len(self.doc):
                 return ""
 
-            page = self.doc[page_idx]
-            page_text = page.get_text()
+            # Page text indexed once per page (shared with the note search)
+            index = self.session.text_index(page_idx)
 
             # Look for "Table X" patterns
             patterns = [
@@ -485,7 +627,7 @@ class TableExtractionAgent(BaseExtractionAgent):
             ]
 
             for pattern in patterns:
-                matches = re.findall(pattern, page_text, re.IGNORECASE)
+                matches = index.search(pattern, re.IGNORECASE)
                 if matches:
                     # Return first match (tables are usually numbered sequentially)
                     caption = matches[0].strip()
@@ -499,7 +641,7 @@ class TableExtractionAgent(BaseExtractionAgent):
             print(f"    ⚠️  Caption extraction failed: {e}")
             return ""
 
-    def _extract_notes(self, zone: Zone) -> str:
+    def _extract_notes(self, zone: Zone, markdown: Optional[str] = None) -> str:
         """
         ENHANCED GENERIC: Extract notes/footnotes from inside table AND below table.
 
@@ -519,6 +661,7 @@ class TableExtractionAgent(BaseExtractionAgent):
 
         Args:
             zone: Zone with page, bbox, and metadata containing markdown
+            markdown: Table markdown (default: zone.metadata['markdown'])
 
         Returns:
             Combined note text from both sources, or empty if no notes found
@@ -526,7 +669,7 @@ class TableExtractionAgent(BaseExtractionAgent):
         all_notes = []
 
         # PART 1: Extract notes from inside table markdown
-        notes_from_table = self._extract_notes_from_table_data(zone)
+        notes_from_table = self._extract_notes_from_table_data(zone, markdown)
         if notes_from_table:
             all_notes.append(notes_from_table)
 
@@ -544,7 +687,7 @@ class TableExtractionAgent(BaseExtractionAgent):
 
         return ""
 
-    def _extract_notes_from_table_data(self, zone: Zone) -> str:
+    def _extract_notes_from_table_data(self, zone: Zone, markdown: Optional[str] = None) -> str:
         """
         PART 1: Extract notes from inside table markdown.
 
@@ -562,12 +705,13 @@ class TableExtractionAgent(BaseExtractionAgent):
 
         Args:
             zone: Zone with metadata containing markdown
+            markdown: Table markdown (default: zone.metadata['markdown'])
 
         Returns:
             Note text extracted from table data, or empty string
         """
         try:
-            markdown = zone.metadata.get("markdown", "")
+            markdown = markdown or zone.metadata.get("markdown", "")
             if not markdown:
                 return ""
 
@@ -636,60 +780,45 @@ class TableExtractionAgent(BaseExtractionAgent):
             note_zone_top = table_bottom
             note_zone_bottom = min(table_bottom + 400, page_height)  # Extended to 400px
 
-            # Extract text blocks
-            blocks = page.get_text("dict")["blocks"]
+            # Text blocks starting in the note zone (page indexed once, sorted by y)
+            blocks = self.session.text_index(page_idx).blocks_between(note_zone_top, note_zone_bottom)
 
             note_lines = []
             found_note_start = False
 
             for block in blocks:
-                if "lines" not in block:
-                    continue
-
-                block_y = block["bbox"][1]
-
-                if note_zone_top <= block_y <= note_zone_bottom:
-                    block_text = ""
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            block_text += span["text"]
-                        block_text += " "
-
-                    block_text = block_text.strip()
-
-                    # Look for numbered notes matching references
-                    if note_numbers:
-                        # Pattern: "1." or "Note 1:" or "1)"
-                        for num in note_numbers:
-                            note_start_patterns = [
-                                f'^{num}[\\.:)]\\s',
-                                f'^Note\\s*{num}\\s*[\\.:)]',
-                                f'^\\({num}\\)\\s'
-                            ]
-                            if any(re.match(pat, block_text, re.IGNORECASE) for pat in note_start_patterns):
-                                found_note_start = True
-                                break
-
-                    # Also look for generic "Note:" patterns
-                    if not found_note_start:
-                        generic_patterns = [
-                            r'^Note\s*\d*\s*[:.]',
-                            r'^Notes?\s*[:.]',
-                            r'^\d+\.\s'
+                block_text = block.text
+
+                # Look for numbered notes matching references
+                if note_numbers:
+                    # Pattern: "1." or "Note 1:" or "1)"
+                    for num in note_numbers:
+                        note_start_patterns = [
+                            f'^{num}[\\.:)]\\s',
+                            f'^Note\\s*{num}\\s*[\\.:)]',
+                            f'^\\({num}\\)\\s'
                         ]
-                        if any(re.match(pat, block_text, re.IGNORECASE) for pat in generic_patterns):
+                        if any(re.match(pat, block_text, re.IGNORECASE) for pat in note_start_patterns):
                             found_note_start = True
+                            break
 
-                    if found_note_start:
-                        note_lines.append(block_text)
+                # Also look for generic "Note:" patterns
+                if not found_note_start:
+                    generic_patterns = [
+                        r'^Note\s*\d*\s*[:.]',
+                        r'^Notes?\s*[:.]',
+                        r'^\d+\.\s'
+                    ]
+                    if any(re.match(pat, block_text, re.IGNORECASE) for pat in generic_patterns):
+                        found_note_start = True
 
-                        # Stop at next table/figure
-                        if re.match(r'^(Table|Figure|Fig\.)\s+\d+', block_text, re.IGNORECASE):
-                            note_lines.pop()
-                            break
+                if found_note_start:
+                    note_lines.append(block_text)
 
-                elif block_y > note_zone_bottom:
-                    break
+                    # Stop at next table/figure
+                    if re.match(r'^(Table|Figure|Fig\.)\s+\d+', block_text, re.IGNORECASE):
+                        note_lines.pop()
+                        break
 
             if note_lines:
                 return " ".join(note_lines)
@@ -742,56 +871,37 @@ class TableExtractionAgent(BaseExtractionAgent):
             note_zone_top = table_bottom
             note_zone_bottom = min(table_bottom + 250, page_height)
 
-            # Extract text blocks with position info
-            blocks = page.get_text("dict")["blocks"]
+            # Text blocks whose top lies in the note zone (page indexed once, sorted by y)
+            blocks = self.session.text_index(page_idx).blocks_between(note_zone_top, note_zone_bottom)
 
             note_lines = []
             in_note_region = False
 
             for block in blocks:
-                # Skip non-text blocks
-                if "lines" not in block:
-                    continue
+                block_text = block.text
 
-                block_y = block["bbox"][1]  # Top of block
-
-                # Check if block is in note zone
-                if note_zone_top <= block_y <= note_zone_bottom:
-                    # Extract text from block
-                    block_text = ""
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            block_text += span["text"]
-                        block_text += " "
-
-                    block_text = block_text.strip()
-
-                    # Check for note patterns
-                    note_patterns = [
-                        r'^Note\s*\d*\s*[:.]',  # Note: or Note 1: or Note 2:
-                        r'^\*+\s',  # Asterisk footnotes (*, **, ***)
-                        r'^Where\s*:',  # Variable definitions
-                        r'^\(?\d+\)\s*Note',  # (1) Note or 1) Note
-                    ]
+                # Check for note patterns
+                note_patterns = [
+                    r'^Note\s*\d*\s*[:.]',  # Note: or Note 1: or Note 2:
+                    r'^\*+\s',  # Asterisk footnotes (*, **, ***)
+                    r'^Where\s*:',  # Variable definitions
+                    r'^\(?\d+\)\s*Note',  # (1) Note or 1) Note
+                ]
 
-                    is_note_start = any(re.match(pat, block_text, re.IGNORECASE) for pat in note_patterns)
+                is_note_start = any(re.match(pat, block_text, re.IGNORECASE) for pat in note_patterns)
 
-                    if is_note_start:
-                        in_note_region = True
+                if is_note_start:
+                    in_note_region = True
 
-                    # If we're in a note region, collect text
-                    if in_note_region:
-                        note_lines.append(block_text)
-
-                        # Stop if we hit another table or figure
-                        if re.match(r'^(Table|Figure|Fig\.)\s+\d+', block_text, re.IGNORECASE):
-                            # This is the start of next object, don't include it
-                            note_lines.pop()
-                            break
+                # If we're in a note region, collect text
+                if in_note_region:
+                    note_lines.append(block_text)
 
-                # If we've passed the note zone, stop
-                elif block_y > note_zone_bottom:
-                    break
+                    # Stop if we hit another table or figure
+                    if re.match(r'^(Table|Figure|Fig\.)\s+\d+', block_text, re.IGNORECASE):
+                        # This is the start of next object, don't include it
+                        note_lines.pop()
+                        break
 
             # Combine note lines
             if note_lines:
@@ -807,6 +917,6 @@ class TableExtractionAgent(BaseExtractionAgent):
             return ""
 
     def __del__(self):
-        """Clean up PDF document on deletion."""
-        if hasattr(self, 'doc'):
-            self.doc.close()
+        """Clean up PDF document on deletion (close() releases it deterministically)."""
+        if hasattr(self, '_session'):
+            self.close()
@@ -50,15 +50,15 @@ class TextExtractionAgent(BaseExtractionAgent):
     - Context preservation
     """
 
-    def __init__(self, pdf_path: Path, output_dir: Path):
-        super().__init__(pdf_path, output_dir)
+    def __init__(self, pdf_path: Path, output_dir: Path, document_session=None):
+        super().__init__(pdf_path, output_dir, document_session=document_session)
         self.agent_type = "text_extraction"
         self.agent_version = "1.0.0"
 
         self.text_dir = self.output_dir / "text"
         self.text_dir.mkdir(parents=True, exist_ok=True)
 
-        self.doc = fitz.open(str(self.pdf_path))
+        self.doc = self.session.doc
 
     def extract_from_zone(self, zone: Zone) -> Optional[ExtractedObject]:
         """Extract text block with reference detection."""
@@ -170,5 +170,5 @@ class TextExtractionAgent(BaseExtractionAgent):
         return refs
 
     def __del__(self):
-        if hasattr(self, 'doc'):
-            self.doc.close()
+        if hasattr(self, '_session'):
+            self.close()
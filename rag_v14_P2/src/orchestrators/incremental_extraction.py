@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental Extraction - Re-Extract Only Pages That Changed
+
+When a publisher sends a revised PDF (errata pages), most pages are identical
+to the previous version. This module keeps a per-page fingerprint manifest
+for each processed PDF together with the Zones and ExtractedObjects of that
+run, and tells the orchestrator which objects can be reused.
+
+Workflow:
+---------
+1. PageManifest.from_pdf(): fingerprint every page (text layer + image digests,
+   common/src/file_io/pdf_hash.py)
+2. align_pages(): match old and new pages by fingerprint (handles inserted and
+   deleted pages, so unchanged pages after an insertion still match)
+3. IncrementalPlan.partition(): split freshly detected zones into
+   - reused: zone on an unchanged page that matches a stored zone (same type,
+     same bbox, same text) → its stored ExtractedObject is reused
+   - to_extract: everything else (changed pages, new objects)
+4. IncrementalPlan.remap_objects(): reused objects take the fresh zone's ID and
+   page; their output files are renamed where numbering shifted
+5. IncrementalState.save(): persist manifest, zones and objects for next time
+
+Design Rationale:
+-----------------
+- **Fresh IDs Win**: Zone IDs always come from the current detection pass, so
+  global numbering (table_1..N) and page-based IDs (eq_yolo_{page}_{n}) are
+  correct for the revised document; stored objects are remapped onto them
+- **Detection Stays Cheap**: Unchanged pages hit the content-addressed detection
+  cache (YOLO per page) and the persisted Docling conversion
+- **Conservative Matching**: A stored object is only reused when its zone is
+  geometrically identical on a fingerprint-identical page
+- **JSON State**: Plain dataclass dicts next to the extraction outputs
+
+Author: Claude Code
+Date: 2025-11-17
+Version: 1.0
+"""
+
+import sys
+import os
+
+# MANDATORY UTF-8 SETUP
+if sys.platform == 'win32':
+    import io
+    if not hasattr(sys.stdout, '_wrapped_utf8'):
+        try:
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+            sys.stdout._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            os.system('chcp 65001')
+    if not hasattr(sys.stderr, '_wrapped_utf8'):
+        try:
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+            sys.stderr._wrapped_utf8 = True
+        except (AttributeError, ValueError):
+            pass
+
+import json
+import uuid
+from collections import Counter
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz
+
+from common.src.base.base_extraction_agent import Zone, ExtractedObject
+from common.src.file_io.pdf_hash import compute_page_fingerprint, compute_pdf_hash
+from common.src.file_io.crop_image_writer import THUMBNAIL_DIRNAME
+
+
+# Output subdirectories whose files are named {object_id}.{ext}
+OUTPUT_SUBDIRS = ('equations', 'tables', 'figures', 'text')
+
+# Maximum bbox corner difference (PDF points) for two zones to be "the same"
+BBOX_TOLERANCE = 1.0
+
+
+@dataclass
+class PageManifest:
+    """Per-page fingerprints of one PDF version."""
+    pdf_file: str
+    pdf_hash: str
+    page_fingerprints: List[str]  # index = 0-indexed page
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @classmethod
+    def from_pdf(cls, pdf_path: Path, doc: Optional[fitz.Document] = None) -> 'PageManifest':
+        """Fingerprint every page of a PDF (from doc if it is already open)."""
+        pdf_path = Path(pdf_path)
+        if doc is not None:
+            fingerprints = [compute_page_fingerprint(page) for page in doc]
+        else:
+            with fitz.open(str(pdf_path)) as doc:
+                fingerprints = [compute_page_fingerprint(page) for page in doc]
+        return cls(pdf_file=str(pdf_path), pdf_hash=compute_pdf_hash(pdf_path),
+                   page_fingerprints=fingerprints)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PageManifest':
+        return cls(**data)
+
+
+def align_pages(old: List[str], new: List[str]) -> Dict[int, int]:
+    """
+    Match unchanged pages between two versions of a document.
+
+    Args:
+        old: Previous page fingerprints
+        new: Current page fingerprints
+
+    Returns:
+        Dict mapping 1-indexed new page → 1-indexed old page, for pages whose
+        fingerprint is unchanged (in document order, so an inserted erratum
+        page shifts the numbers of the pages after it)
+    """
+    matcher = SequenceMatcher(a=old, b=new, autojunk=False)
+    page_map = {}
+    for block in matcher.get_matching_blocks():
+        for offset in range(block.size):
+            page_map[block.b + offset + 1] = block.a + offset + 1
+    return page_map
+
+
+def _zone_signature(zone: Zone) -> Tuple:
+    """What must be identical for a stored zone to stand in for a fresh one."""
+    metadata = zone.metadata or {}
+    return (zone.type, metadata.get('text_content'), metadata.get('html'))
+
+
+def _bbox_close(a: List[float], b: List[float]) -> bool:
+    return len(a) == len(b) and all(abs(x - y) <= BBOX_TOLERANCE for x, y in zip(a, b))
+
+
+class IncrementalPlan:
+    """
+    Which fresh zones can reuse a stored ExtractedObject.
+
+    Usage Example:
+    --------------
+    >>> plan = IncrementalPlan(previous_state, manifest)
+    >>> to_extract, reused = plan.partition(zones)
+    >>> objects = plan.remap_objects(reused, output_dir)
+    """
+
+    def __init__(self, previous: Optional[Dict[str, Any]], manifest: PageManifest):
+        """
+        Build the plan.
+
+        Args:
+            previous: State loaded by IncrementalState.load() (None = first run)
+            manifest: Manifest of the current PDF
+        """
+        self.manifest = manifest
+        self.previous = previous
+
+        if previous:
+            old_manifest = PageManifest.from_dict(previous['manifest'])
+            self.page_map = align_pages(old_manifest.page_fingerprints, manifest.page_fingerprints)
+        else:
+            self.page_map = {}
+
+        total = len(manifest.page_fingerprints)
+        self.changed_pages = sorted(p for p in range(1, total + 1) if p not in self.page_map)
+
+        # Stored zones/objects indexed by old page. IDs that occur more than once
+        # (state written before zone IDs were made unique) cannot be tied to
+        # one object, so their zones are re-extracted.
+        self._stored_zones: Dict[int, List[Zone]] = {}
+        self._stored_objects: Dict[str, ExtractedObject] = {}
+        if previous:
+            zones = [Zone(**zone_dict) for zone_dict in previous.get('zones', [])]
+            objects = [ExtractedObject(**obj_dict) for obj_dict in previous.get('objects', [])]
+            zone_ids = Counter(zone.zone_id for zone in zones)
+            object_ids = Counter(obj.id for obj in objects)
+            for zone in zones:
+                if zone_ids[zone.zone_id] == 1:
+                    self._stored_zones.setdefault(zone.page, []).append(zone)
+            for obj in objects:
+                if object_ids[obj.id] == 1:
+                    self._stored_objects[obj.id] = obj
+
+    @property
+    def is_first_run(self) -> bool:
+        return self.previous is None
+
+    def partition(self, zones: List[Zone]) -> Tuple[List[Zone], List[Tuple[Zone, ExtractedObject]]]:
+        """
+        Split fresh zones into those to extract and those with a reusable object.
+
+        Returns:
+            (zones_to_extract, [(fresh_zone, stored_object), ...])
+        """
+        to_extract: List[Zone] = []
+        reused: List[Tuple[Zone, ExtractedObject]] = []
+        claimed = set()
+
+        for zone in zones:
+            old_page = self.page_map.get(zone.page)
+            match = None
+            if old_page is not None:
+                for stored in self._stored_zones.get(old_page, []):
+                    if (stored.zone_id not in claimed
+                            and stored.zone_id in self._stored_objects
+                            and _zone_signature(stored) == _zone_signature(zone)
+                            and _bbox_close(stored.bbox, zone.bbox)):
+                        match = stored
+                        break
+
+            if match is None:
+                to_extract.append(zone)
+            else:
+                claimed.add(match.zone_id)
+                reused.append((zone, self._stored_objects[match.zone_id]))
+
+        return to_extract, reused
+
+    def remap_objects(self, reused: List[Tuple[Zone, ExtractedObject]],
+                      output_dir: Path) -> List[ExtractedObject]:
+        """
+        Move stored objects onto the fresh zones' IDs and pages.
+
+        Output files named {old_id}.{ext} are renamed to {new_id}.{ext} (two-phase,
+        so swapped numbers never overwrite each other) and path strings inside
+        the object are rewritten. Must run before extracting new zones, whose
+        files use the fresh IDs too.
+
+        Returns:
+            Remapped ExtractedObjects in the order of `reused`
+        """
+        output_dir = Path(output_dir)
+        id_map = {obj.id: zone.zone_id for zone, obj in reused if obj.id != zone.zone_id}
+
+        # Phase 1: move every affected file (and crop thumbnail) out of the way
+        staged = []
+        token = uuid.uuid4().hex[:8]
+        for subdir in OUTPUT_SUBDIRS:
+            for dir_path in (output_dir / subdir, output_dir / subdir / THUMBNAIL_DIRNAME):
+                if not dir_path.exists():
+                    continue
+                for path in dir_path.iterdir():
+                    if path.is_file() and path.stem in id_map:
+                        tmp_path = path.with_name(f".remap_{token}_{path.name}")
+                        path.rename(tmp_path)
+                        staged.append((tmp_path, path.with_name(f"{id_map[path.stem]}{path.suffix}")))
+
+        # Phase 2: give them their new names
+        for tmp_path, final_path in staged:
+            tmp_path.replace(final_path)
+
+        remapped = []
+        for zone, obj in reused:
+            data = asdict(obj)
+            data['id'] = zone.zone_id
+            data['page'] = zone.page
+            data['content'] = _remap_paths(data['content'], id_map)
+            data['metadata'] = dict(data['metadata'], reused_from=obj.id,
+                                    reused_from_page=obj.page)
+            remapped.append(ExtractedObject(**data))
+
+        if id_map:
+            print(f"  Remapped {len(id_map)} object ID(s) after numbering shifts "
+                  f"({len(staged)} file(s) renamed)")
+        return remapped
+
+
+def _remap_paths(value: Any, id_map: Dict[str, str]) -> Any:
+    """Rewrite path strings whose file stem is a remapped object ID."""
+    if isinstance(value, dict):
+        return {k: _remap_paths(v, id_map) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_remap_paths(v, id_map) for v in value]
+    if isinstance(value, str) and value:
+        path = Path(value)
+        in_output_dir = path.parent.name in OUTPUT_SUBDIRS or (
+            path.parent.name == THUMBNAIL_DIRNAME and path.parent.parent.name in OUTPUT_SUBDIRS
+        )
+        if path.suffix and path.stem in id_map and in_output_dir:
+            return str(path.with_name(f"{id_map[path.stem]}{path.suffix}"))
+    return value
+
+
+class IncrementalState:
+    """
+    Manifest, zones and extracted objects of the last run of one PDF.
+
+    Stored as <output_dir>/incremental/<pdf stem>.json.
+    """
+
+    def __init__(self, output_dir: Path, pdf_path: Path):
+        self.state_path = Path(output_dir) / 'incremental' / f"{Path(pdf_path).stem}.json"
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Previous state, or None if this PDF was never processed here."""
+        if not self.state_path.exists():
+            return None
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Ignoring unreadable incremental state {self.state_path}: {e}")
+            return None
+
+    def save(self, manifest: PageManifest, zones: List[Zone], objects: List[ExtractedObject]):
+        """Persist the state of the run that just finished."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            'manifest': asdict(manifest),
+            'zones': [asdict(z) for z in zones],
+            'objects': [asdict(o) for o in objects],
+            'saved_at': datetime.now().isoformat()
+        }
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.state_path)
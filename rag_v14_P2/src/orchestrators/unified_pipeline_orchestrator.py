@@ -3,9 +3,13 @@
 Unified Pipeline Orchestrator - Thin Coordination Layer
 
 This orchestrator coordinates the complete extraction pipeline:
-1. Phase 1: Parallel detection (DocLayout-YOLO + Docling)
+1. Phase 1: Concurrent detection (DocLayout-YOLO and Docling at the same time)
 2. Phase 2: Parallel extraction (existing RAG agents)
 
+Incremental mode (incremental=True) re-extracts only objects on pages whose
+fingerprint changed since the last run and reuses the rest
+(see incremental_extraction.py).
+
 Design Principles:
 ------------------
 - **Thin Layer**: NO extraction logic - pure coordination
@@ -38,8 +42,8 @@ if sys.platform == 'win32':
             pass
 
 from pathlib import Path
-from typing import Dict, List, Any
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 import json
 import shutil
@@ -50,6 +54,16 @@ from detection_v14_P14.src.yolo.unified_detection_module import UnifiedDetection
 from detection_v14_P14.src.docling.docling_table_detector import DoclingTableDetector
 from detection_v14_P14.src.docling.docling_figure_detector import DoclingFigureDetector
 from detection_v14_P14.src.docling.docling_text_detector import DoclingTextDetector
+from detection_v14_P14.src.docling.docling_conversion_service import get_conversion_service
+from detection_v14_P14.src.docling.sharded_docling_conversion import ShardedDoclingConverter
+from detection_v14_P14.src.cache.detection_cache import DetectionCache
+from common.src.base.base_extraction_agent import ensure_unique_zone_ids
+from common.src.file_io.page_raster_cache import PageRasterCache
+from common.src.file_io.pdf_document_session import PdfDocumentSession
+from common.src.file_io.crop_image_writer import CropImageWriter
+from rag_v14_P2.src.orchestrators.incremental_extraction import (
+    IncrementalPlan, IncrementalState, PageManifest
+)
 
 # Import existing RAG agents (absolute imports from package root)
 from rag_extraction_v14_P16.src.equations.equation_extraction_agent import EquationExtractionAgent
@@ -65,6 +79,23 @@ from metadata_v14_P13.src.bibliography.bibliography_extraction_agent import Bibl
 from extraction_v14_P1.src.agents.table.table_export_agent import TableExportAgent
 
 
+def _set_torch_threads(num_threads: Optional[int]) -> Optional[int]:
+    """
+    Set torch intra-op threads in this process (in-process Docling conversion).
+
+    Returns:
+        Previous thread count (None if torch is unavailable)
+    """
+    try:
+        import torch
+        previous = torch.get_num_threads()
+        if num_threads:
+            torch.set_num_threads(max(1, num_threads))
+        return previous
+    except Exception:
+        return None
+
+
 class UnifiedPipelineOrchestrator:
     """
     Thin orchestrator for coordinating complete extraction pipeline.
@@ -76,7 +107,18 @@ class UnifiedPipelineOrchestrator:
     - Result aggregation
     """
 
-    def __init__(self, model_path: str, output_dir: Path, clean_before_run: bool = True):
+    def __init__(self, model_path: str, output_dir: Path, clean_before_run: bool = True,
+                 use_detection_cache: bool = True, cache_dir: Path = None,
+                 cache_max_size_mb: int = 512, docling_sharded: bool = False,
+                 docling_workers: int = None, incremental: bool = False,
+                 registry=None, doc_id: str = None, share_page_rasters: bool = True,
+                 raster_cache_max_mb: int = 768, crop_image_format: str = 'png',
+                 crop_thumbnail_size: int = None, image_workers: int = 4,
+                 equation_batch_size: int = 8, use_latex_cache: bool = True,
+                 latex_cache_max_mb: int = 64, equation_workers: int = 0,
+                 equation_timeout: float = 60.0, equation_text_layer: bool = True,
+                 equation_text_layer_min_confidence: float = 0.9,
+                 table_export_streaming: bool = True, table_export_workers: int = 4):
         """
         Initialize orchestrator.
 
@@ -84,12 +126,80 @@ class UnifiedPipelineOrchestrator:
             model_path: Path to DocLayout-YOLO model
             output_dir: Base output directory for all extractions
             clean_before_run: If True, remove old extraction files before processing (default: True)
+            use_detection_cache: Reuse cached YOLO/Docling detections and Docling
+                                 conversions for unchanged documents (default: True)
+            cache_dir: Detection cache directory (default: <output_dir>/cache);
+                       converted Docling documents go to <cache_dir>/docling
+            cache_max_size_mb: Detection cache size cap before LRU eviction (default: 512)
+            docling_sharded: Convert page-range shards of the PDF in parallel worker
+                             processes instead of one whole-document conversion (default: False)
+            docling_workers: Shard worker processes (default: CentralizedCoreManager)
+            incremental: Reuse extracted objects on pages whose fingerprint is unchanged
+                         since the last run into output_dir; only changed pages are
+                         re-extracted (forces the detection cache on)
+            registry: Optional DocumentRegistry to record the extraction (with its
+                      page manifest and parent extraction) in the extractions table
+            doc_id: Registered document ID (required for registry recording)
+            share_page_rasters: Render each page once for the equation/table/figure
+                                agents and crop zones from that raster (default: True)
+            raster_cache_max_mb: Page raster cache size cap before LRU eviction (default: 768)
+            crop_image_format: Equation/table/figure crop format: 'png' (default),
+                               'png_fast', 'webp' or 'webp_lossless'
+            crop_thumbnail_size: Also write crop thumbnails with this longest side
+                                 (<subdir>/thumbnails/; default: off)
+            image_workers: Crop encoder threads, overlapping encoding with extraction
+                           (0 = encode synchronously; default: 4)
+            equation_batch_size: Equation crops per batched pix2tex LaTeX-OCR pass
+                                 (1 = one OCR call per equation; default: 8)
+            use_latex_cache: Reuse LaTeX-OCR results for identical equation crops from
+                             earlier runs or other documents (<cache_dir>/latex_ocr_cache.db)
+            latex_cache_max_mb: LaTeX-OCR cache size cap before LRU eviction (default: 64)
+            equation_workers: Run LaTeX-OCR on this many worker processes, each loading
+                              pix2tex once (default: 0 = batched in this process)
+            equation_timeout: Seconds one equation may take in a worker before it is
+                              given up and the worker replaced (default: 60)
+            equation_text_layer: Read born-digital equations from the PDF text layer
+                                 and only OCR the rest (default: True)
+            equation_text_layer_min_confidence: Text-layer LaTeX below this confidence
+                                                goes to LaTeX-OCR (default: 0.9)
+            table_export_streaming: Write the tables workbook in write-only mode, so
+                                    export memory stays flat with table count (default: True)
+            table_export_workers: Threads writing table CSVs during export (default: 4)
         """
         self.model_path = model_path
         self.output_dir = Path(output_dir)
         self.clean_before_run = clean_before_run
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        self.use_detection_cache = use_detection_cache
+        self.cache_dir = Path(cache_dir) if cache_dir else self.output_dir / "cache"
+        self.cache_max_size_mb = cache_max_size_mb
+        self.docling_sharded = docling_sharded
+        self.docling_workers = docling_workers
+
+        self.incremental = incremental
+        if incremental:
+            # Unchanged pages must hit the detection cache for re-detection to be cheap
+            self.use_detection_cache = True
+        self.registry = registry
+        self.doc_id = doc_id
+
+        self.share_page_rasters = share_page_rasters
+        self.raster_cache_max_mb = raster_cache_max_mb
+
+        self.crop_image_format = crop_image_format
+        self.crop_thumbnail_size = crop_thumbnail_size
+        self.image_workers = image_workers
+        self.equation_batch_size = equation_batch_size
+        self.use_latex_cache = use_latex_cache
+        self.latex_cache_max_mb = latex_cache_max_mb
+        self.equation_workers = equation_workers
+        self.equation_timeout = equation_timeout
+        self.equation_text_layer = equation_text_layer
+        self.equation_text_layer_min_confidence = equation_text_layer_min_confidence
+        self.table_export_streaming = table_export_streaming
+        self.table_export_workers = table_export_workers
+
     def _clean_output_directories(self):
         """
         Clean old extraction files from previous runs.
@@ -120,6 +230,119 @@ class UnifiedPipelineOrchestrator:
         else:
             print(f"  ✅ No old files found (clean start)\n")
 
+    def _run_docling_detection(self, pdf_path: Path, detection_cache: Optional[DetectionCache],
+                               docling_key: Optional[str], cpu_budget: int, page_count: int,
+                               cap_torch_threads: bool) -> tuple:
+        """
+        Docling engine for Phase 1 (tables + figures + text).
+
+        Runs on a detection thread next to YOLO, so it must not use PyMuPDF
+        (not thread-safe): the cache key (docling_key) and the page count for
+        sharded mode are computed before the engines start and passed in.
+        Sharded mode splits cpu_budget across its worker processes. The
+        in-process conversion is capped at cpu_budget torch threads only when
+        cap_torch_threads is set - the setting is process-wide, so it would
+        also cap YOLO running in this process.
+
+        Returns:
+            ({'tables': [...], 'figures': [...], 'text': [...]}, seconds)
+        """
+        start = datetime.now()
+
+        cached_docling = detection_cache.get_docling_zones(docling_key) if detection_cache else None
+        if cached_docling is not None:
+            print("Using cached Docling zones (document unchanged)...")
+            zones = cached_docling
+        elif self.docling_sharded:
+            # Page-range shards converted in parallel processes, zones merged back
+            sharded_converter = ShardedDoclingConverter(
+                num_workers=self.docling_workers,
+                cache_dir=self.cache_dir / "docling" if self.use_detection_cache else None,
+                cpu_budget=cpu_budget
+            )
+            zones = sharded_converter.detect(pdf_path, page_count=page_count)
+        else:
+            previous_threads = _set_torch_threads(cpu_budget) if cap_torch_threads else None
+            try:
+                conversion_service = get_conversion_service(
+                    self.cache_dir / "docling" if self.use_detection_cache else None,
+                    max_size_mb=self.cache_max_size_mb
+                )
+                docling_table_detector = DoclingTableDetector(conversion_service)
+                docling_figure_detector = DoclingFigureDetector(conversion_service=conversion_service)
+                docling_text_detector = DoclingTextDetector(conversion_service)
+
+                # First: Run Docling once (for tables, figures, AND text)
+                if self.use_detection_cache:
+                    # Persisted DoclingDocument: a previously converted PDF is just loaded
+                    docling_result = conversion_service.convert(pdf_path)
+                else:
+                    print("Running Docling conversion (tables + figures + text)...")
+                    docling_result = docling_table_detector.converter.convert_single(pdf_path)
+
+                # Extract tables, figures, and text from same Docling result (sequential, can't pickle)
+                print("Extracting Docling zones (tables + figures + text)...")
+                zones = {
+                    'tables': docling_table_detector.detect_tables(pdf_path, docling_result),
+                    'figures': docling_figure_detector.detect_figures(pdf_path, docling_result),
+                    'text': docling_text_detector.detect_text(pdf_path, docling_result)
+                }
+            finally:
+                # Phase 2 agents get the whole machine back
+                if previous_threads is not None:
+                    _set_torch_threads(previous_threads)
+
+            if detection_cache:
+                detection_cache.put_docling_zones(docling_key, zones)
+
+        return zones, (datetime.now() - start).total_seconds()
+
+    def _run_yolo_detection(self, unified_detector: UnifiedDetectionModule, pdf_path: Path,
+                            num_workers: int, cpu_budget: int,
+                            session: Optional[PdfDocumentSession] = None) -> tuple:
+        """
+        YOLO engine for Phase 1 (equations), on a detection thread next to Docling.
+
+        Returns:
+            (zones, seconds)
+        """
+        start = datetime.now()
+        print("Running YOLO detection (equations only)...")
+        zones = unified_detector.detect_all_objects(pdf_path, num_workers, cpu_budget=cpu_budget,
+                                                    document_session=session)
+        return zones, (datetime.now() - start).total_seconds()
+
+    def _register_extraction(self, pdf_path: Path, plan: Optional[IncrementalPlan],
+                             processing_seconds: float) -> str:
+        """
+        Record this run in the registry's extractions table.
+
+        In incremental mode the page manifest is stored with the extraction, and
+        the document's previous extraction is recorded as its parent.
+
+        Returns:
+            extraction_id
+        """
+        from database_v14_P6.src.registry.document_registry import ExtractionMetadata
+
+        parent = self.registry.get_latest_extraction(self.doc_id)
+        manifest = plan.manifest if plan is not None else None
+
+        metadata = ExtractionMetadata(
+            extraction_id=self.registry.generate_extraction_id(self.doc_id),
+            doc_id=self.doc_id,
+            pdf_file=str(pdf_path),
+            pdf_hash=self.registry.compute_pdf_hash(pdf_path),
+            output_directory=str(self.output_dir),
+            processing_time_seconds=processing_seconds,
+            page_manifest=manifest.page_fingerprints if manifest else None,
+            parent_extraction_id=parent['extraction_id'] if parent else None,
+            pages_reprocessed=len(plan.changed_pages) if plan is not None else None
+        )
+        extraction_id = self.registry.register_extraction(metadata)
+        print(f"Registered extraction: {extraction_id}")
+        return extraction_id
+
     def process_document(self, pdf_path: Path, num_workers: int = 8) -> Dict[str, Any]:
         """
         Process complete document through unified pipeline.
@@ -137,6 +360,9 @@ class UnifiedPipelineOrchestrator:
            - TextExtractionAgent (EXISTING)
         4. Result aggregation
 
+        Every stage reads the PDF through one PdfDocumentSession (parsed once,
+        page text cached), closed when the run ends.
+
         Args:
             pdf_path: Path to PDF file
             num_workers: Number of parallel workers for detection
@@ -144,6 +370,12 @@ class UnifiedPipelineOrchestrator:
         Returns:
             Dictionary with extracted objects by type
         """
+        with PdfDocumentSession(pdf_path) as session:
+            return self._run_pipeline(pdf_path, num_workers, session)
+
+    def _run_pipeline(self, pdf_path: Path, num_workers: int,
+                      session: PdfDocumentSession) -> Dict[str, Any]:
+        """Body of process_document, with the run's shared document session."""
         print(f"\n{'='*80}")
         print(f"UNIFIED PIPELINE ORCHESTRATOR")
         print(f"{'='*80}")
@@ -151,8 +383,23 @@ class UnifiedPipelineOrchestrator:
         print(f"Output: {self.output_dir}")
         print()
 
-        # Clean old files if requested
-        if self.clean_before_run:
+        # Incremental mode: fingerprint pages and compare with the last run
+        plan = None
+        incremental_state = None
+        if self.incremental:
+            print("Fingerprinting pages for incremental extraction...")
+            manifest = PageManifest.from_pdf(pdf_path, doc=session.doc)
+            incremental_state = IncrementalState(self.output_dir, pdf_path)
+            plan = IncrementalPlan(incremental_state.load(), manifest)
+            if plan.is_first_run:
+                print(f"  No previous run found - full extraction ({len(manifest.page_fingerprints)} pages)")
+            else:
+                print(f"  {len(plan.changed_pages)}/{len(manifest.page_fingerprints)} pages changed: "
+                      f"{plan.changed_pages[:20]}{' ...' if len(plan.changed_pages) > 20 else ''}")
+            print()
+
+        # Clean old files if requested (previous outputs are kept for reuse in incremental mode)
+        if self.clean_before_run and (plan is None or plan.is_first_run):
             print("Cleaning old extraction files...")
             self._clean_output_directories()
 
@@ -170,7 +417,7 @@ class UnifiedPipelineOrchestrator:
 
         # Scan document for all object references to establish expectations
         print("Scanning document for object references...")
-        inventory_agent = DocumentReferenceInventoryAgent(pdf_path)
+        inventory_agent = DocumentReferenceInventoryAgent(pdf_path, document_session=session)
         inventory = inventory_agent.scan_document()
 
         # Save inventory for later comparison
@@ -191,33 +438,64 @@ class UnifiedPipelineOrchestrator:
 
         detection_start = datetime.now()
 
+        # Detection cache (content-addressed: unchanged pages skip inference)
+        detection_cache = None
+        if self.use_detection_cache:
+            detection_cache = DetectionCache(self.cache_dir, max_size_mb=self.cache_max_size_mb)
+
         # Initialize detectors
-        unified_detector = UnifiedDetectionModule(self.model_path)
-        docling_table_detector = DoclingTableDetector()
-        docling_figure_detector = DoclingFigureDetector()
-        docling_text_detector = DoclingTextDetector()
-
-        # Run detections: YOLO in parallel, Docling sequentially (unpicklable results)
-        print("Launching detection...")
-        print("  - DocLayout-YOLO: equations (YOLO figures/text DISABLED)")
-        print("  - Docling: tables + figures + text (semantic understanding)")
+        unified_detector = UnifiedDetectionModule(self.model_path, cache=detection_cache)
+
+        # Everything that reads the PDF for the Docling thread happens here, before
+        # the engines start: only the YOLO thread touches PyMuPDF while they run
+        docling_key = detection_cache.docling_key(pdf_path, doc=session.doc) if detection_cache else None
+        page_count = len(session)
+
+        # Workers YOLO will actually use (fewer than requested when most pages are cached)
+        yolo_workers = unified_detector.resolve_num_workers(
+            num_workers, len(unified_detector.pages_to_detect(pdf_path, document_session=session))
+        )
+
+        # Run both engines at the same time: they share no inputs, so detection
+        # latency is max(YOLO, Docling) instead of the sum. Each gets half the CPUs.
+        total_cpus = os.cpu_count() or 1
+        yolo_cpus = max(1, total_cpus // 2)
+        docling_cpus = max(1, total_cpus - yolo_cpus)
+        # torch threads are per process: Docling's cap would also throttle
+        # in-process YOLO, so it only applies while YOLO runs in its worker pool
+        yolo_out_of_process = yolo_workers > 1
+
+        print("Launching detection (concurrent engines)...")
+        print(f"  - DocLayout-YOLO: equations (YOLO figures/text DISABLED) - {yolo_cpus} CPUs")
+        print(f"  - Docling: tables + figures + text (semantic understanding) - {docling_cpus} CPUs")
         print()
 
-        # First: Run Docling once (for tables, figures, AND text)
-        print("Running Docling conversion (tables + figures + text)...")
-        docling_result = docling_table_detector.converter.convert_single(pdf_path)
-
-        # Extract tables, figures, and text from same Docling result (sequential, can't pickle)
-        print("Extracting Docling zones (tables + figures + text)...")
-        docling_table_zones = docling_table_detector.detect_tables(pdf_path, docling_result)
-        docling_figure_zones = docling_figure_detector.detect_figures(pdf_path, docling_result)
-        docling_text_zones = docling_text_detector.detect_text(pdf_path, docling_result)
-
-        # YOLO detection (can run separately, no dependency on Docling)
-        print("Running YOLO detection (equations only)...")
-        doclayout_zones = unified_detector.detect_all_objects(pdf_path, num_workers)
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='detection') as executor:
+            docling_future = executor.submit(
+                self._run_docling_detection, pdf_path, detection_cache, docling_key, docling_cpus,
+                page_count, yolo_out_of_process
+            )
+            yolo_future = executor.submit(
+                self._run_yolo_detection, unified_detector, pdf_path, num_workers, yolo_cpus, session
+            )
+
+            # Zone merging waits for both engines
+            docling_zones, docling_duration = docling_future.result()
+            doclayout_zones, yolo_duration = yolo_future.result()
+
+        docling_table_zones = docling_zones['tables']
+        docling_figure_zones = docling_zones['figures']
+        docling_text_zones = docling_zones['text']
+
+        if detection_cache:
+            cache_stats = detection_cache.get_statistics()
+            print(f"Detection cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                  f"({cache_stats['total_bytes'] / 1024**2:.1f} MB)")
+            detection_cache.close()
 
         detection_duration = (datetime.now() - detection_start).total_seconds()
+        print(f"YOLO detection: {yolo_duration:.1f}s, Docling detection: {docling_duration:.1f}s "
+              f"(phase: {detection_duration:.1f}s)")
 
         # Filter out YOLO figure and text zones (use Docling instead for better semantic understanding)
         doclayout_zones_filtered = [z for z in doclayout_zones if z.type == "equation"]
@@ -230,8 +508,12 @@ class UnifiedPipelineOrchestrator:
         print(f"Docling text zones: {len(docling_text_zones)}")
         print()
 
-        # Merge zones (YOLO equations + Docling tables/figures/text)
-        all_zones = doclayout_zones_filtered + docling_table_zones + docling_figure_zones + docling_text_zones
+        # Merge zones (YOLO equations + Docling tables/figures/text). Results,
+        # output files and incremental state are keyed by zone ID, so IDs must
+        # be unique across detectors.
+        all_zones = ensure_unique_zone_ids(
+            doclayout_zones_filtered + docling_table_zones + docling_figure_zones + docling_text_zones
+        )
 
         print()
         print(f"Detection phase complete in {detection_duration:.1f}s")
@@ -261,39 +543,105 @@ class UnifiedPipelineOrchestrator:
         print(f"  Text: {len(text_zones)}")
         print()
 
+        # Incremental mode: reuse stored objects for unchanged zones (renamed onto
+        # the fresh zone IDs before any new files are written)
+        zones_to_extract = all_zones
+        reused_objects = {}
+        if plan is not None and not plan.is_first_run:
+            zones_to_extract, reused = plan.partition(all_zones)
+            reused_objects = {obj.id: obj for obj in plan.remap_objects(reused, self.output_dir)}
+            print(f"Incremental: reusing {len(reused_objects)} objects, "
+                  f"extracting {len(zones_to_extract)} zones")
+            print()
+
         # Call existing agents (reuse working code!)
         results = {}
+        extract_ids = {z.zone_id for z in zones_to_extract}
+        agent_runs = (
+            ('equations', equation_zones, EquationExtractionAgent),
+            ('tables', table_zones, TableExtractionAgent),
+            ('figures', figure_zones, FigureExtractionAgent),
+            ('text', text_zones, TextExtractionAgent),
+        )
+        agent_options = {
+            EquationExtractionAgent: {
+                'ocr_batch_size': self.equation_batch_size,
+                'latex_cache_dir': self.cache_dir if self.use_latex_cache else None,
+                'latex_cache_max_mb': self.latex_cache_max_mb,
+                'ocr_workers': self.equation_workers,
+                'ocr_timeout': self.equation_timeout,
+                'use_text_layer': self.equation_text_layer,
+                'text_layer_min_confidence': self.equation_text_layer_min_confidence
+            },
+        }
+        agent_stats = {}
+
+        # One page raster at the highest crop DPI, shared by the cropping agents
+        raster_cache = None
+        if self.share_page_rasters:
+            raster_cache = PageRasterCache(
+                dpi=max(agent_class.RASTER_DPI for _, _, agent_class in agent_runs
+                        if agent_class.RASTER_DPI),
+                max_bytes=self.raster_cache_max_mb * 1024 * 1024
+            )
+
+        # Crop images are encoded on a thread pool while the next zones are extracted
+        image_writer = CropImageWriter(
+            image_format=self.crop_image_format,
+            thumbnail_size=self.crop_thumbnail_size,
+            max_workers=self.image_workers
+        )
+
+        for key, zones, agent_class in agent_runs:
+            if not zones:
+                continue
+
+            new_zones = [z for z in zones if z.zone_id in extract_ids]
+            extracted = {}
+            if new_zones:
+                print(f"Calling {agent_class.__name__} (EXISTING)...")
+                if agent_class.RASTER_DPI:
+                    agent = agent_class(pdf_path, self.output_dir, raster_cache=raster_cache,
+                                        document_session=session, image_writer=image_writer,
+                                        **agent_options.get(agent_class, {}))
+                else:
+                    agent = agent_class(pdf_path, self.output_dir, document_session=session)
+                extracted = {obj.id: obj for obj in agent.process_zones(new_zones)}
+                if 'latex_ocr' in agent.stats:
+                    agent_stats['equation_ocr'] = agent.stats['latex_ocr']
+                if 'text_layer' in agent.stats:
+                    agent_stats['equation_text_layer'] = agent.stats['text_layer']
+                agent.close()
+                print()
+
+            # Reused and freshly extracted objects, in zone order
+            results[key] = [
+                extracted.get(z.zone_id) or reused_objects[z.zone_id]
+                for z in zones
+                if z.zone_id in extracted or z.zone_id in reused_objects
+            ]
+
+        image_writer.close()
+        image_stats = image_writer.get_statistics()
+        print(f"Crop images ({image_stats['image_format']}): {image_stats['images_written']} written, "
+              f"{image_stats['thumbnails_written']} thumbnails "
+              f"({image_stats['bytes_written'] / 1024**2:.1f} MB, {image_stats['encode_seconds']:.1f}s encoding)")
+        print()
 
-        # Equations
-        if equation_zones:
-            print("Calling EquationExtractionAgent (EXISTING)...")
-            eq_agent = EquationExtractionAgent(pdf_path, self.output_dir)
-            results['equations'] = eq_agent.process_zones(equation_zones)
-            print()
-
-        # Tables
-        if table_zones:
-            print("Calling TableExtractionAgent (EXISTING)...")
-            tbl_agent = TableExtractionAgent(pdf_path, self.output_dir)
-            results['tables'] = tbl_agent.process_zones(table_zones)
-            print()
+        if incremental_state is not None:
+            incremental_state.save(plan.manifest, all_zones,
+                                   [obj for objects in results.values() for obj in objects])
 
-        # Figures
-        if figure_zones:
-            print("Calling FigureExtractionAgent (EXISTING)...")
-            fig_agent = FigureExtractionAgent(pdf_path, self.output_dir)
-            results['figures'] = fig_agent.process_zones(figure_zones)
-            print()
+        extraction_duration = (datetime.now() - extraction_start).total_seconds()
 
-        # Text
-        if text_zones:
-            print("Calling TextExtractionAgent (EXISTING)...")
-            txt_agent = TextExtractionAgent(pdf_path, self.output_dir)
-            results['text'] = txt_agent.process_zones(text_zones)
+        raster_stats = None
+        if raster_cache is not None:
+            raster_stats = raster_cache.get_statistics()
+            raster_cache.clear()
+            print(f"Page raster cache ({raster_stats['dpi']} DPI): {raster_stats['hits']} hits, "
+                  f"{raster_stats['misses']} pages rendered, {raster_stats['evictions']} evictions")
             print()
 
-        extraction_duration = (datetime.now() - extraction_start).total_seconds()
-
         # ==================================================================
         # PHASE 2.5: OBJECT NUMBERING + BIBLIOGRAPHY
         # ==================================================================
@@ -306,7 +654,8 @@ class UnifiedPipelineOrchestrator:
 
         # Assign actual object numbers from captions
         print("Assigning actual object numbers from captions...")
-        coordinator = ObjectNumberingCoordinator(pdf_path, document_title="Chapter 4")
+        coordinator = ObjectNumberingCoordinator(pdf_path, document_title="Chapter 4",
+                                                 document_session=session)
 
         # Assign numbers to each type
         if table_zones:
@@ -315,11 +664,12 @@ class UnifiedPipelineOrchestrator:
             figure_zones = coordinator.assign_figure_numbers(figure_zones)
         if equation_zones:
             equation_zones = coordinator.assign_equation_numbers(equation_zones)
+        coordinator.close()
 
         # Extract bibliography
         print("Extracting bibliographic references...")
         bib_agent = BibliographyExtractionAgent(grobid_url="http://localhost:8070")
-        references = bib_agent.extract_bibliography(pdf_path)
+        references = bib_agent.extract_bibliography(pdf_path, document_session=session)
 
         # Save bibliography
         bib_path = self.output_dir / "bibliography.json"
@@ -342,7 +692,8 @@ class UnifiedPipelineOrchestrator:
         # Export tables to Excel with embedded images
         if results.get('tables'):
             print("Exporting tables to Excel with embedded images...")
-            table_exporter = TableExportAgent(self.output_dir)
+            table_exporter = TableExportAgent(self.output_dir, streaming=self.table_export_streaming,
+                                              csv_workers=self.table_export_workers)
             export_results = table_exporter.export_all(results['tables'])
             print(f"  ✅ Exported {len(export_results.get('csv', []))} CSV files")
             print(f"  ✅ Exported {len(export_results.get('excel', []))} Excel files")
@@ -409,6 +760,9 @@ class UnifiedPipelineOrchestrator:
             'output_dir': str(self.output_dir),
             'timing': {
                 'detection_seconds': detection_duration,
+                'yolo_detection_seconds': yolo_duration,
+                'docling_detection_seconds': docling_duration,
+                'detection_cpu_split': {'yolo': yolo_cpus, 'docling': docling_cpus},
                 'extraction_seconds': extraction_duration,
                 'total_seconds': overall_duration
             },
@@ -426,6 +780,24 @@ class UnifiedPipelineOrchestrator:
             'timestamp': datetime.now().isoformat()
         }
 
+        if raster_stats is not None:
+            summary['raster_cache'] = raster_stats
+        summary['document_session'] = session.get_statistics()
+        summary['crop_images'] = image_stats
+        summary.update(agent_stats)
+
+        if plan is not None:
+            summary['incremental'] = {
+                'first_run': plan.is_first_run,
+                'pages_total': len(plan.manifest.page_fingerprints),
+                'pages_changed': len(plan.changed_pages),
+                'objects_reused': len(reused_objects),
+                'zones_extracted': len(zones_to_extract)
+            }
+
+        if self.registry is not None and self.doc_id:
+            summary['extraction_id'] = self._register_extraction(pdf_path, plan, overall_duration)
+
         summary_file = self.output_dir / 'unified_pipeline_summary.json'
         with open(summary_file, 'w', encoding='utf-8') as f:
             json.dump(summary, f, indent=2, ensure_ascii=False)
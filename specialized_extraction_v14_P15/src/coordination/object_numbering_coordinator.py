@@ -71,13 +71,14 @@ class ObjectNumberingCoordinator:
         >>> print(numbered_zones[0].metadata['object_number'])  # "1" not "0"
     """
 
-    def __init__(self, pdf_path: Path, document_title: str = "Chapter 4"):
+    def __init__(self, pdf_path: Path, document_title: str = "Chapter 4", document_session=None):
         """
         Initialize numbering coordinator.
 
         Args:
             pdf_path: Path to PDF document
             document_title: Document title for unnumbered object labeling
+            document_session: Optional shared PdfDocumentSession for the caption extractor
         """
         self.pdf_path = Path(pdf_path)
         self.document_title = document_title
@@ -86,7 +87,7 @@ class ObjectNumberingCoordinator:
             raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
         # Initialize caption extractor
-        self.table_caption_extractor = TableCaptionExtractor(pdf_path)
+        self.table_caption_extractor = TableCaptionExtractor(pdf_path, document_session=document_session)
 
         print("================================================================================")
         print("OBJECT NUMBERING COORDINATOR")
@@ -273,6 +274,10 @@ class ObjectNumberingCoordinator:
         doc_safe = self.document_title.lower().replace(' ', '_')
         return f"unnumbered_{obj_type}_{doc_safe}_page{page}"
 
+    def close(self):
+        """Release the caption extractor's PDF handle."""
+        self.table_caption_extractor.close()
+
 
 if __name__ == "__main__":
     # Test on Chapter 4
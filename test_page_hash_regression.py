@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Page Hash Regression Test
+
+Pages placed with show_pdf_page() have the same one-line content stream
+("q /fzFrm0 Do Q") and differ only inside their Form XObject. Their content
+hashes must differ, or DetectionCache hands one page's zones to another.
+
+Run: python -m pytest -q test_page_hash_regression.py
+"""
+
+import fitz
+
+from common.src.file_io.pdf_hash import compute_page_hash
+
+
+def _source_doc(texts):
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page(width=300, height=300)
+        page.insert_text((50, 100), text, fontsize=14)
+    return doc
+
+
+def _form_page_doc(src, page_numbers):
+    doc = fitz.open()
+    for page_num in page_numbers:
+        page = doc.new_page(width=300, height=300)
+        page.show_pdf_page(page.rect, src, page_num)
+    return doc
+
+
+def test_form_xobject_pages_hash_differently():
+    src = _source_doc(["Equation (1): q = h A dT", "Table 2: Thermal conductivity"])
+    doc = _form_page_doc(src, [0, 1])
+
+    assert doc[0].read_contents() == doc[1].read_contents()
+    assert compute_page_hash(doc[0]) != compute_page_hash(doc[1])
+
+
+def test_form_xobject_pages_hash_differently_across_documents():
+    doc_a = _form_page_doc(_source_doc(["Chapter 4 page one"]), [0])
+    doc_b = _form_page_doc(_source_doc(["Chapter 7 page one"]), [0])
+
+    assert compute_page_hash(doc_a[0]) != compute_page_hash(doc_b[0])
+
+
+def test_identical_pages_hash_equal():
+    src = _source_doc(["Same content", "Same content"])
+    doc = _form_page_doc(src, [0, 1])
+
+    assert compute_page_hash(src[0]) == compute_page_hash(src[1])
+    assert compute_page_hash(doc[0]) == compute_page_hash(doc[1])
+
+
+def test_shared_digest_memo_matches_fresh_hash():
+    src = _source_doc(["First page", "Second page", "First page"])
+    doc = _form_page_doc(src, [0, 1, 2])
+
+    object_digests = {}
+    memoized = [compute_page_hash(page, object_digests) for page in doc]
+    assert memoized == [compute_page_hash(page) for page in doc]
+    assert memoized[0] == memoized[2] != memoized[1]
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Text-Layer LaTeX Confidence Test
+
+The text-layer reader replaces pix2tex whenever its confidence reaches the
+acceptance threshold (0.9 by default). Prose or a label that the detector
+took for an equation must stay below it; upright equations and function
+names must still be read.
+
+Run: python -m pytest -q test_text_layer_latex.py
+"""
+
+import fitz
+
+from rag_extraction_v14_P16.src.equations.text_layer_latex import TextLayerLatexReader
+
+ACCEPT = 0.9
+
+
+def _read(runs):
+    """Read a zone built from (x, baseline, text, fontsize) runs in upright Helvetica."""
+    doc = fitz.open()
+    page = doc.new_page(width=400, height=200)
+    for x, y, text, size in runs:
+        page.insert_text((x, y), text, fontsize=size, fontname="helv")
+    rawdict = page.get_text("rawdict")
+    return TextLayerLatexReader().read(page, (20, 60, 380, 120), rawdict)
+
+
+def test_prose_line_is_not_accepted():
+    result = _read([(30, 100, "Heat flux is large", 14)])
+
+    assert result.confidence < ACCEPT
+    assert "no_operator" in result.issues
+
+
+def test_upright_label_without_operator_is_not_accepted():
+    result = _read([(30, 100, "Nu", 14)])
+
+    assert result.confidence < ACCEPT
+
+
+def test_upright_word_with_operator_is_not_accepted():
+    result = _read([(30, 100, "Flux = large", 14)])
+
+    assert result.confidence < ACCEPT
+    assert "unknown_upright_run" in result.issues
+
+
+def test_upright_e_equals_mc_squared():
+    result = _read([(30, 100, "E = mc", 14), (80, 93, "2", 9)])
+
+    assert result.latex == "E=mc^{2}"
+    assert result.confidence >= ACCEPT
+
+
+def test_function_names_keep_their_spacing():
+    result = _read([(30, 100, "y = sin x + cos z", 14)])
+
+    assert result.latex == r"y=\sin x+\cos z"
+    assert result.confidence >= ACCEPT
+
+
+def test_function_name_run_into_a_variable_is_not_accepted():
+    result = _read([(30, 100, "y = sinx", 14)])
+
+    assert result.confidence < ACCEPT
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ONNX Runtime vs PyTorch Backend Benchmark
+
+Compares UnifiedDetectionModule's two inference backends on a sample PDF:
+
+- torch: doclayout_yolo.YOLOv10 in PyTorch eager mode
+- onnx:  the same checkpoint exported to ONNX, run with ONNX Runtime (CPU)
+
+Pages are rendered once up front, so only inference + result decoding is timed.
+Reports single-page latency (mean / p50 / p95), batched throughput (pages/s)
+per batch size, and how closely ONNX detections match PyTorch (per-class
+matches at IoU ≥ 0.5, mean IoU, max confidence difference).
+
+Usage:
+    python tools/benchmark_onnx_backend.py --model models/doclayout_yolo_docstructbench_imgsz1280_2501.pt \\
+        --pdf test_data/Ch-04_Heat_Transfer.pdf [--pages 20] [--batch-sizes 1 4 8] \\
+        [--render-mode dpi] [--threads 8]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fitz
+import numpy as np
+import torch
+
+from detection_v14_P14.src.yolo.unified_detection_module import UnifiedDetectionModule, Detection
+from benchmark_render_resolution import match_page
+
+
+def render_pages(detector: UnifiedDetectionModule, pdf_path: Path,
+                 pages: List[int]) -> List[Tuple[int, np.ndarray, float]]:
+    """Render pages once: [(page_num, BGR array, zoom)]."""
+    rendered = []
+    with fitz.open(str(pdf_path)) as doc:
+        for page_num in pages:
+            pix, zoom = detector._render_page(doc[page_num])
+            rendered.append((page_num, detector._pixmap_to_array(pix), zoom))
+    return rendered
+
+
+def run_batches(detector: UnifiedDetectionModule, rendered, batch_size: int):
+    """
+    Predict + decode all pages in batches of uniform image size.
+
+    Returns:
+        (detections by page, [(seconds, pages) per predict call])
+    """
+    detections: Dict[int, List[Detection]] = {}
+    call_seconds = []
+    batches, current = [], []
+    for item in rendered:
+        if current and (len(current) >= batch_size or item[1].shape != current[0][1].shape):
+            batches.append(current)
+            current = []
+        current.append(item)
+    if current:
+        batches.append(current)
+
+    for batch in batches:
+        start = time.perf_counter()
+        results = detector.model.predict([img for _, img, _ in batch], conf=detector.confidence_threshold,
+                                         verbose=False, **detector._predict_kwargs())
+        for (page_num, _, zoom), result in zip(batch, results):
+            detections[page_num] = detector._result_to_detections(result, page_num, zoom).to_detections(Detection)
+        call_seconds.append((time.perf_counter() - start, len(batch)))
+    return detections, call_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', required=True, help='DocLayout-YOLO checkpoint')
+    parser.add_argument('--pdf', required=True, type=Path, help='Sample PDF')
+    parser.add_argument('--pages', type=int, default=20, help='Pages to test (from the start)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--render-mode', choices=UnifiedDetectionModule.RENDER_MODES, default='dpi')
+    parser.add_argument('--threads', type=int, default=None, help='Intra-op threads for both backends')
+    parser.add_argument('--iou', type=float, default=0.5, help='IoU threshold for a match')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    with fitz.open(str(args.pdf)) as doc:
+        pages = list(range(min(args.pages, len(doc))))
+
+    print(f"PDF: {args.pdf} ({len(pages)} pages, render mode {args.render_mode})")
+    print(f"Model: {args.model}")
+    print(f"Threads: {torch.get_num_threads()}")
+    print()
+
+    detectors = {}
+    load_seconds = {}
+    for backend in UnifiedDetectionModule.BACKENDS:
+        detector = UnifiedDetectionModule(args.model, inference_mode='in_memory',
+                                          render_mode=args.render_mode, backend=backend)
+        start = time.perf_counter()
+        detector._load_model()
+        load_seconds[backend] = time.perf_counter() - start
+        detectors[backend] = detector
+
+    rendered = render_pages(detectors['torch'], args.pdf, pages)
+
+    # Warm-up (first call allocates buffers / builds kernels)
+    for detector in detectors.values():
+        run_batches(detector, rendered[:1], 1)
+
+    print()
+    print(f"{'Backend':<10}{'Load (s)':>10}{'Batch':>7}{'Mean ms':>10}{'p50 ms':>10}"
+          f"{'p95 ms':>10}{'Pages/s':>10}")
+    reference: Dict[str, Dict[int, List[Detection]]] = {}
+    throughput: Dict[Tuple[str, int], float] = {}
+    for backend, detector in detectors.items():
+        for batch_size in args.batch_sizes:
+            detections, call_seconds = run_batches(detector, rendered, batch_size)
+            if batch_size == args.batch_sizes[0]:
+                reference[backend] = detections
+
+            per_page_ms = sorted(seconds * 1000 / n for seconds, n in call_seconds)
+            total = sum(seconds for seconds, _ in call_seconds)
+            throughput[(backend, batch_size)] = len(rendered) / total
+            print(f"{backend:<10}{load_seconds[backend]:>10.2f}{batch_size:>7}"
+                  f"{statistics.mean(per_page_ms):>10.1f}{statistics.median(per_page_ms):>10.1f}"
+                  f"{per_page_ms[int(len(per_page_ms) * 0.95)]:>10.1f}{len(rendered) / total:>10.2f}")
+
+    print()
+    for batch_size in args.batch_sizes:
+        speedup = throughput[('onnx', batch_size)] / throughput[('torch', batch_size)]
+        print(f"ONNX throughput vs PyTorch at batch {batch_size}: {speedup:.2f}x")
+    print()
+
+    # Equivalence of ONNX detections to PyTorch
+    per_class: Dict[str, Dict[str, int]] = {}
+    ious, conf_diffs = [], []
+    for page_num in pages:
+        baseline = reference['torch'].get(page_num, [])
+        candidate = reference['onnx'].get(page_num, [])
+        for det in baseline:
+            per_class.setdefault(det.class_name, {'torch': 0, 'onnx': 0, 'matched': 0})['torch'] += 1
+        for det in candidate:
+            per_class.setdefault(det.class_name, {'torch': 0, 'onnx': 0, 'matched': 0})['onnx'] += 1
+        for b, c, score in match_page(baseline, candidate, args.iou):
+            per_class[b.class_name]['matched'] += 1
+            ious.append(score)
+            conf_diffs.append(abs(b.confidence - c.confidence))
+
+    print(f"ONNX vs PyTorch detections (IoU ≥ {args.iou}):")
+    print(f"{'Class':<18}{'PyTorch':>10}{'ONNX':>10}{'Matched':>10}{'Recall':>9}{'Precision':>11}")
+    for class_name, counts in sorted(per_class.items()):
+        recall = counts['matched'] / counts['torch'] if counts['torch'] else 1.0
+        precision = counts['matched'] / counts['onnx'] if counts['onnx'] else 1.0
+        print(f"{class_name:<18}{counts['torch']:>10}{counts['onnx']:>10}"
+              f"{counts['matched']:>10}{recall:>9.1%}{precision:>11.1%}")
+    if ious:
+        print()
+        print(f"Mean IoU of matches: {statistics.mean(ious):.4f}")
+        print(f"Max confidence difference: {max(conf_diffs):.4f}")
+
+
+if __name__ == "__main__":
+    main()
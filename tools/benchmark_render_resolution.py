@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detection Render Resolution Benchmark
+
+Compares UnifiedDetectionModule's two render modes on a sample PDF:
+
+- dpi:          pages rendered at 300 DPI (~2550×3300 px for Letter), then
+                downscaled by YOLO to its input size
+- model_input:  pages rendered directly so the longest side equals the
+                model's imgsz
+
+Reports render time, end-to-end detection time and an accuracy comparison of
+model_input against the 300 DPI baseline: per-class matches at IoU ≥ 0.5,
+recall/precision relative to the baseline, mean IoU and mean bbox corner error
+in PDF points.
+
+Usage:
+    python tools/benchmark_render_resolution.py --model models/doclayout_yolo_docstructbench_imgsz1280_2501.pt \\
+        --pdf test_data/Ch-04_Heat_Transfer.pdf [--pages 20] [--iou 0.5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fitz
+
+from detection_v14_P14.src.yolo.unified_detection_module import UnifiedDetectionModule, Detection
+
+
+def iou(a: Tuple[float, ...], b: Tuple[float, ...]) -> float:
+    """Intersection over union of two (x0, y0, x1, y1) boxes."""
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def match_page(baseline: List[Detection], candidate: List[Detection], threshold: float):
+    """Greedy same-class matching by descending IoU. Returns list of (base, cand, iou)."""
+    pairs = []
+    for b_idx, b in enumerate(baseline):
+        for c_idx, c in enumerate(candidate):
+            if b.class_name == c.class_name:
+                score = iou(b.bbox, c.bbox)
+                if score >= threshold:
+                    pairs.append((score, b_idx, c_idx))
+
+    matched, used_b, used_c = [], set(), set()
+    for score, b_idx, c_idx in sorted(pairs, reverse=True):
+        if b_idx not in used_b and c_idx not in used_c:
+            used_b.add(b_idx)
+            used_c.add(c_idx)
+            matched.append((baseline[b_idx], candidate[c_idx], score))
+    return matched
+
+
+def time_rendering(detector: UnifiedDetectionModule, pdf_path: Path, pages: List[int]) -> float:
+    """Seconds to render the pages to detector input arrays."""
+    doc = fitz.open(str(pdf_path))
+    try:
+        start = time.perf_counter()
+        for page_num in pages:
+            pix, _ = detector._render_page(doc[page_num])
+            detector._pixmap_to_array(pix)
+        return time.perf_counter() - start
+    finally:
+        doc.close()
+
+
+def run_mode(model_path: str, pdf_path: Path, pages: List[int],
+             render_mode: str) -> Tuple[Dict[int, List[Detection]], float, float, UnifiedDetectionModule]:
+    """Detect pages in-process with one render mode. Returns (detections, render_s, detect_s, detector)."""
+    detector = UnifiedDetectionModule(model_path, inference_mode='in_memory', render_mode=render_mode)
+    detector._load_model()
+
+    render_seconds = time_rendering(detector, pdf_path, pages)
+    start = time.perf_counter()
+    batches = detector._run_detection(pdf_path, pages, num_workers=1)
+    detections = {page: batch.to_detections(Detection) for page, batch in batches.items()}
+    return detections, render_seconds, time.perf_counter() - start, detector
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', required=True, help='DocLayout-YOLO checkpoint')
+    parser.add_argument('--pdf', required=True, type=Path, help='Sample PDF')
+    parser.add_argument('--pages', type=int, default=20, help='Pages to test (from the start)')
+    parser.add_argument('--iou', type=float, default=0.5, help='IoU threshold for a match')
+    args = parser.parse_args()
+
+    with fitz.open(str(args.pdf)) as doc:
+        pages = list(range(min(args.pages, len(doc))))
+
+    print(f"PDF: {args.pdf} ({len(pages)} pages)")
+    print(f"Model: {args.model}")
+    print()
+
+    base_dets, base_render, base_detect, _ = run_mode(args.model, args.pdf, pages, 'dpi')
+    cand_dets, cand_render, cand_detect, cand_detector = run_mode(args.model, args.pdf, pages, 'model_input')
+
+    print()
+    print(f"{'Mode':<28}{'Render (s)':>12}{'Detect (s)':>12}{'Pages/s':>10}{'Detections':>12}")
+    for label, render_s, detect_s, dets in (
+        (f"dpi ({UnifiedDetectionModule.RENDER_DPI} DPI)", base_render, base_detect, base_dets),
+        (f"model_input (imgsz {cand_detector.model_imgsz()})", cand_render, cand_detect, cand_dets),
+    ):
+        total = sum(len(d) for d in dets.values())
+        print(f"{label:<28}{render_s:>12.2f}{detect_s:>12.2f}{len(pages) / detect_s:>10.2f}{total:>12}")
+    print(f"Speedup: render {base_render / cand_render:.1f}x, detection {base_detect / cand_detect:.2f}x")
+    print()
+
+    # Accuracy of model_input relative to the 300 DPI baseline
+    per_class: Dict[str, Dict[str, float]] = {}
+    all_ious, corner_errors = [], []
+    for page_num in pages:
+        baseline = base_dets.get(page_num, [])
+        candidate = cand_dets.get(page_num, [])
+        for det in baseline:
+            per_class.setdefault(det.class_name, {'baseline': 0, 'candidate': 0, 'matched': 0})['baseline'] += 1
+        for det in candidate:
+            per_class.setdefault(det.class_name, {'baseline': 0, 'candidate': 0, 'matched': 0})['candidate'] += 1
+        for b, c, score in match_page(baseline, candidate, args.iou):
+            per_class[b.class_name]['matched'] += 1
+            all_ious.append(score)
+            corner_errors.append(max(abs(x - y) for x, y in zip(b.bbox, c.bbox)))
+
+    print(f"Accuracy vs 300 DPI baseline (IoU ≥ {args.iou}):")
+    print(f"{'Class':<18}{'Baseline':>10}{'Model-in':>10}{'Matched':>10}{'Recall':>9}{'Precision':>11}")
+    for class_name, counts in sorted(per_class.items()):
+        recall = counts['matched'] / counts['baseline'] if counts['baseline'] else 1.0
+        precision = counts['matched'] / counts['candidate'] if counts['candidate'] else 1.0
+        print(f"{class_name:<18}{counts['baseline']:>10}{counts['candidate']:>10}"
+              f"{counts['matched']:>10}{recall:>9.1%}{precision:>11.1%}")
+
+    if all_ious:
+        corner_errors.sort()
+        print()
+        print(f"Mean IoU of matches: {sum(all_ious) / len(all_ious):.3f}")
+        print(f"Max corner error (pt): median {corner_errors[len(corner_errors) // 2]:.2f}, "
+              f"p95 {corner_errors[int(len(corner_errors) * 0.95)]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
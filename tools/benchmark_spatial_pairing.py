@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spatial Pairing Micro-Benchmark
+
+Compares the legacy greedy equation/number pairing loop (rebuild the candidate
+list for every equation) with the page-bucketed, vectorized global assignment
+in detection_v14_P14/src/yolo/spatial_pairing.py.
+
+Synthetic pages: equations stacked down the page, each with its number to the
+right plus jitter, at 200+ detections per page. Also checks that the new
+pairing does not depend on input order.
+
+Usage:
+    python tools/benchmark_spatial_pairing.py [--pages 20] [--per-page 120] [--repeat 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from detection_v14_P14.src.yolo.spatial_pairing import pair_detections, SCIPY_AVAILABLE
+
+
+@dataclass
+class SyntheticDetection:
+    """Minimal stand-in for unified_detection_module.Detection."""
+    class_name: str
+    page_num: int
+    bbox: Tuple[float, float, float, float]
+
+    @property
+    def center_x(self):
+        return (self.bbox[0] + self.bbox[2]) / 2
+
+    @property
+    def center_y(self):
+        return (self.bbox[1] + self.bbox[3]) / 2
+
+    def distance_to(self, other) -> float:
+        dx = self.center_x - other.center_x
+        dy = self.center_y - other.center_y
+        return (dx**2 + dy**2) ** 0.5
+
+
+def make_pages(pages: int, per_page: int, seed: int = 42):
+    """Build equations and numbers for synthetic dense pages."""
+    rng = random.Random(seed)
+    equations, numbers = [], []
+    row_height = 792 / per_page
+
+    for page in range(pages):
+        for row in range(per_page):
+            y = row * row_height
+            x0 = rng.uniform(250, 300)
+            equations.append(SyntheticDetection(
+                'equation', page, (x0, y, x0 + rng.uniform(120, 180), y + row_height * 0.8)))
+            nx = rng.uniform(430, 460)
+            ny = y + rng.uniform(-row_height, row_height)
+            numbers.append(SyntheticDetection(
+                'equation_number', page, (nx, ny, nx + 24, ny + row_height * 0.6)))
+
+    rng.shuffle(numbers)
+    return equations, numbers
+
+
+def legacy_greedy(equations, numbers, max_distance: float = 150.0):
+    """The original _pair_equations candidate loop (pairs only)."""
+    pairs = {}
+    used_numbers = set()
+    for eq in equations:
+        candidates = [n for n in numbers
+                      if n.page_num == eq.page_num and id(n) not in used_numbers]
+        if not candidates:
+            continue
+        closest = min(candidates, key=lambda n: eq.distance_to(n))
+        if eq.distance_to(closest) <= max_distance:
+            pairs[id(eq)] = closest
+            used_numbers.add(id(closest))
+    return pairs
+
+
+def spatial_assignment(equations, numbers, max_distance: float = 150.0):
+    """New page-bucketed global assignment (pairs only)."""
+    results = pair_detections(equations, numbers, max_distance)
+    return {id(eq): r.partner for eq, r in zip(equations, results) if r.partner is not None}
+
+
+def best_of(func, repeat, *args):
+    best = float('inf')
+    out = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def total_distance(equations, pairs):
+    by_id = {id(eq): eq for eq in equations}
+    return sum(by_id[k].distance_to(v) for k, v in pairs.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--per-page', type=int, default=120,
+                        help='Equations per page (numbers added 1:1, so detections = 2x)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    equations, numbers = make_pages(args.pages, args.per_page)
+    print(f"Synthetic document: {args.pages} pages × {2 * args.per_page} detections "
+          f"({len(equations) + len(numbers)} total)")
+    print(f"Assignment solver: {'scipy.optimize.linear_sum_assignment' if SCIPY_AVAILABLE else 'NumPy Hungarian'}")
+    print()
+
+    legacy_time, legacy_pairs = best_of(legacy_greedy, args.repeat, equations, numbers)
+    spatial_time, spatial_pairs = best_of(spatial_assignment, args.repeat, equations, numbers)
+
+    print(f"{'Method':<22}{'Time (ms)':>12}{'Pairs':>10}{'Total dist':>14}")
+    print(f"{'Legacy greedy':<22}{legacy_time * 1000:>12.1f}{len(legacy_pairs):>10}"
+          f"{total_distance(equations, legacy_pairs):>14.1f}")
+    print(f"{'Spatial assignment':<22}{spatial_time * 1000:>12.1f}{len(spatial_pairs):>10}"
+          f"{total_distance(equations, spatial_pairs):>14.1f}")
+    print(f"Speedup: {legacy_time / spatial_time:.1f}x")
+    print()
+
+    # Order independence: reversing equations must not change any pair
+    reversed_pairs = spatial_assignment(list(reversed(equations)), numbers)
+    stable = all(reversed_pairs.get(k) is v for k, v in spatial_pairs.items()) \
+        and len(reversed_pairs) == len(spatial_pairs)
+    legacy_reversed = legacy_greedy(list(reversed(equations)), numbers)
+    legacy_stable = all(legacy_reversed.get(k) is v for k, v in legacy_pairs.items()) \
+        and len(legacy_reversed) == len(legacy_pairs)
+    print(f"Order independent - legacy: {'yes' if legacy_stable else 'NO'}, "
+          f"spatial: {'yes' if stable else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build the INT8 DocLayout-YOLO Model
+
+Exports the checkpoint to ONNX (if not done yet) and quantizes it to INT8,
+calibrating activation ranges on pages sampled from a folder of sample PDFs.
+The result is written next to the fp32 export as *_int8_<mode>.onnx, where
+UnifiedDetectionModule(backend='onnx_int8') finds it (static preferred when
+both modes were built).
+
+Check accuracy before using it in production:
+    python tools/report_int8_accuracy.py --model ... --pdf-dir ...
+
+Usage:
+    python tools/quantize_detection_model.py --model models/doclayout_yolo_docstructbench_imgsz1280_2501.pt \\
+        --calibration-dir test_data/calibration [--mode static] [--max-pages 100] [--method minmax]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Importing the detector applies the torch.load patch the export needs
+from detection_v14_P14.src.yolo.unified_detection_module import UnifiedDetectionModule
+from detection_v14_P14.src.yolo.onnx_backend import export_onnx
+from detection_v14_P14.src.yolo.int8_quantization import quantize_detection_model, QUANTIZATION_MODES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', required=True, help='DocLayout-YOLO checkpoint (.pt)')
+    parser.add_argument('--calibration-dir', type=Path, help='Folder of sample PDFs (static mode)')
+    parser.add_argument('--mode', choices=QUANTIZATION_MODES, default='static')
+    parser.add_argument('--max-pages', type=int, default=100, help='Calibration pages in total')
+    parser.add_argument('--method', choices=['minmax', 'entropy', 'percentile'], default='minmax',
+                        help='Activation range calibration method (static mode)')
+    parser.add_argument('--output', type=Path, help='INT8 model path (default: next to the fp32 export)')
+    args = parser.parse_args()
+
+    if args.mode == 'static' and args.calibration_dir is None:
+        parser.error("--calibration-dir is required for static quantization")
+
+    detector = UnifiedDetectionModule(args.model)
+    onnx_path = export_onnx(args.model, detector._checkpoint_imgsz())
+
+    quantize_detection_model(
+        onnx_path,
+        mode=args.mode,
+        calibration_dir=args.calibration_dir,
+        output_path=args.output,
+        max_calibration_pages=args.max_pages,
+        calibration_method=args.method
+    )
+
+
+if __name__ == "__main__":
+    main()
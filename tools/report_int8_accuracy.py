@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+INT8 Detection Accuracy Report
+
+Runs the full YOLO detection (detection + equation/figure pairing → Zones) on a
+folder of PDFs with the fp32 model and the INT8 model, and reports zone-level
+recall and precision of INT8 against fp32 per zone type, plus the speedup.
+
+A zone counts as reproduced when the INT8 run has a zone of the same type on
+the same page with IoU ≥ --iou. The verdict is SAFE when every zone type meets
+--min-recall and --min-precision.
+
+Usage:
+    python tools/report_int8_accuracy.py --model models/doclayout_yolo_docstructbench_imgsz1280_2501.pt \\
+        --pdf-dir test_data/validation [--int8 path/to/model_int8_static.onnx] \\
+        [--baseline torch] [--max-pages 30] [--iou 0.5] [--min-recall 0.98] \\
+        [--min-precision 0.98] [--output results/int8_accuracy.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fitz
+
+from detection_v14_P14.src.yolo.unified_detection_module import UnifiedDetectionModule
+
+
+def iou(a, b) -> float:
+    """Intersection over union of two (x0, y0, x1, y1) boxes."""
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def count_matches(baseline, candidate, threshold: float) -> Tuple[int, List[float]]:
+    """Greedy one-to-one matching of same-type, same-page zones by descending IoU."""
+    pairs = []
+    for b_idx, b in enumerate(baseline):
+        for c_idx, c in enumerate(candidate):
+            if b.type == c.type and b.page == c.page:
+                score = iou(b.bbox, c.bbox)
+                if score >= threshold:
+                    pairs.append((score, b_idx, c_idx))
+
+    used_b, used_c, ious = set(), set(), []
+    for score, b_idx, c_idx in sorted(pairs, reverse=True):
+        if b_idx not in used_b and c_idx not in used_c:
+            used_b.add(b_idx)
+            used_c.add(c_idx)
+            ious.append(score)
+    return len(ious), ious
+
+
+def detect(detector: UnifiedDetectionModule, pdf_path: Path, max_pages: int):
+    """Zones for the first max_pages pages and the detection seconds."""
+    with fitz.open(str(pdf_path)) as doc:
+        end_page = min(len(doc), max_pages) - 1
+    start = time.perf_counter()
+    zones = detector.detect_all_objects(pdf_path, num_workers=1, end_page=end_page)
+    return zones, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', required=True, help='DocLayout-YOLO checkpoint (.pt)')
+    parser.add_argument('--pdf-dir', required=True, type=Path, help='Folder of evaluation PDFs')
+    parser.add_argument('--int8', help='INT8 model (default: *_int8_static.onnx next to the export)')
+    parser.add_argument('--baseline', choices=['torch', 'onnx'], default='torch',
+                        help='fp32 reference backend')
+    parser.add_argument('--max-pages', type=int, default=30, help='Pages per PDF')
+    parser.add_argument('--iou', type=float, default=0.5)
+    parser.add_argument('--min-recall', type=float, default=0.98)
+    parser.add_argument('--min-precision', type=float, default=0.98)
+    parser.add_argument('--output', type=Path, help='Write the report as JSON')
+    args = parser.parse_args()
+
+    pdf_paths = sorted(args.pdf_dir.rglob('*.pdf'))
+    if not pdf_paths:
+        parser.error(f"No PDFs found in {args.pdf_dir}")
+
+    fp32 = UnifiedDetectionModule(args.model, inference_mode='in_memory', backend=args.baseline)
+    int8 = UnifiedDetectionModule(args.model, inference_mode='in_memory', backend='onnx_int8',
+                                  onnx_path=args.int8)
+    fp32._load_model()
+    int8._load_model()
+
+    per_type: Dict[str, Dict[str, int]] = {}
+    all_ious: List[float] = []
+    seconds = {'fp32': 0.0, 'int8': 0.0}
+    pages = 0
+
+    for pdf_path in pdf_paths:
+        base_zones, base_seconds = detect(fp32, pdf_path, args.max_pages)
+        cand_zones, cand_seconds = detect(int8, pdf_path, args.max_pages)
+        seconds['fp32'] += base_seconds
+        seconds['int8'] += cand_seconds
+        pages += fp32.last_run_stats.get('pages', 0)
+
+        for zone_type in sorted({z.type for z in base_zones + cand_zones}):
+            base = [z for z in base_zones if z.type == zone_type]
+            cand = [z for z in cand_zones if z.type == zone_type]
+            matched, ious = count_matches(base, cand, args.iou)
+            counts = per_type.setdefault(zone_type, {'fp32': 0, 'int8': 0, 'matched': 0})
+            counts['fp32'] += len(base)
+            counts['int8'] += len(cand)
+            counts['matched'] += matched
+            all_ious.extend(ious)
+
+    print()
+    print(f"{'='*80}")
+    print(f"INT8 ACCURACY REPORT ({len(pdf_paths)} PDFs, {pages} pages, baseline {args.baseline} fp32)")
+    print(f"{'='*80}")
+    print(f"{'Zone type':<14}{'fp32':>8}{'INT8':>8}{'Matched':>9}{'Recall':>9}{'Precision':>11}  Status")
+
+    report_types = {}
+    safe = True
+    for zone_type, counts in sorted(per_type.items()):
+        recall = counts['matched'] / counts['fp32'] if counts['fp32'] else 1.0
+        precision = counts['matched'] / counts['int8'] if counts['int8'] else 1.0
+        ok = recall >= args.min_recall and precision >= args.min_precision
+        safe = safe and ok
+        report_types[zone_type] = {**counts, 'recall': recall, 'precision': precision, 'meets_threshold': ok}
+        print(f"{zone_type:<14}{counts['fp32']:>8}{counts['int8']:>8}{counts['matched']:>9}"
+              f"{recall:>9.1%}{precision:>11.1%}  {'✅' if ok else '❌'}")
+
+    speedup = seconds['fp32'] / seconds['int8'] if seconds['int8'] > 0 else 0.0
+    mean_iou = sum(all_ious) / len(all_ious) if all_ious else 0.0
+    print()
+    print(f"Mean IoU of matched zones: {mean_iou:.3f}")
+    print(f"Detection time: fp32 {seconds['fp32']:.1f}s, INT8 {seconds['int8']:.1f}s ({speedup:.2f}x)")
+    print(f"Thresholds: recall ≥ {args.min_recall:.0%}, precision ≥ {args.min_precision:.0%}")
+    print(f"Verdict: {'✅ SAFE for production' if safe else '❌ NOT SAFE - keep fp32'}")
+
+    if args.output:
+        report = {
+            'model': args.model,
+            'int8_model': int8.onnx_path,
+            'baseline_backend': args.baseline,
+            'pdfs': [str(p) for p in pdf_paths],
+            'pages': pages,
+            'iou_threshold': args.iou,
+            'min_recall': args.min_recall,
+            'min_precision': args.min_precision,
+            'zone_types': report_types,
+            'mean_iou': mean_iou,
+            'detection_seconds': seconds,
+            'speedup': speedup,
+            'safe_for_production': safe,
+            'timestamp': datetime.now().isoformat()
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()